@@ -0,0 +1,13 @@
+"""
+Benchmarks do cerberus.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks --saida resultados.json
+    python -m benchmarks --compara resultados_base.json
+"""
+import sys
+from pathlib import Path
+
+_SRC = str(Path(__file__).resolve().parents[1] / "src")
+if _SRC not in sys.path:
+    sys.path.append(_SRC)
@@ -0,0 +1,120 @@
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from cerberus import elan
+
+from .bench_id_trilhas import _cenario
+from .gerador import gera_eaf
+
+INVALIDOS_PADRAO = {"digito": 0.01, "disf_mal_posicionada": 0.01, "caractere_invalido": 0.03, "disf_malformada": 0.01}
+
+
+def _cronometra(funcao: Callable[[], Any], repeticoes: int, itens: Optional[int] = None) -> Dict[str, Any]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    resultado = {"mediana_s": statistics.median(tempos), "minimo_s": min(tempos), "repeticoes": repeticoes}
+    if itens:
+        resultado["itens_por_s"] = itens / resultado["mediana_s"]
+    return resultado
+
+
+def executa(anotacoes_por_trilha: int, repeticoes: int, tamanhos_ids: List[int]) -> Dict[str, Dict[str, Any]]:
+    resultados: Dict[str, Dict[str, Any]] = {}
+    conteudo = gera_eaf(3, anotacoes_por_trilha, INVALIDOS_PADRAO)
+    total_anotacoes = 3 * anotacoes_por_trilha
+
+    resultados["leitura.abre_eaf"] = _cronometra(lambda: elan.abre_eaf(conteudo, "sintetico.eaf"), repeticoes, total_anotacoes)
+    resultados["leitura.le_eaf"] = _cronometra(lambda: elan.le_eaf(conteudo, "sintetico.eaf"), repeticoes, total_anotacoes)
+
+    for num_trilhas in tamanhos_ids:
+        # Pior caso: regras ambíguas, em que qualquer trilha INF satisfaz qualquer regra INF
+        eaf_ids, regras = _cenario(num_trilhas)
+        regras = elan.RuleSet(regras)
+        resultados[f"ids.valida_id_trilhas[trilhas={num_trilhas}]"] = _cronometra(
+            lambda: elan.valida_id_trilhas(eaf_ids, regras, memo=None), repeticoes
+        )
+        # Mesma disposição de trilhas já resolvida (caso comum em um corpus)
+        memo = elan.MemoLayouts()
+        elan.valida_id_trilhas(eaf_ids, regras, memo=memo)
+        resultados[f"ids.valida_id_trilhas_memo[trilhas={num_trilhas}]"] = _cronometra(
+            lambda: elan.valida_id_trilhas(eaf_ids, regras, memo=memo), repeticoes
+        )
+
+    _, eaf = elan.le_eaf(conteudo, "sintetico.eaf")
+    _, _, mapeamento = elan.valida_id_trilhas(eaf, elan.REGRAS_ENTREVISTA)
+    resultados["conteudo.valida_conteudo_trilhas"] = _cronometra(
+        lambda: elan.valida_conteudo_trilhas(eaf, mapeamento), repeticoes, total_anotacoes
+    )
+    resultados["tempos.valida_tempos_trilhas"] = _cronometra(
+        lambda: elan.valida_tempos_trilhas(eaf, mapeamento), repeticoes, total_anotacoes
+    )
+    return resultados
+
+
+def compara(atuais: Dict[str, Dict[str, Any]], base: Dict[str, Dict[str, Any]], tolerancia: float) -> List[str]:
+    """
+    Compara as medianas com uma execução anterior e devolve os nomes dos casos que ficaram mais lentos que a tolerância.
+    """
+    regressoes = []
+    print(f"\n{'caso':<45} {'base (ms)':>12} {'atual (ms)':>12} {'razão':>8}")
+    for nome, atual in atuais.items():
+        if nome not in base:
+            continue
+        razao = atual["mediana_s"] / base[nome]["mediana_s"]
+        marcador = ""
+        if razao > 1 + tolerancia:
+            regressoes.append(nome)
+            marcador = "  << REGRESSÃO"
+        print(f"{nome:<45} {base[nome]['mediana_s'] * 1000:>12.3f} {atual['mediana_s'] * 1000:>12.3f} {razao:>8.2f}{marcador}")
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de leitura e validação do cerberus.")
+    parser.add_argument("-o", "--saida", help="Grava os resultados em JSON neste arquivo.")
+    parser.add_argument("-c", "--compara", help="JSON de uma execução anterior, usado como base de comparação.")
+    parser.add_argument("-t", "--tolerancia", type=float, default=0.15, help="Aumento relativo da mediana tolerado antes de acusar regressão (padrão: 0.15).")
+    parser.add_argument("-n", "--anotacoes", type=int, default=5000, help="Anotações por trilha no arquivo sintético (padrão: 5000).")
+    parser.add_argument("-r", "--repeticoes", type=int, default=5, help="Repetições de cada caso (padrão: 5).")
+    parser.add_argument("--trilhas", type=int, nargs="+", default=[3, 12, 50, 100], help="Quantidades de trilhas do benchmark de IDs.")
+    args = parser.parse_args(argv)
+
+    resultados = executa(args.anotacoes, args.repeticoes, args.trilhas)
+
+    print(f"{'caso':<45} {'mediana (ms)':>14} {'itens/s':>14}")
+    for nome, resultado in resultados.items():
+        itens = f"{resultado['itens_por_s']:,.0f}" if "itens_por_s" in resultado else "-"
+        print(f"{nome:<45} {resultado['mediana_s'] * 1000:>14.3f} {itens:>14}")
+
+    if args.saida:
+        documento = {
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "parametros": {"anotacoes_por_trilha": args.anotacoes, "repeticoes": args.repeticoes, "trilhas": args.trilhas},
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(documento, f, ensure_ascii=False, indent=2)
+
+    if args.compara:
+        with open(args.compara, encoding="utf-8") as f:
+            base = json.load(f)["resultados"]
+        regressoes = compara(resultados, base, args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
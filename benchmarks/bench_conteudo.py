@@ -0,0 +1,93 @@
+"""
+Benchmark e verificação diferencial do validador de conteúdo INF/DOC (_valida_conteudo_inf_doc).
+
+Gera algumas centenas de milhares de anotações com o formato das transcrições reais
+(palavras, hesitações, hipóteses entre parênteses, números, pontuação fora da norma e
+caracteres Unicode aleatórios), confere que a implementação atual devolve exatamente os
+mesmos códigos de erro que a implementação de referência (anterior à varredura única)
+e mede o tempo das duas.
+
+Uso:
+    python benchmarks/bench_conteudo.py [quantidade_de_anotacoes]
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from cerberus.elan.validador import _valida_conteudo_inf_doc
+
+_PALAVRAS = [
+    "eu", "ele", "ela", "foi", "lá", "na", "casa", "da", "minha", "mãe", "ação", "você", "né",
+    "então", "aí", "tá", "porque", "é", "não", "sim", "criança", "avó", "pé", "café", "à",
+]
+_MARCAS = [
+    "(EST)", "(HES)", "((risos))", "((TOSSE))", "(est)", "(incompreensível)", "(?)", "( )",
+    "2", "1998", "x@", "-", "/", '"', "?", "!", ",", ".", ";", "...", "…", "ñ", "ü", "×", "÷", "٣",
+]
+
+
+def _valida_conteudo_inf_doc_referencia(valor: str) -> List[Tuple[str, str]]:
+    """Implementação anterior, mantida apenas como referência para a verificação diferencial."""
+    erros = []
+    if re.search(r'\d', valor):
+        erros.append(("DIGITO_PRESENTE", ""))
+    if '(EST)' in valor or '(HES)' in valor or '((' in valor:
+        erros.append(("DISF_PRESENTE", ""))
+    hipoteses = re.findall(r'\((?!\s*\))([^)]+)\)', valor)
+    for h in hipoteses:
+        if h.upper() == 'EST' or h.upper() == 'HES':
+            continue
+        if h.strip() == '?':
+            continue
+        caracteres_invalidos = re.findall(r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]', valor)
+    caracteres_invalidos = re.findall(r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]', valor)
+    if caracteres_invalidos:
+        erros.append(("CARACTERE_INVALIDO", "".join(sorted(set(caracteres_invalidos)))))
+    return erros
+
+
+def gera_anotacoes(quantidade: int, semente: int = 0) -> List[str]:
+    gerador = random.Random(semente)
+    anotacoes = []
+    for _ in range(quantidade):
+        if gerador.random() < 0.02:
+            # Ruído: qualquer caractere do plano multilíngue básico, incluindo espaços Unicode
+            anotacoes.append("".join(chr(gerador.randint(0, 0xFFFF)) for _ in range(gerador.randint(1, 12))))
+        else:
+            tamanho = gerador.randint(1, 30)
+            anotacoes.append(" ".join(
+                gerador.choice(_MARCAS) if gerador.random() < 0.03 else gerador.choice(_PALAVRAS)
+                for _ in range(tamanho)
+            ))
+    return anotacoes
+
+
+def _mede(funcao, anotacoes: List[str]) -> float:
+    inicio = time.perf_counter()
+    for valor in anotacoes:
+        funcao(valor)
+    return time.perf_counter() - inicio
+
+
+def main(quantidade: int = 300_000) -> None:
+    anotacoes = gera_anotacoes(quantidade)
+
+    divergencias = [v for v in anotacoes if _valida_conteudo_inf_doc(v) != _valida_conteudo_inf_doc_referencia(v)]
+    if divergencias:
+        raise SystemExit(f"{len(divergencias)} anotações com resultado divergente. Exemplo: {divergencias[0]!r}")
+    print(f"Verificação diferencial: {quantidade} anotações, nenhuma divergência.")
+
+    tempo_referencia = _mede(_valida_conteudo_inf_doc_referencia, anotacoes)
+    tempo_atual = _mede(_valida_conteudo_inf_doc, anotacoes)
+    print(f"referência: {tempo_referencia:.3f}s ({quantidade / tempo_referencia:,.0f} anotações/s)")
+    print(f"atual:      {tempo_atual:.3f}s ({quantidade / tempo_atual:,.0f} anotações/s)")
+    print(f"ganho:      {tempo_referencia / tempo_atual:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
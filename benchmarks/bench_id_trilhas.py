@@ -0,0 +1,67 @@
+"""
+Benchmark da validação de identificadores de trilhas (valida_id_trilhas).
+
+Mede o tempo do emparelhamento trilhas x regras com quantidades crescentes de trilhas,
+incluindo regras opcionais e regras ambíguas (que aceitam várias trilhas), e o tempo da
+mesma validação quando a disposição de trilhas já está memorizada (elan.MemoLayouts).
+
+Uso:
+    python benchmarks/bench_id_trilhas.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from cerberus import elan
+
+
+class _TrilhasFalsas:
+    """Fonte mínima de trilhas para o validador, sem leitura de arquivo."""
+
+    def __init__(self, nomes):
+        self._nomes = nomes
+
+    def get_tier_names(self):
+        return self._nomes
+
+
+def _cenario(num_trilhas: int):
+    nomes = ["DISF", "DOC"] + [f"INF{i:03d}X" for i in range(num_trilhas - 2)]
+    regras = {
+        "maiusculas": True,
+        "regras_trilhas": [
+            {"type": "exato", "value": "DISF", "content_type": "DISF"},
+            {"type": "comeca", "value": "DOC", "content_type": "DOC"},
+        ]
+        # Regras ambíguas: qualquer trilha INF satisfaz qualquer uma delas.
+        + [{"type": "regex", "value": r"^[A-Z]+\d+[A-Z]+$", "content_type": "INF"} for _ in range(num_trilhas - 2)]
+        # Regras opcionais que não são usadas.
+        + [{"type": "comeca", "value": "EXTRA", "mandatory": False} for _ in range(3)],
+    }
+    return _TrilhasFalsas(nomes), regras
+
+
+def main(tamanhos=(3, 6, 9, 12, 25, 50, 100), repeticoes: int = 20) -> None:
+    print(f"{'trilhas':>8} {'tempo médio (ms)':>18} {'memorizado (ms)':>17}")
+    for num_trilhas in tamanhos:
+        eaf, regras = _cenario(num_trilhas)
+        regras = elan.RuleSet(regras)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            sucesso, erros, mapeamento = elan.valida_id_trilhas(eaf, regras, memo=None)
+        decorrido = (time.perf_counter() - inicio) / repeticoes
+        assert sucesso, erros
+
+        memo = elan.MemoLayouts()
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            resultado_memo = elan.valida_id_trilhas(eaf, regras, memo=memo)
+        decorrido_memo = (time.perf_counter() - inicio) / repeticoes
+        assert resultado_memo == (sucesso, erros, mapeamento), "resultado memorizado diverge"
+        print(f"{num_trilhas:>8} {decorrido * 1000:>18.3f} {decorrido_memo * 1000:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
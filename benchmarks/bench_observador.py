@@ -0,0 +1,102 @@
+"""
+Benchmark e verificação do modo observação (cerberus.observador.Observador).
+
+Um corpus sintético de N arquivos (padrão: 1000) é indexado e, em seguida, são medidos:
+    - a varredura de uma pasta sem mudanças (somente stat, sem leitura dos arquivos);
+    - a revalidação depois que um arquivo é alterado, comparada à revalidação da pasta inteira;
+    - uma sequência de salvamentos do mesmo arquivo, que precisa resultar em uma única validação;
+    - um arquivo salvo de novo sem mudança de conteúdo, que não pode ser revalidado.
+A verificação exige que o resultado guardado no índice seja igual ao de 'lote.valida_arquivo'.
+
+Uso:
+    python benchmarks/bench_observador.py [quantidade_de_arquivos]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from gerador import gera_corpus, gera_eaf
+from cerberus import elan, lote
+from cerberus.observador import Observador
+
+_CAMPOS_VARIAVEIS = ("duracao", "cache", "instrumentacao")
+
+
+def _aguarda_fila(observador: Observador) -> int:
+    validados = 0
+    while observador.pendentes:
+        time.sleep(observador.atraso / 2)
+        validados += observador.processa_pendentes()
+    return validados
+
+
+def main() -> int:
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    falhas = 0
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        pasta = os.path.join(diretorio, "corpus")
+        caminhos = gera_corpus(pasta, quantidade, num_trilhas=3, anotacoes_por_trilha=200,
+                               invalidos={"digito": 0.02, "disf_malformada": 0.05})
+        observador = Observador([pasta], regras, caminho_indice=os.path.join(diretorio, "indice.sqlite"), atraso=0.05)
+        try:
+            inicio = time.perf_counter()
+            observador.varre()
+            validados = _aguarda_fila(observador)
+            print(f"Indexação inicial: {validados} arquivos em {time.perf_counter() - inicio:.2f}s")
+
+            inicio = time.perf_counter()
+            enfileirados = observador.varre()
+            print(f"Varredura sem mudanças: {(time.perf_counter() - inicio) * 1000:.1f} ms, {enfileirados} arquivo(s) na fila")
+            falhas += enfileirados != 0
+
+            alvo = caminhos[quantidade // 2]
+            with open(alvo, "wb") as f:
+                f.write(gera_eaf(3, 200, {"caractere_invalido": 0.1}, semente=quantidade))
+            inicio = time.perf_counter()
+            observador.varre()
+            validados = _aguarda_fila(observador)
+            tempo_incremental = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            for caminho in caminhos:
+                lote.valida_arquivo(caminho, regras)
+            tempo_completo = time.perf_counter() - inicio
+            print(f"Um arquivo alterado: {validados} validação(ões) em {tempo_incremental * 1000:.0f} ms "
+                  f"(pasta inteira: {tempo_completo * 1000:.0f} ms, {tempo_completo / tempo_incremental:.0f}x)")
+            falhas += validados != 1
+
+            for semente in range(5):
+                with open(alvo, "wb") as f:
+                    f.write(gera_eaf(3, 200, {"digito": 0.1}, semente=semente))
+                observador.notifica(alvo)
+            validados = _aguarda_fila(observador)
+            print(f"Cinco salvamentos seguidos: {validados} validação(ões)")
+            falhas += validados != 1
+
+            os.utime(alvo)
+            observador.notifica(alvo)
+            validados = _aguarda_fila(observador)
+            print(f"Salvo de novo sem mudança de conteúdo: {validados} validação(ões)")
+            falhas += validados != 0
+
+            esperado = lote.valida_arquivo(alvo, regras)
+            indexado = next(r for r in observador.indice.resultados([pasta]) if r["arquivo"] == alvo)
+            if {k: v for k, v in indexado.items() if k not in _CAMPOS_VARIAVEIS} != \
+                    {k: v for k, v in esperado.items() if k not in _CAMPOS_VARIAVEIS}:
+                print("DIVERGÊNCIA: resultado do índice difere de lote.valida_arquivo")
+                falhas += 1
+        finally:
+            observador.fecha()
+
+    print(f"Verificação: {falhas} falha(s)")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
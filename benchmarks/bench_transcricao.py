@@ -0,0 +1,94 @@
+"""
+Benchmark e verificação da representação compacta de anotações (cerberus.elan.Transcricao).
+
+1. Verificação diferencial: um arquivo sintético com defeitos é validado (IDs, conteúdo e
+   tempos) como pympi.Elan.Eaf, como a Transcricao do leitor nativo (le_eaf) e como a
+   Transcricao convertida do pympi (Transcricao.de_eaf); os relatórios precisam ser
+   idênticos, assim como as anotações e os ANNOTATION_ID de cada trilha.
+2. Memória e serialização: memória ocupada por cada representação (tracemalloc), tamanho e
+   tempo do pickle (como no envio a um pool de processos) e tempo de validação.
+
+Uso:
+    python benchmarks/bench_transcricao.py [anotacoes_por_trilha]
+"""
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from gerador import gera_eaf
+from cerberus import elan
+
+INVALIDOS = {"digito": 0.01, "disf_mal_posicionada": 0.01, "caractere_invalido": 0.03, "disf_malformada": 0.01}
+
+
+def _valida(eaf, regras):
+    id_valido, id_erros, mapeamento = elan.valida_id_trilhas(eaf, regras)
+    if not id_valido:
+        return id_erros, None, None
+    return id_erros, elan.valida_conteudo_trilhas(eaf, mapeamento), elan.valida_tempos_trilhas(eaf, mapeamento)
+
+
+def _memoria(construtor):
+    gc.collect()
+    tracemalloc.start()
+    objeto = construtor()
+    tamanho = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objeto, tamanho
+
+
+def main() -> int:
+    anotacoes_por_trilha = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    conteudo = gera_eaf(3, anotacoes_por_trilha, INVALIDOS)
+
+    # A memória medida é a que continua ocupada depois da leitura (a conversão do pympi
+    # reaproveita os textos do objeto de origem, que não entram na sua conta)
+    representacoes = {}
+    representacoes["pympi.Elan.Eaf"] = _memoria(lambda: elan.abre_eaf(conteudo, "sintetico.eaf")[1])
+    representacoes["Transcricao"] = _memoria(lambda: elan.le_eaf(conteudo, "sintetico.eaf")[1])
+    representacoes["de_eaf(pympi)"] = _memoria(
+        lambda: elan.Transcricao.de_eaf(representacoes["pympi.Elan.Eaf"][0], "sintetico.eaf")
+    )
+    convertida = representacoes["de_eaf(pympi)"][0]
+
+    referencia = _valida(representacoes["pympi.Elan.Eaf"][0], regras)
+    divergencias = 0
+    for nome, (objeto, _) in representacoes.items():
+        if _valida(objeto, regras) != referencia:
+            divergencias += 1
+            print(f"DIVERGÊNCIA: relatório de {nome} difere do relatório do pympi")
+    transcricao = representacoes["Transcricao"][0]
+    for nome_trilha in convertida.get_tier_names():
+        if (list(transcricao.get_annotation_data_for_tier(nome_trilha))
+                != list(convertida.get_annotation_data_for_tier(nome_trilha))
+                or transcricao.get_annotation_ids_for_tier(nome_trilha) != convertida.get_annotation_ids_for_tier(nome_trilha)):
+            divergencias += 1
+            print(f"DIVERGÊNCIA: anotações da trilha {nome_trilha}")
+    print(f"Verificação diferencial: {3 * anotacoes_por_trilha} anotações, {divergencias} divergência(s)")
+
+    print(f"\n{'representação':<16} {'memória (MiB)':>14} {'pickle (MiB)':>13} {'dumps (ms)':>11} {'loads (ms)':>11} {'validação (ms)':>15}")
+    for nome, (objeto, memoria) in representacoes.items():
+        inicio = time.perf_counter()
+        serializado = pickle.dumps(objeto, pickle.HIGHEST_PROTOCOL)
+        tempo_dumps = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        pickle.loads(serializado)
+        tempo_loads = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _valida(objeto, regras)
+        tempo_validacao = time.perf_counter() - inicio
+        print(f"{nome:<16} {memoria / 2**20:>14.2f} {len(serializado) / 2**20:>13.2f} {tempo_dumps * 1000:>11.1f} "
+              f"{tempo_loads * 1000:>11.1f} {tempo_validacao * 1000:>15.1f}")
+
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
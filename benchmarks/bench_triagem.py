@@ -0,0 +1,110 @@
+"""
+Benchmark e verificação dos modos de triagem (cerberus.elan.OrcamentoErros).
+
+Um corpus sintético com muitos defeitos (padrão: 200 arquivos; um em cada quatro com os
+nomes das trilhas em minúsculas) é validado por completo e em cada modo de triagem:
+    - primeiro erro por arquivo (max_erros=1);
+    - no máximo 3 erros por (código, trilha);
+    - no máximo 10 erros por arquivo.
+
+Para cada modo são medidos o tempo das etapas de validação (IDs, conteúdo e tempos, sobre
+arquivos já lidos) e o tempo total de 'lote.valida_arquivo' (leitura incluída, que na triagem
+para quando o orçamento acaba). A verificação, nas duas medições, exige que todo arquivo
+tenha o mesmo resultado (válido/inválido) que na validação completa e que os erros devolvidos
+estejam entre os da validação completa; um resultado de 'lote.valida_arquivo' não truncado
+precisa ser idêntico ao completo.
+
+Uso:
+    python benchmarks/bench_triagem.py [quantidade_de_arquivos]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from gerador import gera_eaf
+from cerberus import elan, lote
+
+INVALIDOS_TRIAGEM = {"digito": 0.1, "disf_mal_posicionada": 0.1, "caractere_invalido": 0.2, "disf_malformada": 0.2}
+
+MODOS = {
+    "completo": None,
+    "primeiro_erro": elan.OrcamentoErros(max_erros=1),
+    "max_por_grupo=3": elan.OrcamentoErros(max_por_grupo=3),
+    "max_erros=10": elan.OrcamentoErros(max_erros=10),
+}
+
+
+def _valida_etapas(eaf, regras, orcamento):
+    orcamento = orcamento.novo() if orcamento is not None else None
+    id_valido, _, mapeamento = elan.valida_id_trilhas(eaf, regras, orcamento=orcamento)
+    if not id_valido:
+        return False, None
+    conteudo = elan.valida_conteudo_estruturado(eaf, mapeamento, orcamento=orcamento)
+    tempos = elan.valida_tempos_estruturado(eaf, mapeamento, orcamento=orcamento)
+    return not conteudo and not tempos, (conteudo, tempos)
+
+
+def _codigos(erros):
+    if erros is None:
+        return set()
+    return {(grupo.primeiro.codigo, grupo.primeiro.caracteres, grupo.primeiro.trilha)
+            for agregador in erros for grupo in agregador}
+
+
+def _codigos_resultado(resultado):
+    detalhes = [resultado.get("conteudo_detalhes"), resultado.get("tempo_detalhes")]
+    return {(erro["codigo"], erro["caracteres"], erro["trilha"])
+            for dados in detalhes if dados for grupo in dados["grupos"] for erro in grupo["exemplos"][:1]}
+
+
+def _sem_duracao(resultado):
+    return {chave: valor for chave, valor in resultado.items() if chave != "duracao"}
+
+
+def main() -> int:
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    conteudos = [
+        (f"a{i}.eaf", gera_eaf(3, 2000, INVALIDOS_TRIAGEM,
+                               padrao_nomes="minusculas" if i % 4 == 3 else "entrevista", semente=i))
+        for i in range(quantidade)
+    ]
+    eafs = [elan.le_eaf(conteudo, nome)[1] for nome, conteudo in conteudos]
+    print(f"Corpus: {quantidade} arquivos, {sum(len(c) for _, c in conteudos) / 2**20:.1f} MiB")
+
+    referencia = None
+    divergencias = 0
+    print(f"{'modo':<18} {'etapas (s)':>11} {'ganho':>7} {'total (s)':>10} {'ganho':>7} {'truncados':>10}")
+    for nome_modo, orcamento in MODOS.items():
+        inicio = time.perf_counter()
+        resultados = [_valida_etapas(eaf, regras, orcamento) for eaf in eafs]
+        tempo_etapas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        completos = [lote.valida_arquivo(conteudo, regras, nome, orcamento=orcamento) for nome, conteudo in conteudos]
+        tempo_total = time.perf_counter() - inicio
+
+        if referencia is None:
+            referencia = (resultados, tempo_etapas, tempo_total, completos)
+        else:
+            for (valido, erros), (valido_ref, erros_ref) in zip(resultados, referencia[0]):
+                if valido != valido_ref or not _codigos(erros) <= _codigos(erros_ref):
+                    divergencias += 1
+            for resultado, resultado_ref in zip(completos, referencia[3]):
+                if (resultado["valido"] != resultado_ref["valido"]
+                        or not _codigos_resultado(resultado) <= _codigos_resultado(resultado_ref)
+                        or (not resultado["truncado"] and _sem_duracao(resultado) != _sem_duracao(resultado_ref))):
+                    divergencias += 1
+        truncados = sum(r["truncado"] for r in completos)
+        print(f"{nome_modo:<18} {tempo_etapas:>11.3f} {referencia[1] / tempo_etapas:>6.1f}x "
+              f"{tempo_total:>10.3f} {referencia[2] / tempo_total:>6.1f}x {truncados:>10}")
+
+    print(f"Verificação: {divergencias} divergência(s) de resultado em relação à validação completa")
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
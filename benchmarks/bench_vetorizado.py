@@ -0,0 +1,109 @@
+"""
+Benchmark e verificação diferencial da validação de conteúdo vetorizada (cerberus.vetorizado).
+
+1. Verificação diferencial: anotações com o formato das transcrições reais e ruído Unicode
+   (as mesmas de bench_conteudo.py) são validadas como trilhas INF e DISF pelos kernels do
+   Arrow e pelos validadores por anotação; os códigos de erro precisam ser idênticos.
+2. Vazão: um corpus sintético de N arquivos (padrão: 1000) é validado arquivo a arquivo
+   (le_eaf + valida_conteudo_trilhas) e de uma vez (tabela_anotacoes + valida_tabela).
+
+Uso:
+    python benchmarks/bench_vetorizado.py [quantidade_de_arquivos]
+"""
+import collections
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import pyarrow as pa
+
+from bench_conteudo import gera_anotacoes
+from gerador import gera_corpus
+from cerberus import elan, vetorizado
+from cerberus.elan.validador import _VALIDADORES_CONTEUDO
+
+
+def verificacao_diferencial(quantidade: int = 200_000) -> int:
+    # Surrogates isolados não podem aparecer em um XML (nem em UTF-8) e ficam de fora
+    valores = [v for v in gera_anotacoes(quantidade, semente=7) if not any("\ud800" <= c <= "\udfff" for c in v)]
+    # Anotações vazias, só com espaços Unicode e disfluências em variações de caixa
+    valores += ["", " ", " 　", "(est)", "(eſt)", "((RISOS))", "((A B))", "((a))", "(( x\n))", " (HES) "]
+    tipos = ["INF", "DISF"]
+    tabela = pa.table({
+        "arquivo": pa.array(["teste"] * (2 * len(valores))).dictionary_encode(),
+        "trilha": pa.array([t for t in tipos for _ in valores]).dictionary_encode(),
+        "content_type": pa.array([t for t in tipos for _ in valores]).dictionary_encode(),
+        "inicio": pa.array(list(range(2 * len(valores))), pa.int64()),
+        "fim": pa.array(list(range(2 * len(valores))), pa.int64()),
+        "valor": pa.array(valores + valores, pa.string()),
+    })
+
+    esperado = collections.defaultdict(list)
+    for indice, (tipo, valor) in enumerate((t, v) for t in tipos for v in valores):
+        if valor and valor.strip():
+            esperado[indice] = _VALIDADORES_CONTEUDO[tipo](valor.strip())
+    obtido = collections.defaultdict(list)
+    erros = vetorizado.valida_tabela(tabela)
+    for indice, codigo, caracteres in zip(erros.column("inicio").to_pylist(), erros.column("codigo").to_pylist(),
+                                          erros.column("caracteres").to_pylist()):
+        obtido[indice].append((codigo, caracteres))
+
+    divergencias = [i for i in set(esperado) | set(obtido) if esperado.get(i, []) != obtido.get(i, [])]
+    for indice in divergencias[:10]:
+        print(f"DIVERGÊNCIA: {(valores + valores)[indice]!r}: esperado {esperado.get(indice)}, obtido {obtido.get(indice)}")
+    print(f"Verificação diferencial: {2 * len(valores)} anotações, {len(divergencias)} divergência(s)")
+    return len(divergencias)
+
+
+def vazao(quantidade_arquivos: int) -> None:
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    with tempfile.TemporaryDirectory() as diretorio:
+        gera_corpus(diretorio, quantidade_arquivos, num_trilhas=3, anotacoes_por_trilha=200,
+                    invalidos={"digito": 0.02, "caractere_invalido": 0.02, "disf_malformada": 0.05})
+        caminhos = sorted(str(p) for p in Path(diretorio).glob("*.eaf"))
+        conteudos = [(os.path.basename(c), Path(c).read_bytes()) for c in caminhos]
+
+        inicio = time.perf_counter()
+        eafs = []
+        for nome, conteudo in conteudos:
+            _, eaf = elan.le_eaf(conteudo, nome)
+            id_valido, _, mapeamento = elan.valida_id_trilhas(eaf, regras)
+            eafs.append((eaf, mapeamento))
+        tempo_leitura = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for eaf, mapeamento in eafs:
+            elan.valida_conteudo_trilhas(eaf, mapeamento)
+        tempo_por_arquivo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        tabela = vetorizado.tabela_anotacoes(conteudos, regras)
+        tempo_tabela = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        erros = vetorizado.valida_tabela(tabela)
+        tempo_vetorizado = time.perf_counter() - inicio
+
+    anotacoes = tabela.num_rows
+    print(f"Corpus: {quantidade_arquivos} arquivos, {anotacoes} anotações, {erros.num_rows} erros")
+    print(f"Leitura + IDs (le_eaf):            {tempo_leitura:8.3f}s")
+    print(f"Conteúdo arquivo a arquivo:        {tempo_por_arquivo:8.3f}s  ({anotacoes / tempo_por_arquivo:,.0f} anotações/s)")
+    print(f"Montagem da tabela (com leitura):  {tempo_tabela:8.3f}s")
+    print(f"Conteúdo vetorizado (valida_tabela):{tempo_vetorizado:7.3f}s  ({anotacoes / tempo_vetorizado:,.0f} anotações/s)")
+    print(f"Ganho na validação de conteúdo: {tempo_por_arquivo / tempo_vetorizado:.1f}x")
+
+
+def main() -> int:
+    quantidade_arquivos = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    divergencias = verificacao_diferencial()
+    vazao(quantidade_arquivos)
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Gerador determinístico de arquivos .eaf sintéticos para os benchmarks.
+
+O mesmo conjunto de parâmetros (incluindo a semente) sempre gera exatamente os mesmos bytes.
+"""
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+_PALAVRAS = [
+    "eu", "ele", "ela", "a", "gente", "foi", "lá", "na", "casa", "da", "minha", "mãe", "ação",
+    "você", "né", "então", "aí", "tá", "porque", "é", "não", "sim", "criança", "avó", "pé", "café",
+    "trabalhava", "roça", "escola", "depois", "quando", "era", "pequena", "sabe", "assim", "muito",
+]
+
+# Tipos de conteúdo inválido que podem ser injetados nas anotações
+TIPOS_INVALIDOS = ("digito", "disf_mal_posicionada", "caractere_invalido", "disf_malformada")
+
+# Nomes de trilha de cada padrão; {i} é substituído pelo índice da trilha extra
+PADROES_NOMES = {
+    "entrevista": ["DISF", "DOC", "INF{i}X"],
+    "minusculas": ["disf", "doc", "inf{i}x"],
+    "aleatorio": ["T{i}"],
+}
+
+
+def nomes_trilhas(num_trilhas: int, padrao: str = "entrevista") -> List[str]:
+    """
+    Gera 'num_trilhas' nomes de trilha seguindo um dos padrões de PADROES_NOMES.
+    """
+    modelos = PADROES_NOMES[padrao]
+    fixos = [m for m in modelos if "{i}" not in m]
+    extra = next((m for m in modelos if "{i}" in m), "T{i}")
+    nomes = fixos[:num_trilhas]
+    nomes += [extra.format(i=i) for i in range(num_trilhas - len(nomes))]
+    return nomes
+
+
+def _tipo_conteudo(nome_trilha: str) -> str:
+    nome = nome_trilha.upper()
+    if nome == "DISF":
+        return "DISF"
+    if nome.startswith("DOC"):
+        return "DOC"
+    return "INF"
+
+
+def _gera_valor(gerador: random.Random, tipo_conteudo: str, invalidos: Dict[str, float]) -> str:
+    sorteio = gerador.random()
+    acumulado = 0.0
+    defeito = None
+    for tipo, proporcao in invalidos.items():
+        acumulado += proporcao
+        if sorteio < acumulado:
+            defeito = tipo
+            break
+
+    if tipo_conteudo == "DISF":
+        if defeito == "disf_malformada":
+            return gerador.choice(["((risos)", "(risos))", "((Tosse))", "(est)", "((123))"])
+        if defeito is not None:
+            return gerador.choice(["eh", "hum", "(EST", "HES"])
+        return gerador.choice(["(EST)", "(HES)", "((RISOS))", "((TOSSE))"])
+
+    palavras = [gerador.choice(_PALAVRAS) for _ in range(gerador.randint(3, 20))]
+    posicao = gerador.randrange(len(palavras))
+    if defeito == "digito":
+        palavras[posicao] = str(gerador.randint(1, 2024))
+    elif defeito == "disf_mal_posicionada":
+        palavras[posicao] = gerador.choice(["(EST)", "(HES)", "((risos))"])
+    elif defeito == "caractere_invalido":
+        palavras[posicao] += gerador.choice([",", ".", "!", ";", "@", "…", "ñ"])
+    elif defeito == "disf_malformada":
+        palavras[posicao] = gerador.choice(["((risos)", "(risos))", "(( ))"])
+    return " ".join(palavras)
+
+
+def _gera_intervalos(gerador: random.Random, quantidade: int) -> List[Tuple[int, int]]:
+    """
+    Trechos (inicio, fim) consecutivos, sem sobreposição e separados por pausas.
+    """
+    intervalos = []
+    tempo = 0
+    for _ in range(quantidade):
+        tempo += gerador.randint(50, 800)
+        fim = tempo + gerador.randint(200, 6000)
+        intervalos.append((tempo, fim))
+        tempo = fim
+    return intervalos
+
+
+def _gera_intervalos_contidos(gerador: random.Random, trechos: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Um trecho dentro de cada trecho de fala, como as disfluências de uma transcrição real.
+    """
+    intervalos = []
+    for inicio_fala, fim_fala in trechos:
+        inicio = inicio_fala + gerador.randint(0, (fim_fala - inicio_fala) // 2)
+        intervalos.append((inicio, gerador.randint(inicio + 1, fim_fala)))
+    return intervalos
+
+
+def gera_eaf(num_trilhas: int = 3, anotacoes_por_trilha: int = 1000, invalidos: Optional[Dict[str, float]] = None,
+             padrao_nomes: str = "entrevista", semente: int = 0) -> bytes:
+    """
+    Gera o conteúdo de um arquivo .eaf sintético.
+
+    :param num_trilhas: Quantidade de trilhas.
+    :type num_trilhas: int
+    :param anotacoes_por_trilha: Quantidade de anotações em cada trilha.
+    :type anotacoes_por_trilha: int
+    :param invalidos: Proporção (0 a 1) de anotações com cada tipo de defeito de TIPOS_INVALIDOS.
+                      Ex: {'digito': 0.01, 'caractere_invalido': 0.05}. None gera só conteúdo válido
+                      (e tempos válidos: as anotações DISF ficam dentro dos trechos da primeira
+                      trilha INF/DOC, se houver uma).
+    :type invalidos: Optional[Dict[str, float]]
+    :param padrao_nomes: Padrão de nomes de trilha (chave de PADROES_NOMES).
+    :type padrao_nomes: str
+    :param semente: Semente do gerador pseudoaleatório.
+    :type semente: int
+    :return: Bytes do arquivo .eaf (UTF-8).
+    :rtype: bytes
+    """
+    invalidos = dict(invalidos or {})
+    desconhecidos = set(invalidos) - set(TIPOS_INVALIDOS)
+    if desconhecidos:
+        raise ValueError(f"Tipos de defeito desconhecidos: {sorted(desconhecidos)}. Esperado um de {TIPOS_INVALIDOS}.")
+
+    gerador = random.Random(semente)
+    trilhas = nomes_trilhas(num_trilhas, padrao_nomes)
+
+    # Trechos das trilhas de fala (INF/DOC) primeiro: as disfluências são posicionadas dentro deles
+    intervalos: Dict[str, List[Tuple[int, int]]] = {}
+    for nome_trilha in trilhas:
+        if _tipo_conteudo(nome_trilha) != "DISF":
+            intervalos[nome_trilha] = _gera_intervalos(gerador, anotacoes_por_trilha)
+    fala = next(iter(intervalos.values()), None)
+    for nome_trilha in trilhas:
+        if nome_trilha not in intervalos:
+            intervalos[nome_trilha] = (_gera_intervalos_contidos(gerador, fala) if fala is not None
+                                       else _gera_intervalos(gerador, anotacoes_por_trilha))
+
+    slots: List[str] = []
+    corpo_trilhas: List[str] = []
+    id_anotacao = 0
+    for nome_trilha in trilhas:
+        tipo_conteudo = _tipo_conteudo(nome_trilha)
+        partes = [f'\t<TIER LINGUISTIC_TYPE_REF="default-lt" TIER_ID={quoteattr(nome_trilha)}>\n']
+        for tempo, fim in intervalos[nome_trilha]:
+            id_slot_inicio, id_slot_fim = len(slots) + 1, len(slots) + 2
+            slots.append(f'\t\t<TIME_SLOT TIME_SLOT_ID="ts{id_slot_inicio}" TIME_VALUE="{tempo}"/>\n')
+            slots.append(f'\t\t<TIME_SLOT TIME_SLOT_ID="ts{id_slot_fim}" TIME_VALUE="{fim}"/>\n')
+            id_anotacao += 1
+            partes.append(
+                f'\t\t<ANNOTATION><ALIGNABLE_ANNOTATION ANNOTATION_ID="a{id_anotacao}" '
+                f'TIME_SLOT_REF1="ts{id_slot_inicio}" TIME_SLOT_REF2="ts{id_slot_fim}">'
+                f'<ANNOTATION_VALUE>{escape(_gera_valor(gerador, tipo_conteudo, invalidos))}</ANNOTATION_VALUE>'
+                f'</ALIGNABLE_ANNOTATION></ANNOTATION>\n'
+            )
+        partes.append("\t</TIER>\n")
+        corpo_trilhas.append("".join(partes))
+
+    documento = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<ANNOTATION_DOCUMENT AUTHOR="cerberus-benchmarks" DATE="2026-01-01T00:00:00+00:00" FORMAT="3.0" VERSION="3.0" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:noNamespaceSchemaLocation="http://www.mpi.nl/tools/elan/EAFv3.0.xsd">\n'
+        '\t<HEADER MEDIA_FILE="" TIME_UNITS="milliseconds"/>\n'
+        '\t<TIME_ORDER>\n' + "".join(slots) + '\t</TIME_ORDER>\n'
+        + "".join(corpo_trilhas)
+        + '\t<LINGUISTIC_TYPE GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="default-lt" TIME_ALIGNABLE="true"/>\n'
+        '</ANNOTATION_DOCUMENT>\n'
+    )
+    return documento.encode("utf-8")
+
+
+def gera_corpus(diretorio: str, quantidade: int, semente: int = 0, **parametros) -> List[str]:
+    """
+    Grava 'quantidade' arquivos .eaf sintéticos em 'diretorio' (um por semente consecutiva).
+
+    :return: Caminhos dos arquivos gerados.
+    :rtype: List[str]
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for i in range(quantidade):
+        caminho = os.path.join(diretorio, f"sintetico_{i:05d}.eaf")
+        with open(caminho, "wb") as f:
+            f.write(gera_eaf(semente=semente + i, **parametros))
+        caminhos.append(caminho)
+    return caminhos
@@ -1,26 +1,254 @@
 import sys
 
 sys.path.append("src")
+import concurrent.futures
 import datetime
+import io
+import json
+import os
+import queue
+import threading
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
 
 import streamlit as st
 
-from cerberus import elan
+from cerberus import elan, lote, pacotes, relatorios
+from cerberus.cache import caminho_cache_padrao
+from cerberus.instrumentacao import Instrumentacao
 
 st.set_page_config(
     page_title="Cerberus",
     layout="wide",
 )
 
-regras_entrevista = {
-    "num_trilhas": 3, 
-    "maiusculas": True,
-    "regras_trilhas": [
-        {"type": "exato", "value": "DISF", "content_type": "DISF"},
-        {"type": "comeca", "value": "DOC", "content_type": "DOC"},
-        {"type": "regex", "value": r"^[A-Z]+\d?[A-Z]+$", "content_type": "INF"}
-    ]
-}
+regras_entrevista = elan.REGRAS_ENTREVISTA
+
+@st.cache_resource
+def carrega_regras() -> elan.RuleSet:
+    # Compila as regras uma única vez por processo do servidor
+    return elan.RuleSet(regras_entrevista)
+
+@st.cache_resource
+def carrega_pool():
+    # Pool de processos compartilhado por todas as sessões: uploads são validados em segundo plano.
+    # Cada trabalhador abre o cache de resultados por conteúdo do arquivo: reexecuções da página
+    # não revalidam o mesmo upload
+    return lote.cria_pool(carrega_regras(), caminho_cache=caminho_cache_padrao(), memo_layouts=True)
+
+@st.cache_resource
+def trava_pool() -> threading.Lock:
+    # Serializa a troca do pool quebrado entre as sessões e as threads de leitura de pacotes
+    return threading.Lock()
+
+def envia_ao_pool(conteudo: bytes, nome_arquivo: str) -> concurrent.futures.Future:
+    pool = carrega_pool()
+    try:
+        return pool.submit(lote.valida_no_trabalhador, conteudo, nome_arquivo, True)
+    except BrokenProcessPool:
+        # Um trabalhador morreu (ex: falta de memória) e o pool guardado não aceita mais tarefas:
+        # ele é descartado e recriado, a não ser que outra sessão já tenha feito isso
+        with trava_pool():
+            if carrega_pool() is pool:
+                carrega_pool.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+        return carrega_pool().submit(lote.valida_no_trabalhador, conteudo, nome_arquivo, True)
+
+def valida_em_segundo_plano(conteudo: bytes, nome_arquivo: str) -> concurrent.futures.Future:
+    # O futuro devolvido sobrevive à troca do pool: um arquivo em validação quando o pool quebrou
+    # é reenviado uma vez ao pool novo; se quebrar de novo, o erro aparece no relatório.
+    # O conteúdo só fica guardado enquanto um reenvio ainda é possível
+    resultado = concurrent.futures.Future()
+    reenvio = {"conteudo": conteudo}
+
+    def repassa(interno: concurrent.futures.Future) -> None:
+        if interno.cancelled():
+            resultado.cancel()
+            return
+        erro = interno.exception()
+        conteudo_reenvio = reenvio.pop("conteudo", None)
+        if isinstance(erro, BrokenProcessPool) and conteudo_reenvio is not None and not resultado.cancelled():
+            try:
+                novo = envia_ao_pool(conteudo_reenvio, nome_arquivo)
+            except Exception as erro_envio:
+                erro = erro_envio
+            else:
+                resultado.add_done_callback(lambda r: r.cancelled() and novo.cancel())
+                novo.add_done_callback(repassa)
+                return
+        try:
+            if erro is None:
+                resultado.set_result(interno.result())
+            else:
+                resultado.set_exception(erro)
+        except concurrent.futures.InvalidStateError:
+            # A página cancelou a tarefa (arquivo removido do seletor) enquanto ela terminava
+            pass
+
+    interno = envia_ao_pool(conteudo, nome_arquivo)
+    resultado.add_done_callback(lambda r: r.cancelled() and interno.cancel())
+    interno.add_done_callback(repassa)
+    return resultado
+
+# Máximo de membros de pacotes lidos e enviados ao pool ainda sem resultado, por sessão (como em lote.valida_corpus)
+MAX_MEMBROS_PENDENTES = 2 * (os.cpu_count() or 1)
+
+def envia_membros(pacote, id_pacote: str, novas_tarefas: queue.Queue, vagas: threading.Semaphore,
+                  parar: threading.Event) -> None:
+    # Executado em segundo plano: os membros são lidos do pacote um a um, sem extração em disco,
+    # e cada um só é lido quando há vaga entre os membros em validação. As tarefas vão para a
+    # fila 'novas_tarefas', recolhida pela página (ver recolhe_tarefas): o session_state só é
+    # alterado pela thread da página
+    try:
+        for nome_membro, conteudo in pacotes.le_membros(pacote, pacote.name):
+            while not vagas.acquire(timeout=0.5):
+                if parar.is_set():
+                    return
+            if parar.is_set():
+                vagas.release()
+                return
+            futuro = valida_em_segundo_plano(conteudo, nome_membro)
+            futuro.add_done_callback(lambda _: vagas.release())
+            novas_tarefas.put((f"{id_pacote}::{nome_membro}", (nome_membro, futuro)))
+    except Exception as e:
+        # O erro de leitura aparece no painel como o resultado de um arquivo com erro crítico
+        falha = concurrent.futures.Future()
+        falha.set_exception(RuntimeError(f"Não foi possível ler o pacote {pacote.name}: {type(e).__name__}: {e}"))
+        novas_tarefas.put((f"{id_pacote}::", (pacote.name, falha)))
+
+def leitura_concluida() -> bool:
+    return not any(leitor.is_alive() for leitor, _ in st.session_state.leitores.values())
+
+def recolhe_tarefas() -> None:
+    # Move para 'tarefas' o que os leitores de pacotes enviaram; tarefas de um pacote já
+    # removido do seletor são descartadas
+    tarefas, leitores = st.session_state.tarefas, st.session_state.leitores
+    while True:
+        try:
+            chave, tarefa = st.session_state.novas_tarefas.get_nowait()
+        except queue.Empty:
+            return
+        if chave.split("::", 1)[0] in leitores:
+            tarefas[chave] = tarefa
+        else:
+            tarefa[1].cancel()
+
+def monta_relatorio(nome_arquivo: str, resultado: dict) -> str:
+    saida = io.StringIO()
+    relatorios.EscritorTexto(saida).escreve(dict(resultado, arquivo=nome_arquivo))
+
+    if st.session_state.get("inclui_tempos") and resultado.get("instrumentacao"):
+        instrumentacao = Instrumentacao()
+        instrumentacao.mescla(resultado["instrumentacao"])
+        saida.write("\n--- TEMPOS DE EXECUÇÃO ---\n")
+        saida.write(instrumentacao.para_texto())
+    return saida.getvalue()
+
+def nome_relatorio(nome_arquivo: str, extensao: str = "txt") -> str:
+    timestamp_file = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Arquivos de dentro de um .zip trazem o caminho no nome ("pacote.zip/pasta/arquivo.eaf")
+    return f"cerberus_report_{nome_arquivo.replace('.eaf', '').replace('/', '_')}_{timestamp_file}.{extensao}"
+
+def exibe_resultado(nome_arquivo: str, resultado: dict, chave: str) -> None:
+    if resultado["erro"]:
+        st.error(f"Ocorreu um erro crítico ao processar o arquivo:")
+        st.code(resultado["erro"])
+        return
+
+    # --- Etapa 1: Validação de IDs ---
+    st.markdown("##### Resultados da Validação de IDs")
+    if resultado["id_valido"]:
+        st.success("✅ Identificadores (IDs) das trilhas válidos.")
+    else:
+        st.error("❌ Erros encontrados nos identificadores (IDs) das trilhas.")
+        with st.expander("**Verifique os erros de ID**", expanded=True):
+            for erro in resultado["id_erros"]:
+                st.write(f"- {erro}")
+
+    # --- Etapa 2: Validação de Conteúdo ---
+    st.markdown("##### Resultados da Validação de Conteúdo")
+    if not resultado["id_valido"]:
+        st.warning("⚠️ Validação de conteúdo não executada. É necessário corrigir os identificadores (IDs) das trilhas primeiro.")
+    elif resultado["conteudo_valido"]:
+        st.success("✅ Conteúdo das transcrições válido.")
+    else:
+        st.error("❌ Erros encontrados no conteúdo das transcrições.")
+        with st.expander("Verifique os erros de transcrição", expanded=True):
+            for erro in resultado["conteudo_erros"]:
+                st.write(f"- {erro}")
+
+    # --- Etapa 3: Validação Temporal ---
+    st.markdown("##### Resultados da Validação Temporal")
+    if not resultado["id_valido"]:
+        st.warning("⚠️ Validação temporal não executada. É necessário corrigir os identificadores (IDs) das trilhas primeiro.")
+    elif resultado["tempo_valido"] is None:
+        st.warning("⚠️ Validação temporal não executada (limite de erros atingido).")
+    elif resultado["tempo_valido"]:
+        st.success("✅ Tempos das anotações válidos.")
+    else:
+        st.error("❌ Erros encontrados nos tempos das anotações (sobreposições, durações ou disfluências fora da fala).")
+        with st.expander("Verifique os erros de tempo", expanded=True):
+            for erro in resultado["tempo_erros"]:
+                st.write(f"- {erro}")
+
+    st.download_button(
+        label="Clique aqui para baixar o Relatório de Erros (.txt)",
+        data=monta_relatorio(nome_arquivo, resultado),
+        file_name=nome_relatorio(nome_arquivo),
+        mime="text/plain",
+        key=f"download_{chave}",
+    )
+
+def monta_relatorio_combinado(concluidas: list) -> bytes:
+    # Um .txt por arquivo, um resultados.json com todos os resultados estruturados e os erros em CSV e HTML
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as pacote:
+        for nome_arquivo, resultado in concluidas:
+            pacote.writestr(nome_relatorio(nome_arquivo), monta_relatorio(nome_arquivo, resultado))
+        pacote.writestr("resultados.json", json.dumps([r for _, r in concluidas], ensure_ascii=False, indent=2))
+        for formato, nome in (("csv", "erros.csv"), ("html", "relatorio.html")):
+            with io.TextIOWrapper(pacote.open(nome, "w"), encoding="utf-8", newline="") as destino:
+                with relatorios.cria_escritor(formato, destino) as escritor:
+                    escritor.escreve_todos(dict(resultado, arquivo=nome_arquivo) for nome_arquivo, resultado in concluidas)
+    return buffer.getvalue()
+
+def painel_resultados() -> None:
+    # A situação dos leitores é lida antes de recolher a fila: um leitor já encerrado não deixa tarefas para trás
+    lendo = not leitura_concluida()
+    recolhe_tarefas()
+    tarefas = dict(st.session_state.tarefas)
+    concluidas = [(nome, futuro) for nome, futuro in tarefas.values() if futuro.done()]
+    st.progress(len(concluidas) / max(1, len(tarefas)),
+                text=f"{len(concluidas)} de {len(tarefas)}{'+' if lendo else ''} arquivo(s) validado(s)")
+
+    resultados = []
+    for chave, (nome_arquivo, futuro) in tarefas.items():
+        st.markdown(f"### Relatório de Validação para `{nome_arquivo}`")
+        with st.container(border=True):
+            if not futuro.done():
+                st.info("⏳ Validando...")
+                continue
+            try:
+                resultado = futuro.result()
+            except BrokenProcessPool:
+                resultado = lote._resultado_falha(nome_arquivo, "O processo de validação foi encerrado inesperadamente ao ler este arquivo.")
+            except Exception as e:
+                resultado = {"arquivo": nome_arquivo, "valido": False, "erro": f"{type(e).__name__}: {e}"}
+            resultados.append((nome_arquivo, resultado))
+            exibe_resultado(nome_arquivo, resultado, chave)
+
+    if not lendo and len(resultados) == len(tarefas):
+        if st.session_state.get("acompanhando"):
+            # Terminou: recarrega a página inteira para parar a atualização periódica
+            st.session_state.acompanhando = False
+            st.rerun()
+        if len(resultados) > 1:
+            st.download_button(
+                label="Baixar todos os relatórios (.zip)",
+                data=monta_relatorio_combinado(resultados),
+                file_name=nome_relatorio("lote", "zip"),
+                mime="application/zip",
+            )
 
 st.markdown("""
             ## Cerberus 
@@ -29,82 +257,67 @@ st.markdown("""
 
 with st.expander(label="**Instruções de uso**", expanded=True):
     st.markdown("""
-        1. **Seleção do Arquivo**: Use o seletor de arquivos abaixo para carregar um arquivo `.eaf` do seu computador.
-        2. **Validação**: Após o upload, o sistema irá automaticamente validar os identificadores das trilhas e todas as transcrições contidas no arquivo. Todas as normas de transcrição podem ser encontradas em: [Normas de transcrição - GELINS](https://github.com/tuliosg/cerberus/blob/dev/docs/normas%20de%20transcrição%20GELINS.pdf).
-        3. **Resultados**: O resultado da validação será exibido na tela no formato de um relatório.
+        1. **Seleção dos Arquivos**: Use o seletor de arquivos abaixo para carregar um ou mais arquivos `.eaf` do seu computador, ou pacotes `.zip` com arquivos `.eaf` (validados sem extração).
+        2. **Validação**: Após o upload, o sistema irá automaticamente validar os identificadores das trilhas, todas as transcrições contidas em cada arquivo e os tempos das anotações (sobreposições, durações e disfluências fora dos trechos de fala), em segundo plano. Todas as normas de transcrição podem ser encontradas em: [Normas de transcrição - GELINS](https://github.com/tuliosg/cerberus/blob/dev/docs/normas%20de%20transcrição%20GELINS.pdf).
+        3. **Resultados**: O resultado de cada arquivo é exibido no formato de um relatório assim que fica pronto. Com vários arquivos, todos os relatórios podem ser baixados de uma vez em um `.zip`.
     """
     )
 
-uploaded_file = st.file_uploader("Selecione um arquivo .eaf para validar", type=['eaf'])
+uploaded_files = st.file_uploader("Selecione um ou mais arquivos .eaf (ou pacotes .zip com arquivos .eaf) para validar", type=['eaf', 'zip'], accept_multiple_files=True)
+st.checkbox("Incluir tempos de execução por etapa no relatório", key="inclui_tempos")
 
-if uploaded_file is not None:
-    st.markdown("---")
-    st.markdown(f"### Relatório de Validação para `{uploaded_file.name}`")
-    with st.container(border=True):
-        timestamp_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        relatorio_texto = f"Relatório de Validação Cerberus\n"
-        relatorio_texto += f"Arquivo: {uploaded_file.name}\n"
-        relatorio_texto += f"Data: {timestamp_str}\n"
-        relatorio_texto += "=" * 40 + "\n\n"
-        
-        try:
-            file_bytes = uploaded_file.getvalue()
-            nome_arquivo, eaf = elan.abre_eaf(file_bytes, uploaded_file.name)
-            
-            # --- Etapa 1: Validação de IDs ---
-            id_valido, id_erros, mapeamento_conteudo = elan.valida_id_trilhas(eaf, regras_entrevista)
-            
-            relatorio_texto += "--- RESULTADO DA VALIDAÇÃO DE IDS ---\n"
-            st.markdown("##### Resultados da Validação de IDs")
-            if id_valido:
-                st.success("✅ Identificadores (IDs) das trilhas válidos.")
-                relatorio_texto += "Status: SUCESSO\n\n"
-            else:
-                st.error("❌ Erros encontrados nos identificadores (IDs) das trilhas.")
-
-                relatorio_texto += "Status: FALHA\n"
-                with st.expander("**Verifique os erros de ID**", expanded=True):
-                    for erro in id_erros:
-                        st.write(f"- {erro}")
-                        relatorio_texto += f"- {erro}\n"
-                relatorio_texto += "\n"
-
-            # --- Etapa 2: Validação de Conteúdo ---
-            st.markdown("##### Resultados da Validação de Conteúdo")
-            relatorio_texto += "--- RESULTADO DA VALIDAÇÃO DE CONTEÚDO ---\n"
-            
-            if not id_valido:
-                st.warning("⚠️ Validação de conteúdo não executada. É necessário corrigir os identificadores (IDs) das trilhas primeiro.")
-
-                relatorio_texto += "Status: NÃO EXECUTADO (IDs de trilha inválidos)\n"
-            else:
-                conteudo_valido, conteudo_erros = elan.valida_conteudo_trilhas(eaf, mapeamento_conteudo)
-                
-                if conteudo_valido:
-                    st.success("✅ Conteúdo das transcrições válido.")
-
-                    relatorio_texto += "Status: SUCESSO\n"
-                else:
-                    st.error("❌ Erros encontrados no conteúdo das transcrições.")
-                    relatorio_texto += "Status: FALHA\n"
-                    with st.expander("Verifique os erros de transcrição", expanded=True):
-                        for erro in conteudo_erros:
-                            st.write(f"- {erro}")
-                            relatorio_texto += f"- {erro}  "
-
-            timestamp_file = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            nome_arquivo_log = f"cerberus_report_{uploaded_file.name.replace('.eaf', '')}_{timestamp_file}.txt"
-            
-            st.download_button(
-                label="Clique aqui para baixar o Relatório de Erros (.txt)",
-                data=relatorio_texto,
-                file_name=nome_arquivo_log,
-                mime="text/plain"
+if "tarefas" not in st.session_state:
+    st.session_state.tarefas = {}
+    # Leitores em segundo plano dos pacotes: {file_id: (thread, evento de parada)}
+    st.session_state.leitores = {}
+    st.session_state.vagas = threading.BoundedSemaphore(MAX_MEMBROS_PENDENTES)
+    # Tarefas enviadas pelos leitores de pacotes: (chave, (nome, futuro))
+    st.session_state.novas_tarefas = queue.Queue()
+
+if uploaded_files:
+    tarefas = st.session_state.tarefas
+    ids_atuais = [uploaded_file.file_id for uploaded_file in uploaded_files]
+
+    # Descarta arquivos removidos do seletor e envia ao pool apenas os novos; a chave de um
+    # arquivo de dentro de um .zip é "<file_id do pacote>::<nome do membro>"
+    leitores = st.session_state.leitores
+    for id_pacote in [id_pacote for id_pacote in leitores if id_pacote not in ids_atuais]:
+        leitores.pop(id_pacote)[1].set()
+    recolhe_tarefas()
+    for chave in [chave for chave in list(tarefas) if chave.split("::", 1)[0] not in ids_atuais]:
+        tarefas.pop(chave)[1].cancel()
+    enviados = {chave.split("::", 1)[0] for chave in list(tarefas)} | set(leitores)
+    for uploaded_file in uploaded_files:
+        if uploaded_file.file_id in enviados:
+            continue
+        if pacotes.eh_pacote(uploaded_file.name):
+            parar = threading.Event()
+            leitor = threading.Thread(
+                target=envia_membros, daemon=True,
+                args=(uploaded_file, uploaded_file.file_id, st.session_state.novas_tarefas, st.session_state.vagas, parar),
             )
+            leitores[uploaded_file.file_id] = (leitor, parar)
+            leitor.start()
+            continue
+        futuro = valida_em_segundo_plano(uploaded_file.getvalue(), uploaded_file.name)
+        tarefas[uploaded_file.file_id] = (uploaded_file.name, futuro)
 
-        except Exception as e:
-            st.error(f"Ocorreu um erro crítico ao processar o arquivo:")
-            st.exception(e)
+    st.markdown("---")
+    concluida = leitura_concluida()
+    recolhe_tarefas()
+    if not tarefas and concluida:
+        st.warning("Nenhum arquivo .eaf encontrado nos arquivos selecionados.")
+    elif concluida and all(futuro.done() for _, futuro in tarefas.values()):
+        painel_resultados()
+    else:
+        st.session_state.acompanhando = True
+        st.fragment(painel_resultados, run_every=1.0)()
+else:
+    for _, parar in st.session_state.leitores.values():
+        parar.set()
+    st.session_state.tarefas = {}
+    st.session_state.leitores = {}
+    st.session_state.novas_tarefas = queue.Queue()
 
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.divider()
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from . import lote, observador, relatorios, servico
+from .cache import caminho_cache_padrao
+from .elan import OrcamentoErros
+from .instrumentacao import DestinoArquivo, Instrumentacao
+
+
+def _comando_valida(args: argparse.Namespace) -> int:
+    regras = lote.carrega_regras(args.regras)
+    caminhos = lote.encontra_arquivos(args.caminhos)
+
+    saida = open(args.saida, "w", encoding="utf-8", newline="") if args.saida else sys.stdout
+    escritor = relatorios.cria_escritor(args.formato or relatorios.formato_por_extensao(args.saida), saida)
+    total = validos = com_erro = anotacoes = acertos_cache = truncados = 0
+    orcamento = None
+    if args.primeiro_erro or args.max_erros is not None or args.max_por_grupo is not None:
+        orcamento = OrcamentoErros(1 if args.primeiro_erro else args.max_erros, args.max_por_grupo)
+    metricas = None
+    if args.metricas:
+        formato = "prometheus" if args.metricas.endswith((".prom", ".txt")) else "json"
+        metricas = Instrumentacao(DestinoArquivo(args.metricas, formato))
+    inicio = time.perf_counter()
+
+    try:
+        for resultado in lote.valida_corpus(caminhos, regras, num_processos=args.processos,
+                                            tamanho_lote=args.lote, caminho_cache=args.cache,
+                                            instrumenta=metricas is not None, orcamento=orcamento):
+            # Cada arquivo é gravado no relatório assim que termina
+            escritor.escreve(resultado)
+
+            total += 1
+            anotacoes += resultado.get("anotacoes", 0)
+            acertos_cache += bool(resultado.get("cache"))
+            truncados += bool(resultado.get("truncado"))
+            if metricas is not None and "instrumentacao" in resultado:
+                metricas.mescla(resultado["instrumentacao"])
+            if resultado.get("erro"):
+                com_erro += 1
+            elif resultado.get("valido"):
+                validos += 1
+        escritor.finaliza()
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    decorrido = time.perf_counter() - inicio
+    if metricas is not None:
+        metricas.conta("arquivos", total)
+        metricas.adiciona_tempo("execucao", decorrido)
+        metricas.publica()
+    print(
+        f"\nArquivos: {total} | Válidos: {validos} | Inválidos: {total - validos - com_erro} | Com erro de leitura: {com_erro}\n"
+        f"Tempo: {decorrido:.2f}s | {total / decorrido if decorrido else 0:.1f} arquivos/s | "
+        f"{anotacoes / decorrido if decorrido else 0:.0f} anotações/s"
+        + (f"\nCache: {acertos_cache} acertos, {total - acertos_cache} falhas" if args.cache else "")
+        + (f"\nTriagem: {truncados} relatório(s) truncado(s) pelo limite de erros" if orcamento is not None else ""),
+        file=sys.stderr,
+    )
+    return 0 if total and validos == total else 1
+
+
+def _comando_servidor(args: argparse.Namespace) -> int:
+    servico_validacao = servico.ServicoValidacao(
+        lote.carrega_regras(args.regras), num_processos=args.processos, max_fila=args.fila,
+        tempo_limite=args.tempo_limite, caminho_cache=args.cache,
+    )
+    print(f"Servindo em http://{args.host}:{args.porta} (POST /validate, POST /validate/batch, GET /metrics)", file=sys.stderr)
+    try:
+        asyncio.run(servico.executa_servidor(servico_validacao, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _comando_observa(args: argparse.Namespace) -> int:
+    for diretorio in args.diretorios:
+        if not os.path.isdir(diretorio):
+            print(f"Diretório não encontrado: {diretorio}", file=sys.stderr)
+            return 2
+
+    def exibe(resultado: Dict[str, Any]) -> None:
+        situacao = "ERRO" if resultado.get("erro") else "válido" if resultado.get("valido") else "inválido"
+        print(f"[{time.strftime('%H:%M:%S')}] {resultado['arquivo']}: {situacao}", file=sys.stderr)
+
+    observacao = observador.Observador(
+        args.diretorios, lote.carrega_regras(args.regras), caminho_indice=args.indice, num_processos=args.processos,
+        atraso=args.atraso, intervalo=args.intervalo, caminho_status=args.status, caminho_cache=args.cache,
+        ao_validar=exibe, usa_eventos=not args.varredura,
+    )
+    print(f"Observando {', '.join(observacao.diretorios)} (modo: {observacao.modo}; índice: {observacao.indice.caminho})",
+          file=sys.stderr)
+    try:
+        observacao.executa()
+    except KeyboardInterrupt:
+        pass
+    resumo = observacao.resumo()
+    observacao.fecha()
+    print(
+        f"\nArquivos: {resumo['arquivos']} | Válidos: {resumo['validos']} | Inválidos: {resumo['invalidos']} | "
+        f"Com erro de leitura: {resumo['com_erro']} | Validações nesta execução: {observacao.validacoes}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cerberus", description="Validador de transcrições ELAN (.eaf).")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_valida = subparsers.add_parser("valida", help="Valida arquivos .eaf em paralelo e grava um resultado JSONL por arquivo.")
+    parser_valida.add_argument("caminhos", nargs="+", help="Arquivos, diretórios, padrões glob (ex: 'corpus/**/*.eaf') ou pacotes .zip/.tar.gz, lidos sem extração.")
+    parser_valida.add_argument("-r", "--regras", default="entrevista", help="Conjunto de regras predefinido ou arquivo .json (padrão: entrevista).")
+    parser_valida.add_argument("-p", "--processos", type=int, default=None, help="Quantidade de processos (padrão: número de CPUs).")
+    parser_valida.add_argument("-l", "--lote", type=int, default=1, help="Quantidade de arquivos por tarefa enviada ao pool (padrão: 1).")
+    parser_valida.add_argument("-c", "--cache", nargs="?", const=caminho_cache_padrao(), default=None,
+                               help="Reaproveita resultados de arquivos não modificados (banco SQLite; padrão: ~/.cache/cerberus/resultados.sqlite).")
+    parser_valida.add_argument("-m", "--metricas", default=None,
+                               help="Grava tempos por etapa e contadores somados de todos os arquivos (.prom/.txt: formato Prometheus; demais: JSON).")
+    parser_valida.add_argument("--primeiro-erro", action="store_true",
+                               help="Triagem: para a validação de cada arquivo no primeiro erro encontrado.")
+    parser_valida.add_argument("--max-erros", type=int, default=None,
+                               help="Triagem: máximo de erros por arquivo; a validação do arquivo para ao atingi-lo.")
+    parser_valida.add_argument("--max-por-grupo", type=int, default=None,
+                               help="Triagem: máximo de erros por (código, trilha); a trilha deixa de ser percorrida ao atingi-lo.")
+    parser_valida.add_argument("-o", "--saida", default=None, help="Arquivo de saída (padrão: saída padrão).")
+    parser_valida.add_argument("-f", "--formato", choices=sorted(relatorios.ESCRITORES), default=None,
+                               help="Formato do relatório (padrão: deduzido da extensão de --saida, ou jsonl).")
+    parser_valida.set_defaults(funcao=_comando_valida)
+
+    parser_servidor = subparsers.add_parser("servidor", help="Serviço HTTP local de validação (POST /validate, POST /validate/batch, GET /metrics).")
+    parser_servidor.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1).")
+    parser_servidor.add_argument("--porta", type=int, default=8765, help="Porta de escuta (padrão: 8765).")
+    parser_servidor.add_argument("-r", "--regras", default="entrevista", help="Conjunto de regras predefinido ou arquivo .json (padrão: entrevista).")
+    parser_servidor.add_argument("-p", "--processos", type=int, default=None, help="Quantidade de processos (padrão: número de CPUs).")
+    parser_servidor.add_argument("--fila", type=int, default=64, help="Máximo de arquivos em validação ou na fila antes de responder 503 (padrão: 64).")
+    parser_servidor.add_argument("--tempo-limite", type=float, default=30.0, help="Tempo máximo de validação de cada arquivo, em segundos (padrão: 30).")
+    parser_servidor.add_argument("-c", "--cache", nargs="?", const=caminho_cache_padrao(), default=None,
+                                 help="Reaproveita resultados de arquivos já validados (banco SQLite).")
+    parser_servidor.set_defaults(funcao=_comando_servidor)
+
+    parser_observa = subparsers.add_parser("observa", help="Observa pastas e revalida cada arquivo .eaf assim que ele é salvo.")
+    parser_observa.add_argument("diretorios", nargs="+", help="Diretórios observados (recursivamente).")
+    parser_observa.add_argument("-r", "--regras", default="entrevista", help="Conjunto de regras predefinido ou arquivo .json (padrão: entrevista).")
+    parser_observa.add_argument("-p", "--processos", type=int, default=None, help="Quantidade de processos (padrão: número de CPUs).")
+    parser_observa.add_argument("-s", "--status", default=None,
+                                help="Relatório de situação da pasta, regravado a cada mudança (formato deduzido da extensão: .html, .csv, .txt, .jsonl).")
+    parser_observa.add_argument("-i", "--indice", default=None,
+                                help="Índice persistente dos arquivos e resultados (banco SQLite; padrão: ~/.cache/cerberus/indice.sqlite).")
+    parser_observa.add_argument("--atraso", type=float, default=1.0,
+                                help="Segundos sem novas mudanças antes de validar um arquivo salvo (padrão: 1).")
+    parser_observa.add_argument("--intervalo", type=float, default=2.0,
+                                help="Intervalo entre varreduras, em segundos, no modo de varredura (padrão: 2).")
+    parser_observa.add_argument("--varredura", action="store_true",
+                                help="Usa varredura periódica mesmo com o watchdog (inotify) disponível (ex: pastas de rede).")
+    parser_observa.add_argument("-c", "--cache", nargs="?", const=caminho_cache_padrao(), default=None,
+                                help="Reaproveita resultados de arquivos já validados (banco SQLite).")
+    parser_observa.set_defaults(funcao=_comando_observa)
+
+    args = parser.parse_args(argv)
+    for opcao in ("max_erros", "max_por_grupo"):
+        if getattr(args, opcao, None) is not None and getattr(args, opcao) < 1:
+            parser.error(f"--{opcao.replace('_', '-')} precisa ser pelo menos 1.")
+    for opcao in ("atraso", "intervalo"):
+        if getattr(args, opcao, None) is not None and getattr(args, opcao) < 0:
+            parser.error(f"--{opcao} não pode ser negativo.")
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
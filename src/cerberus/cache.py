@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .elan import RuleSet
+
+# Versão do formato dos resultados; resultados guardados por versões anteriores deixam de ser usados
+VERSAO_RESULTADOS = 2
+
+# Campos que dependem de onde/quando o arquivo foi lido, e não do seu conteúdo
+_CAMPOS_NAO_ARMAZENADOS = ("arquivo", "duracao", "cache", "instrumentacao")
+
+
+def caminho_cache_padrao() -> str:
+    """
+    Caminho padrão do banco de cache: variável de ambiente CERBERUS_CACHE ou ~/.cache/cerberus/resultados.sqlite.
+    """
+    return os.environ.get("CERBERUS_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "cerberus", "resultados.sqlite")
+
+
+def chave_cache(conteudo: bytes, regras: RuleSet) -> str:
+    """
+    Chave endereçada por conteúdo: hash dos bytes do arquivo combinado com a assinatura do conjunto de regras
+    e com a versão do formato dos resultados.
+
+    :param conteudo: Bytes do arquivo .eaf.
+    :type conteudo: bytes
+    :param regras: Conjunto de regras usado na validação.
+    :type regras: RuleSet
+    :return: Chave hexadecimal.
+    :rtype: str
+    """
+    return f"{hashlib.sha256(conteudo).hexdigest()}:{regras.assinatura}:v{VERSAO_RESULTADOS}"
+
+
+class CacheValidacao:
+    """
+    Cache persistente (SQLite) de resultados de validação, com expulsão LRU por tamanho e por idade.
+
+    Pode ser compartilhado entre threads (app Streamlit) e entre processos (validação em
+    lote), já que cada processo abre sua própria conexão com o mesmo arquivo.
+
+    :param caminho: Arquivo do banco SQLite. Diretórios ausentes são criados.
+    :param max_entradas: Quantidade máxima de resultados guardados.
+    :param max_bytes: Tamanho máximo somado dos resultados guardados.
+    :param max_idade: Idade máxima (em segundos) de um resultado. None desativa a expiração.
+    :param max_layouts: Quantidade máxima de disposições de trilhas guardadas (ver 'guarda_layout');
+        a idade máxima vale também para elas.
+    :param intervalo_expulsao: A expulsão (que conta e soma a tabela inteira) roda na primeira
+        inserção de cada tabela e depois a cada 'intervalo_expulsao' inserções; entre uma passagem e
+        outra, cada processo pode exceder os limites em até esse número de entradas.
+    """
+
+    def __init__(self, caminho: Optional[str] = None, max_entradas: int = 100_000,
+                 max_bytes: int = 256 * 1024 * 1024, max_idade: Optional[float] = 30 * 24 * 3600,
+                 max_layouts: int = 10_000, intervalo_expulsao: int = 64):
+        self.caminho = caminho or caminho_cache_padrao()
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.max_idade = max_idade
+        self.max_layouts = max_layouts
+        self.intervalo_expulsao = max(1, intervalo_expulsao)
+        self.acertos = 0
+        self.falhas = 0
+
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self._trava = threading.Lock()
+        self._insercoes: Dict[str, int] = {}
+        self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " chave TEXT PRIMARY KEY, resultado TEXT NOT NULL, tamanho INTEGER NOT NULL,"
+            " criado_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (acessado_em)")
+        # Resultados da validação de IDs por disposição de trilhas (ver elan.MemoLayouts), com a mesma
+        # expulsão LRU dos resultados; a tabela sem as colunas de tamanho e acesso é apenas recriada
+        colunas_layouts = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(layouts)")}
+        if colunas_layouts and "acessado_em" not in colunas_layouts:
+            self._conexao.execute("DROP TABLE layouts")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS layouts ("
+            " chave TEXT PRIMARY KEY, resultado TEXT NOT NULL, tamanho INTEGER NOT NULL,"
+            " criado_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_layouts_acesso ON layouts (acessado_em)")
+
+    def obtem(self, chave: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o resultado guardado para a chave, ou None se não houver (ou se estiver expirado).
+        """
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT resultado, criado_em FROM resultados WHERE chave = ?", (chave,)
+            ).fetchone()
+
+            if linha is None or (self.max_idade is not None and agora - linha[1] > self.max_idade):
+                self.falhas += 1
+                return None
+
+            self._conexao.execute("UPDATE resultados SET acessado_em = ? WHERE chave = ?", (agora, chave))
+            self.acertos += 1
+        return json.loads(linha[0])
+
+    def guarda(self, chave: str, resultado: Dict[str, Any]) -> None:
+        """
+        Guarda um resultado de validação e aplica a política de expulsão.
+        """
+        dados = json.dumps(
+            {campo: valor for campo, valor in resultado.items() if campo not in _CAMPOS_NAO_ARMAZENADOS},
+            ensure_ascii=False,
+        )
+        agora = time.time()
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO resultados (chave, resultado, tamanho, criado_em, acessado_em) VALUES (?, ?, ?, ?, ?)",
+                (chave, dados, len(dados), agora, agora),
+            )
+            self._expulsa("resultados", agora, self.max_entradas, self.max_bytes)
+
+    def obtem_layout(self, chave: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o resultado da validação de IDs guardado para uma disposição de trilhas, ou None (ou se estiver expirado).
+        """
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute("SELECT resultado, criado_em FROM layouts WHERE chave = ?", (chave,)).fetchone()
+            if linha is None or (self.max_idade is not None and agora - linha[1] > self.max_idade):
+                return None
+            self._conexao.execute("UPDATE layouts SET acessado_em = ? WHERE chave = ?", (agora, chave))
+        return json.loads(linha[0])
+
+    def guarda_layout(self, chave: str, resultado: Dict[str, Any]) -> None:
+        """
+        Guarda o resultado da validação de IDs de uma disposição de trilhas e aplica a política de expulsão.
+        """
+        dados = json.dumps(resultado, ensure_ascii=False)
+        agora = time.time()
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO layouts (chave, resultado, tamanho, criado_em, acessado_em) VALUES (?, ?, ?, ?, ?)",
+                (chave, dados, len(dados), agora, agora),
+            )
+            self._expulsa("layouts", agora, self.max_layouts, self.max_bytes)
+
+    def _expulsa(self, tabela: str, agora: float, max_entradas: int, max_bytes: int) -> None:
+        insercoes = self._insercoes.get(tabela, 0)
+        self._insercoes[tabela] = insercoes + 1
+        if insercoes % self.intervalo_expulsao:
+            return
+
+        if self.max_idade is not None:
+            self._conexao.execute(f"DELETE FROM {tabela} WHERE criado_em < ?", (agora - self.max_idade,))
+
+        entradas, total_bytes = self._conexao.execute(f"SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM {tabela}").fetchone()
+        if entradas <= max_entradas and total_bytes <= max_bytes:
+            return
+
+        # Remove as entradas acessadas há mais tempo até voltar aos limites
+        excedente_entradas = max(0, entradas - max_entradas)
+        excedente_bytes = max(0, total_bytes - max_bytes)
+        removidas, bytes_removidos = [], 0
+        for chave, tamanho in self._conexao.execute(f"SELECT chave, tamanho FROM {tabela} ORDER BY acessado_em"):
+            if len(removidas) >= excedente_entradas and bytes_removidos >= excedente_bytes:
+                break
+            removidas.append((chave,))
+            bytes_removidos += tamanho
+        self._conexao.executemany(f"DELETE FROM {tabela} WHERE chave = ?", removidas)
+
+    def limpa(self) -> None:
+        with self._trava:
+            self._conexao.execute("DELETE FROM resultados")
+            self._conexao.execute("DELETE FROM layouts")
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            entradas, total_bytes = self._conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM resultados"
+            ).fetchone()
+            layouts = self._conexao.execute("SELECT COUNT(*) FROM layouts").fetchone()[0]
+        return {"acertos": self.acertos, "falhas": self.falhas, "entradas": entradas, "bytes": total_bytes,
+                "layouts": layouts}
+
+    def fecha(self) -> None:
+        with self._trava:
+            self._conexao.close()
@@ -1,2 +1,9 @@
+from .regras import *
 from .validador import *
-from .eaf import *
\ No newline at end of file
+from .eaf import *
+from .leitor import *
+from .incremental import *
+from .erros import *
+from .temporal import *
+from .transcricao import *
+from .layouts import *
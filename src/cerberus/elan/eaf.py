@@ -1,16 +1,27 @@
 import os
 import tempfile
-from typing import Optional, Tuple, Union
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
-import pympi
+from ..instrumentacao import Instrumentacao
 
+if TYPE_CHECKING:
+    import pympi
 
-def abre_eaf(arquivo: Union[str, bytes], nome_arquivo: Optional[str] = None) -> Tuple[str, pympi.Elan.Eaf]:
+
+def abre_eaf(arquivo: Union[str, bytes], nome_arquivo: Optional[str] = None,
+             instrumentacao: Optional[Instrumentacao] = None) -> Tuple[str, "pympi.Elan.Eaf"]:
     """
     Abre um arquivo .eaf usando a biblioteca pympi.Elan.
     Se o arquivo for 'bytes', salva em um arquivo temporário para leitura,
     pois o pympi não lida corretamente com streams em memória.
+    Com 'instrumentacao', o tempo total é registrado na etapa 'abre_eaf'.
+    O pympi só é importado na primeira chamada.
     """
+    if instrumentacao is not None:
+        with instrumentacao.etapa("abre_eaf"):
+            return abre_eaf(arquivo, nome_arquivo)
+
+    import pympi
     
     eaf_obj = None
     nome_final = None
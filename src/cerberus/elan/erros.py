@@ -0,0 +1,260 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Mensagens de cada código de erro de anotação; '{trilha}' e '{caracteres}' são preenchidos na saída
+_MENSAGENS_ANOTACAO = {
+    "DIGITO_PRESENTE": "[Trilha: {trilha}] [Erro: Número (dígito) encontrado na trilha]",
+    "DISF_PRESENTE": "[Trilha: {trilha}] [Erro: Anotação de disfluência fora da trilha DISF]",
+    "DISF_INVALIDA": "[Trilha: {trilha}] [Erro: Conteúdo inválido]",
+    "ERRO_DISF": "[Trilha: {trilha}] [Erro: Disfluência fora do padrão]",
+    "CARACTERE_INVALIDO": "[Trilha: {trilha}] [Erro: Caracteres inválidos {caracteres}]",
+    "DURACAO_INVALIDA": "[Trilha: {trilha}] [Erro: Anotação com duração nula ou negativa]",
+    "SOBREPOSICAO": "[Trilha: {trilha}] [Erro: Anotação sobreposta a outra da mesma trilha]",
+    "DISF_FORA_DA_FALA": "[Trilha: {trilha}] [Erro: Disfluência fora de um trecho de fala (INF/DOC)]",
+}
+
+# Mensagens dos erros que não se referem a uma anotação específica
+_MENSAGENS_GLOBAIS = {
+    "MAPEAMENTO_RULESET": "[Global] As trilhas do arquivo não correspondem às regras de trilha do conjunto.",
+    "TRILHA_AUSENTE": "[Global] A trilha obrigatória '{trilha}' não foi encontrada no arquivo.",
+    "LEITURA_TRILHA": "[Global] Erro ao tentar ler anotações da trilha '{trilha}'.",
+    "TIPO_DESCONHECIDO": "[Global] Tipo de regra desconhecido '{tipo}' para a trilha '{trilha}'.",
+}
+
+
+class ErroAnotacao:
+    """
+    Ocorrência de um erro de conteúdo em uma anotação.
+
+    :param codigo: Código do erro (ex: 'DIGITO_PRESENTE', 'CARACTERE_INVALIDO').
+    :param trilha: Nome da trilha da anotação.
+    :param inicio: Início da anotação, em milissegundos.
+    :param fim: Fim da anotação, em milissegundos.
+    :param caracteres: Caracteres inválidos encontrados (apenas em 'CARACTERE_INVALIDO').
+    """
+
+    __slots__ = ("codigo", "trilha", "inicio", "fim", "caracteres")
+
+    def __init__(self, codigo: str, trilha: str, inicio: Optional[int], fim: Optional[int], caracteres: str = ""):
+        self.codigo = codigo
+        self.trilha = trilha
+        self.inicio = inicio
+        self.fim = fim
+        self.caracteres = caracteres
+
+    def localizacao(self) -> str:
+        return f"[Tempo: {self.inicio/1000:.3f}s]"
+
+    def mensagem(self) -> str:
+        modelo = _MENSAGENS_ANOTACAO.get(self.codigo)
+        if modelo is None:
+            return f"[{self.codigo} na trilha {self.trilha}]"
+        return modelo.format(trilha=self.trilha, caracteres=sorted(self.caracteres))
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {"codigo": self.codigo, "trilha": self.trilha, "inicio": self.inicio, "fim": self.fim,
+                "caracteres": self.caracteres}
+
+    def __repr__(self) -> str:
+        return f"ErroAnotacao({self.codigo!r}, {self.trilha!r}, {self.inicio!r}, {self.fim!r}, {self.caracteres!r})"
+
+
+class ErroGlobal:
+    """
+    Erro de conteúdo que não se refere a uma anotação específica (ex: trilha ausente).
+
+    :param codigo: Código do erro (ex: 'TRILHA_AUSENTE').
+    :param trilha: Nome da trilha envolvida, se houver.
+    :param tipo: Tipo de conteúdo envolvido, se houver.
+    """
+
+    __slots__ = ("codigo", "trilha", "tipo")
+
+    def __init__(self, codigo: str, trilha: Optional[str] = None, tipo: Optional[str] = None):
+        self.codigo = codigo
+        self.trilha = trilha
+        self.tipo = tipo
+
+    def mensagem(self) -> str:
+        return _MENSAGENS_GLOBAIS[self.codigo].format(trilha=self.trilha, tipo=self.tipo)
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {"codigo": self.codigo, "trilha": self.trilha, "tipo": self.tipo}
+
+    def __repr__(self) -> str:
+        return f"ErroGlobal({self.codigo!r}, {self.trilha!r}, {self.tipo!r})"
+
+
+class GrupoErros:
+    """
+    Erros de um mesmo código (e mesmos caracteres) em uma trilha: a contagem total e os primeiros exemplos.
+    """
+
+    __slots__ = ("total", "exemplos")
+
+    def __init__(self):
+        self.total = 0
+        self.exemplos: List[ErroAnotacao] = []
+
+    @property
+    def primeiro(self) -> ErroAnotacao:
+        return self.exemplos[0]
+
+    def mensagem(self) -> str:
+        """
+        Linha do relatório: a mensagem do erro seguida das localizações dos exemplos guardados.
+        """
+        exemplos_str = ", ".join(erro.localizacao() for erro in self.exemplos)
+        if self.total > len(self.exemplos):
+            exemplos_str += f", e mais {self.total - len(self.exemplos)}"
+        return f"{self.primeiro.mensagem()} {exemplos_str}"
+
+
+class OrcamentoErros:
+    """
+    Limites de erros de um arquivo, para execuções de triagem em que basta saber se o arquivo
+    passa e quais são os primeiros problemas.
+
+    É compartilhado pelas etapas de validação de um mesmo arquivo (IDs, conteúdo e tempos):
+    cada erro registrado consome o orçamento do arquivo e o do seu grupo (código, trilha).
+    Com o orçamento esgotado, as etapas interrompem os laços de anotações e o emparelhamento
+    de trilhas, e 'truncado' passa a indicar que o relatório pode não listar todos os erros.
+    Um arquivo válido nunca é afetado, e um arquivo com erros continua inválido.
+
+    :param max_erros: Máximo de erros por arquivo (1: para no primeiro erro). None: sem limite.
+    :param max_por_grupo: Máximo de erros por (código, trilha). None: sem limite.
+    """
+
+    __slots__ = ("max_erros", "max_por_grupo", "usados", "por_grupo", "truncado")
+
+    def __init__(self, max_erros: Optional[int] = None, max_por_grupo: Optional[int] = None):
+        self.max_erros = max_erros
+        self.max_por_grupo = max_por_grupo
+        self.usados = 0
+        self.por_grupo: Dict[Tuple[str, Optional[str]], int] = {}
+        self.truncado = False
+
+    def novo(self) -> "OrcamentoErros":
+        """
+        Orçamento com os mesmos limites e nada consumido, para o próximo arquivo.
+        """
+        return OrcamentoErros(self.max_erros, self.max_por_grupo)
+
+    @property
+    def esgotado(self) -> bool:
+        return self.max_erros is not None and self.usados >= self.max_erros
+
+    def grupo_esgotado(self, codigo: str, trilha: Optional[str]) -> bool:
+        return self.esgotado or (
+            self.max_por_grupo is not None and self.por_grupo.get((codigo, trilha), 0) >= self.max_por_grupo
+        )
+
+    def registra(self, codigo: str = "", trilha: Optional[str] = None) -> bool:
+        """
+        Consome o orçamento para um erro do grupo (código base, trilha).
+
+        :return: True se o erro deve ser registrado; False se algum limite já foi atingido.
+        :rtype: bool
+        """
+        if self.grupo_esgotado(codigo, trilha):
+            self.truncado = True
+            return False
+        self.usados += 1
+        if self.max_por_grupo is not None:
+            self.por_grupo[(codigo, trilha)] = self.por_grupo.get((codigo, trilha), 0) + 1
+        return True
+
+    def interrompe(self) -> None:
+        """
+        Registra que uma etapa parou antes de verificar tudo por falta de orçamento.
+        """
+        self.truncado = True
+
+    def __repr__(self) -> str:
+        return f"OrcamentoErros(max_erros={self.max_erros!r}, max_por_grupo={self.max_por_grupo!r})"
+
+
+class AgregadorErros:
+    """
+    Agrupa os erros de conteúdo por (código, caracteres, trilha) com memória limitada.
+
+    Para cada grupo são guardados apenas a quantidade de ocorrências e os primeiros
+    'max_exemplos' registros. As mensagens do relatório só são montadas em 'mensagens'.
+
+    Com um OrcamentoErros, os erros além dos limites não são registrados e 'esgotado'
+    avisa os laços de validação de que podem parar.
+
+    :param max_exemplos: Quantidade de exemplos guardados por grupo.
+    :param orcamento: Limites de erros do arquivo (modo de triagem). None: sem limites.
+    """
+
+    def __init__(self, max_exemplos: int = 3, orcamento: Optional[OrcamentoErros] = None):
+        self.max_exemplos = max_exemplos
+        self.orcamento = orcamento
+        self.globais: List[ErroGlobal] = []
+        self.grupos: Dict[Tuple[str, str, str], GrupoErros] = {}
+
+    @property
+    def esgotado(self) -> bool:
+        return self.orcamento is not None and self.orcamento.esgotado
+
+    def trilha_esgotada(self, trilha: str, codigos: Iterable[str]) -> bool:
+        """
+        Indica se nenhum dos códigos (base) pode mais ser registrado na trilha; sem orçamento, sempre False.
+        """
+        return self.orcamento is not None and all(self.orcamento.grupo_esgotado(codigo, trilha) for codigo in codigos)
+
+    def adiciona(self, codigo: str, trilha: str, inicio: Optional[int], fim: Optional[int], caracteres: str = "") -> None:
+        """
+        Registra um erro devolvido por um validador de conteúdo para uma anotação.
+        """
+        if self.orcamento is not None and not self.orcamento.registra(codigo, trilha):
+            return
+        grupo = self.grupos.get((codigo, caracteres, trilha))
+        if grupo is None:
+            grupo = self.grupos[(codigo, caracteres, trilha)] = GrupoErros()
+        grupo.total += 1
+        if len(grupo.exemplos) < self.max_exemplos:
+            grupo.exemplos.append(ErroAnotacao(codigo, trilha, inicio, fim, caracteres))
+
+    def adiciona_global(self, codigo: str, trilha: Optional[str] = None, tipo: Optional[str] = None) -> None:
+        if self.orcamento is not None and not self.orcamento.registra(codigo, trilha):
+            return
+        self.globais.append(ErroGlobal(codigo, trilha, tipo))
+
+    def __bool__(self) -> bool:
+        return bool(self.globais or self.grupos)
+
+    def __iter__(self) -> Iterator[GrupoErros]:
+        return iter(self.grupos.values())
+
+    def mensagens(self) -> List[str]:
+        """
+        Linhas do relatório de conteúdo: primeiro os erros globais, depois um grupo por linha, na ordem de ocorrência.
+        """
+        return [erro.mensagem() for erro in self.globais] + [grupo.mensagem() for grupo in self.grupos.values()]
+
+    def para_dict(self) -> Dict[str, Any]:
+        """
+        Representação serializável em JSON, usada nos resultados da validação em lote.
+        """
+        return {
+            "globais": [erro.para_dict() for erro in self.globais],
+            "grupos": [
+                {"total": grupo.total, "exemplos": [erro.para_dict() for erro in grupo.exemplos]}
+                for grupo in self.grupos.values()
+            ],
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any], max_exemplos: int = 3) -> "AgregadorErros":
+        """
+        Reconstrói o agregador a partir de 'para_dict' (ex: resultado lido do cache ou de outro processo).
+        """
+        agregador = cls(max_exemplos)
+        agregador.globais = [ErroGlobal(**erro) for erro in dados.get("globais", [])]
+        for dados_grupo in dados.get("grupos", []):
+            grupo = GrupoErros()
+            grupo.total = dados_grupo["total"]
+            grupo.exemplos = [ErroAnotacao(**erro) for erro in dados_grupo["exemplos"]]
+            agregador.grupos[(grupo.primeiro.codigo, grupo.primeiro.caracteres, grupo.primeiro.trilha)] = grupo
+        return agregador
@@ -0,0 +1,258 @@
+import hashlib
+import time
+from itertools import compress
+from operator import itemgetter, ne
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..instrumentacao import Instrumentacao
+from .erros import AgregadorErros
+from .regras import RuleSet
+from .transcricao import AnotacoesTrilha, FonteAnotacoes, _tempo, ids_anotacoes
+from .validador import _VALIDADORES_CONTEUDO, _resolve_mapeamento
+
+# Versão do formato dos snapshots (3: um resumo por trilha e as colunas da versão anterior); snapshots de outras versões são ignorados
+VERSAO_SNAPSHOT = 3
+
+
+def _colunas_trilha(eaf: FonteAnotacoes, nome_trilha: str, anotacoes) -> AnotacoesTrilha:
+    """
+    Anotações da trilha em colunas, com os ANNOTATION_ID; as da Transcricao já vêm assim.
+    """
+    if isinstance(anotacoes, AnotacoesTrilha) and anotacoes.ids:
+        return anotacoes
+    return AnotacoesTrilha.de_anotacoes(anotacoes, ids_anotacoes(eaf, nome_trilha, len(anotacoes)))
+
+
+def _resumo_trilha(colunas: AnotacoesTrilha) -> str:
+    """
+    Resumo (blake2b) de uma trilha inteira: IDs, tempos e valores de todas as anotações.
+
+    As colunas são passadas ao hash de uma vez, sem montar uma tupla por anotação; os valores
+    são separados por NUL, que não pode aparecer em um documento XML.
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(len(colunas).to_bytes(8, "little"))
+    resumo.update(colunas.inicios.tobytes())
+    resumo.update(colunas.fins.tobytes())
+    resumo.update(colunas.ids.encode("utf-8"))
+    resumo.update(b"\x00")
+    resumo.update("\x00".join(colunas.valores).encode("utf-8", "surrogatepass"))
+    return resumo.hexdigest()
+
+
+def _ids_colunas(colunas: AnotacoesTrilha) -> List[str]:
+    return colunas.ids.split("\n") if colunas.ids else [str(i) for i in range(len(colunas))]
+
+
+def _posicoes_alteradas(colunas: AnotacoesTrilha, anteriores: AnotacoesTrilha) -> List[int]:
+    """
+    Posições cuja tupla (inicio, fim, valor) difere da anterior, para trilhas com os mesmos IDs na mesma ordem.
+
+    As colunas são comparadas elemento a elemento por 'map' e 'compress', sem um laço em Python.
+    """
+    posicoes = range(len(colunas))
+    alteradas = set(compress(posicoes, map(ne, colunas.valores, anteriores.valores)))
+    alteradas.update(compress(posicoes, map(ne, colunas.inicios, anteriores.inicios)))
+    alteradas.update(compress(posicoes, map(ne, colunas.fins, anteriores.fins)))
+    return sorted(alteradas)
+
+
+def _valida_posicoes(colunas: AnotacoesTrilha, posicoes: Iterable[int], validador_conteudo) -> List[List[Any]]:
+    erros_trilha: List[List[Any]] = []
+    valores = colunas.valores
+    for posicao in posicoes:
+        valor = valores[posicao]
+        if not valor or not valor.strip():
+            continue
+        for codigo_erro, caracteres in validador_conteudo(valor.strip()):
+            erros_trilha.append([posicao, codigo_erro, caracteres])
+    return erros_trilha
+
+
+def _revalida_trilha(colunas: AnotacoesTrilha, validador_conteudo,
+                     anteriores: Optional[AnotacoesTrilha], erros_anteriores: List[List[Any]],
+                     estatisticas: Dict[str, int]) -> List[List[Any]]:
+    """
+    Erros [posição, código, caracteres] de uma trilha alterada, na ordem das anotações.
+
+    Uma anotação cujo ANNOTATION_ID existia na versão anterior com a mesma tupla
+    (inicio, fim, valor) reaproveita os erros de antes; as demais são validadas.
+    """
+    if anteriores is None:
+        estatisticas["revalidadas"] += len(colunas)
+        return _valida_posicoes(colunas, range(len(colunas)), validador_conteudo)
+
+    if colunas.ids == anteriores.ids:
+        # Anotações editadas sem inserções nem remoções: as posições não mudam
+        alteradas = _posicoes_alteradas(colunas, anteriores)
+        estatisticas["revalidadas"] += len(alteradas)
+        estatisticas["reaproveitadas"] += len(colunas) - len(alteradas)
+        conjunto_alteradas = set(alteradas)
+        erros_trilha = [erro for erro in erros_anteriores if erro[0] not in conjunto_alteradas]
+        erros_trilha.extend(_valida_posicoes(colunas, alteradas, validador_conteudo))
+        # Ordenação estável: os erros de uma mesma anotação mantêm a ordem do validador
+        erros_trilha.sort(key=itemgetter(0))
+        return erros_trilha
+
+    posicoes_anteriores = {id_anotacao: posicao for posicao, id_anotacao in enumerate(_ids_colunas(anteriores))}
+    codigos_anteriores: Dict[int, List[Tuple[str, str]]] = {}
+    for posicao, codigo_erro, caracteres in erros_anteriores:
+        codigos_anteriores.setdefault(posicao, []).append((codigo_erro, caracteres))
+
+    erros_trilha = []
+    revalidadas = reaproveitadas = 0
+    for posicao, (id_anotacao, inicio, fim, valor) in enumerate(
+            zip(_ids_colunas(colunas), colunas.inicios, colunas.fins, colunas.valores)):
+        anterior = posicoes_anteriores.get(id_anotacao)
+        if (anterior is not None and anteriores.valores[anterior] == valor
+                and anteriores.inicios[anterior] == inicio and anteriores.fins[anterior] == fim):
+            reaproveitadas += 1
+            codigos_erro_anotacao = codigos_anteriores.get(anterior, ())
+        else:
+            revalidadas += 1
+            if not valor or not valor.strip():
+                continue
+            codigos_erro_anotacao = validador_conteudo(valor.strip())
+        for codigo_erro, caracteres in codigos_erro_anotacao:
+            erros_trilha.append([posicao, codigo_erro, caracteres])
+
+    estatisticas["revalidadas"] += revalidadas
+    estatisticas["reaproveitadas"] += reaproveitadas
+    return erros_trilha
+
+
+def valida_conteudo_incremental_estruturado(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                                            snapshot: Optional[Dict[str, Any]] = None,
+                                            instrumentacao: Optional[Instrumentacao] = None,
+                                            max_exemplos: int = 3) -> Tuple[AgregadorErros, Dict[str, Any]]:
+    """
+    Valida o CONTEÚDO das anotações reaproveitando os resultados de uma validação anterior do
+    mesmo arquivo, e devolve os erros estruturados com o novo snapshot.
+
+    O snapshot guarda, para cada trilha, um resumo (hash) da trilha inteira e os erros
+    [posição, código, caracteres] encontrados nela ('trilhas', serializável em JSON), além das
+    colunas da trilha ('colunas'). Uma trilha com o mesmo resumo não é percorrida: seus erros
+    são repetidos com os tempos atuais. Em uma trilha alterada, cada anotação é comparada pela
+    tupla (inicio, fim, valor) com a anotação de mesmo ANNOTATION_ID da versão anterior, e só as
+    novas ou alteradas são validadas. Sem 'colunas' (ex: snapshot gravado em JSON), as trilhas
+    alteradas são validadas por inteiro. Os erros são os mesmos de 'valida_conteudo_estruturado'.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo} ou RuleSet.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param snapshot: Snapshot devolvido por uma chamada anterior. None valida tudo.
+    :type snapshot: Optional[Dict[str, Any]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
+    :param max_exemplos: Quantidade de exemplos guardados por (código de erro, trilha).
+    :type max_exemplos: int
+    :return: Tupla contendo (Erros, NovoSnapshot). O snapshot traz em 'estatisticas' quantas
+             anotações foram revalidadas e reaproveitadas e quantas trilhas não foram percorridas.
+    :rtype: Tuple[AgregadorErros, Dict[str, Any]]
+    """
+    if instrumentacao is None:
+        return _valida_conteudo_incremental(eaf, regras_mapeamento, snapshot, None, max_exemplos)
+    with instrumentacao.etapa("valida_conteudo_incremental"):
+        return _valida_conteudo_incremental(eaf, regras_mapeamento, snapshot, instrumentacao, max_exemplos)
+
+
+def _valida_conteudo_incremental(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                                 snapshot: Optional[Dict[str, Any]], instrumentacao: Optional[Instrumentacao],
+                                 max_exemplos: int) -> Tuple[AgregadorErros, Dict[str, Any]]:
+    """
+    Implementação de 'valida_conteudo_incremental_estruturado'.
+    """
+    erros = AgregadorErros(max_exemplos)
+    estatisticas = {"revalidadas": 0, "reaproveitadas": 0, "trilhas_reaproveitadas": 0}
+
+    regras_mapeamento = _resolve_mapeamento(eaf, regras_mapeamento)
+    novo_snapshot: Dict[str, Any] = {"versao": VERSAO_SNAPSHOT, "mapeamento": dict(regras_mapeamento or {}),
+                                     "trilhas": {}, "colunas": {}, "estatisticas": estatisticas}
+    if regras_mapeamento is None:
+        erros.adiciona_global("MAPEAMENTO_RULESET")
+        return erros, novo_snapshot
+
+    anterior_valido = snapshot is not None and snapshot.get("versao") == VERSAO_SNAPSHOT
+    mapeamento_anterior = snapshot.get("mapeamento", {}) if anterior_valido else {}
+    trilhas_anteriores = snapshot.get("trilhas", {}) if anterior_valido else {}
+    colunas_anteriores = (snapshot.get("colunas") or {}) if anterior_valido else {}
+    trilhas_existentes = set(eaf.get_tier_names())
+
+    for nome_trilha, tipo_regra in regras_mapeamento.items():
+        validador_conteudo = _VALIDADORES_CONTEUDO.get(tipo_regra)
+
+        if nome_trilha not in trilhas_existentes:
+            erros.adiciona_global("TRILHA_AUSENTE", nome_trilha)
+            continue
+
+        try:
+            anotacoes = eaf.get_annotation_data_for_tier(nome_trilha)
+        except KeyError:
+            erros.adiciona_global("LEITURA_TRILHA", nome_trilha)
+            continue
+
+        if validador_conteudo is None:
+            # Sem validador não há o que reaproveitar: o erro global sai na primeira anotação com texto
+            if any(valor and valor.strip() for _, _, valor, *_ in anotacoes):
+                erros.adiciona_global("TIPO_DESCONHECIDO", nome_trilha, tipo_regra)
+            continue
+
+        if instrumentacao is not None:
+            inicio_trilha = time.perf_counter()
+
+        colunas = _colunas_trilha(eaf, nome_trilha, anotacoes)
+        resumo = _resumo_trilha(colunas)
+        # Resultados anteriores só valem se a trilha tinha o mesmo tipo de conteúdo
+        anterior = trilhas_anteriores.get(nome_trilha) if mapeamento_anterior.get(nome_trilha) == tipo_regra else None
+
+        if anterior is not None and anterior["resumo"] == resumo:
+            erros_trilha = anterior["erros"]
+            estatisticas["reaproveitadas"] += len(colunas)
+            estatisticas["trilhas_reaproveitadas"] += 1
+        else:
+            erros_trilha = _revalida_trilha(
+                colunas, validador_conteudo,
+                colunas_anteriores.get(nome_trilha) if anterior is not None else None,
+                anterior["erros"] if anterior is not None else [],
+                estatisticas,
+            )
+        novo_snapshot["trilhas"][nome_trilha] = {"resumo": resumo, "erros": erros_trilha}
+        novo_snapshot["colunas"][nome_trilha] = colunas
+
+        for posicao, codigo_erro, caracteres in erros_trilha:
+            erros.adiciona(codigo_erro, nome_trilha, _tempo(colunas.inicios[posicao]), _tempo(colunas.fins[posicao]),
+                           caracteres)
+            if instrumentacao is not None:
+                instrumentacao.conta(f"erros.{codigo_erro}")
+
+        if instrumentacao is not None:
+            instrumentacao.adiciona_tempo(f"conteudo.{tipo_regra}", time.perf_counter() - inicio_trilha)
+            instrumentacao.conta(f"anotacoes.{nome_trilha}", len(colunas))
+
+    if instrumentacao is not None:
+        instrumentacao.conta("incremental.revalidadas", estatisticas["revalidadas"])
+        instrumentacao.conta("incremental.reaproveitadas", estatisticas["reaproveitadas"])
+    return erros, novo_snapshot
+
+
+def valida_conteudo_incremental(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                                snapshot: Optional[Dict[str, Any]] = None) -> Tuple[bool, List[str], Dict[str, Any]]:
+    """
+    Valida o CONTEÚDO das anotações reaproveitando os resultados de uma validação anterior do mesmo arquivo.
+
+    Ver 'valida_conteudo_incremental_estruturado'. O relatório devolvido é idêntico ao de
+    'valida_conteudo_trilhas' para o mesmo arquivo.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo} ou RuleSet.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param snapshot: Snapshot devolvido por uma chamada anterior. None valida tudo.
+    :type snapshot: Optional[Dict[str, Any]]
+    :return: Tupla contendo (Sucesso, ListaDeRelatorio, NovoSnapshot).
+    :rtype: Tuple[bool, List[str], Dict[str, Any]]
+    """
+    erros, novo_snapshot = valida_conteudo_incremental_estruturado(eaf, regras_mapeamento, snapshot)
+    relatorio_final = erros.mensagens()
+    return (not relatorio_final, relatorio_final, novo_snapshot)
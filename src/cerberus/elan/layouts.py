@@ -0,0 +1,104 @@
+import collections
+import json
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .regras import RuleSet
+
+# Versão do formato dos resultados memorizados; entradas persistidas por versões anteriores são ignoradas
+VERSAO_LAYOUTS = 1
+
+ResultadoIds = Tuple[bool, List[str], Optional[Dict[str, str]]]
+
+
+class MemoLayouts:
+    """
+    Memória LRU dos resultados de 'valida_id_trilhas' por (assinatura do RuleSet, nomes das trilhas).
+
+    A validação de IDs depende apenas das regras e dos nomes das trilhas (na ordem do arquivo);
+    como quase todos os arquivos de um corpus repetem as mesmas trilhas, a busca de uma
+    atribuição válida e as demais verificações são feitas uma vez por disposição de trilhas.
+
+    Com 'persistencia' (um objeto com 'obtem_layout' e 'guarda_layout', como o CacheValidacao),
+    as disposições resolvidas sobrevivem entre execuções e são compartilhadas pelos processos
+    da validação em lote.
+
+    :param max_entradas: Quantidade máxima de disposições guardadas em memória.
+    :param persistencia: Armazenamento persistente opcional.
+    """
+
+    def __init__(self, max_entradas: int = 1024, persistencia: Optional[Any] = None):
+        self.max_entradas = max_entradas
+        self.persistencia = persistencia
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas: "collections.OrderedDict[Tuple[str, Tuple[str, ...]], ResultadoIds]" = collections.OrderedDict()
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def _chave_persistente(assinatura: str, trilhas: Tuple[str, ...]) -> str:
+        return f"{assinatura}:v{VERSAO_LAYOUTS}:{json.dumps(trilhas, ensure_ascii=False)}"
+
+    @staticmethod
+    def _copia(resultado: ResultadoIds) -> ResultadoIds:
+        # Quem recebe o resultado pode alterar a lista de erros e o mapeamento
+        sucesso, erros, mapeamento = resultado
+        return sucesso, list(erros), dict(mapeamento) if mapeamento is not None else None
+
+    def obtem(self, regras: RuleSet, trilhas: Sequence[str]) -> Optional[ResultadoIds]:
+        """
+        Retorna o resultado memorizado para as trilhas, ou None se a disposição ainda não foi resolvida.
+        """
+        chave = (regras.assinatura, tuple(trilhas))
+        with self._trava:
+            resultado = self._entradas.get(chave)
+            if resultado is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._copia(resultado)
+
+        if self.persistencia is not None:
+            dados = self.persistencia.obtem_layout(self._chave_persistente(*chave))
+            if dados is not None:
+                resultado = (dados["sucesso"], dados["erros"], dados["mapeamento"])
+                self._memoriza(chave, resultado)
+                with self._trava:
+                    self.acertos += 1
+                return self._copia(resultado)
+
+        with self._trava:
+            self.falhas += 1
+        return None
+
+    def guarda(self, regras: RuleSet, trilhas: Sequence[str], resultado: ResultadoIds) -> None:
+        """
+        Memoriza o resultado de 'valida_id_trilhas' para as trilhas (e o persiste, se houver persistência).
+        """
+        chave = (regras.assinatura, tuple(trilhas))
+        self._memoriza(chave, self._copia(resultado))
+        if self.persistencia is not None:
+            sucesso, erros, mapeamento = resultado
+            self.persistencia.guarda_layout(self._chave_persistente(*chave),
+                                            {"sucesso": sucesso, "erros": erros, "mapeamento": mapeamento})
+
+    def _memoriza(self, chave: Tuple[str, Tuple[str, ...]], resultado: ResultadoIds) -> None:
+        with self._trava:
+            self._entradas[chave] = resultado
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpa(self) -> None:
+        with self._trava:
+            self._entradas.clear()
+            self.acertos = self.falhas = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __repr__(self) -> str:
+        return f"MemoLayouts({len(self)} disposições, {self.acertos} acertos, {self.falhas} falhas)"
+
+
+# Memória usada por padrão em 'valida_id_trilhas' (uma por processo)
+MEMO_LAYOUTS = MemoLayouts()
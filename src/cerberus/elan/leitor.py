@@ -0,0 +1,468 @@
+import codecs
+import io
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..instrumentacao import Instrumentacao
+from .transcricao import _SEM_TEMPO, AnotacoesTrilha, Transcricao, _tempo
+
+# Colunas de uma trilha durante a leitura: inícios, fins, valores e ANNOTATION_ID
+_Colunas = Tuple[array, array, List[str], List[str]]
+# Colunas da leitura em fluxo, com os TIME_SLOT ainda não resolvidos (None nas anotações de referência)
+_ColunasAdiadas = Tuple[List[Optional[str]], List[Optional[str]], List[str], List[str]]
+
+# Marcação de abertura de uma trilha e os seus atributos (valores entre aspas simples ou duplas)
+_PADRAO_TIER = re.compile(rb"""<TIER((?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*/?>""")
+# Início de uma marcação TIER, de comentários, CDATA e DTD ('<!') ou de instruções de processamento ('<?')
+_PADRAO_MARCACOES_TRIAGEM = re.compile(rb"<(?:!|\?|TIER[\s/>])")
+_PADRAO_ATRIBUTO = re.compile(rb"""([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_PADRAO_DECLARACAO = re.compile(rb"""<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z][A-Za-z0-9._-]*)["']""")
+# TIME_SLOT na forma gravada pelo ELAN, com o ID sem entidades e o tempo opcional
+_PADRAO_TIME_SLOT = re.compile(rb'''<TIME_SLOT\s+TIME_SLOT_ID="([^"&<]*)"(?:\s+TIME_VALUE="(\d+)")?\s*/>''')
+_PADRAO_ENTIDADE = re.compile(r"&(?:#x([0-9a-fA-F]+)|#([0-9]+)|(amp|lt|gt|quot|apos));")
+_ENTIDADES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+
+def _le_anotacoes(fonte: Union[str, BinaryIO], trilhas: Optional[Iterable[str]], nome: Optional[str]) -> Transcricao:
+    """
+    Percorre o XML do EAF em fluxo (iterparse), resolvendo os TIME_SLOT conforme as anotações aparecem.
+
+    As anotações vão direto para as colunas da Transcricao, sem tuplas intermediárias. Os
+    elementos já processados são descartados, de modo que a memória usada fica proporcional
+    às anotações das trilhas selecionadas, não ao documento inteiro.
+    """
+    selecionadas = set(trilhas) if trilhas is not None else None
+    colunas: Dict[str, Optional[_Colunas]] = {}
+
+    tempos_slots: Dict[str, int] = {}
+    # Tempos das anotações alinháveis, para resolver anotações de referência (REF_ANNOTATION)
+    tempos_anotacoes: Dict[str, Tuple[int, int]] = {}
+    referencias: Dict[str, str] = {}
+    pendentes: List[Tuple[_Colunas, int, str]] = []
+
+    colunas_trilha: Optional[_Colunas] = None
+    # Elemento pai corrente (TIME_ORDER ou TIER), esvaziado a cada filho processado
+    pai: Optional[ET.Element] = None
+
+    for evento, elem in ET.iterparse(fonte, events=("start", "end")):
+        tag = elem.tag
+
+        if evento == "start":
+            if tag == "TIME_ORDER":
+                pai = elem
+            elif tag == "TIER":
+                pai = elem
+                nome_trilha = elem.attrib["TIER_ID"]
+                if selecionadas is not None and nome_trilha not in selecionadas:
+                    # Trilha não pedida: só o nome é guardado
+                    colunas.setdefault(nome_trilha, None)
+                    colunas_trilha = None
+                else:
+                    colunas_trilha = colunas.setdefault(nome_trilha, (array("q"), array("q"), [], []))
+            continue
+
+        if tag == "TIME_SLOT":
+            valor_tempo = elem.attrib.get("TIME_VALUE")
+            tempos_slots[elem.attrib["TIME_SLOT_ID"]] = _SEM_TEMPO if valor_tempo is None else int(valor_tempo)
+            pai.clear()
+
+        elif tag == "ALIGNABLE_ANNOTATION":
+            inicio = tempos_slots.get(elem.attrib["TIME_SLOT_REF1"], _SEM_TEMPO)
+            fim = tempos_slots.get(elem.attrib["TIME_SLOT_REF2"], _SEM_TEMPO)
+            id_anotacao = elem.attrib["ANNOTATION_ID"]
+            tempos_anotacoes[id_anotacao] = (inicio, fim)
+            if colunas_trilha is not None:
+                inicios, fins, valores, ids = colunas_trilha
+                inicios.append(inicio)
+                fins.append(fim)
+                valores.append(sys.intern(elem.findtext("ANNOTATION_VALUE") or ""))
+                ids.append(id_anotacao)
+
+        elif tag == "REF_ANNOTATION":
+            id_anotacao = elem.attrib["ANNOTATION_ID"]
+            referencias[id_anotacao] = elem.attrib["ANNOTATION_REF"]
+            if colunas_trilha is not None:
+                inicios, fins, valores, ids = colunas_trilha
+                # O tempo é herdado da anotação pai, que pode aparecer depois no arquivo
+                pendentes.append((colunas_trilha, len(valores), elem.attrib["ANNOTATION_REF"]))
+                inicios.append(_SEM_TEMPO)
+                fins.append(_SEM_TEMPO)
+                valores.append(sys.intern(elem.findtext("ANNOTATION_VALUE") or ""))
+                ids.append(id_anotacao)
+
+        elif tag == "ANNOTATION":
+            pai.clear()
+
+        elif tag in ("TIER", "TIME_ORDER"):
+            colunas_trilha = None
+            pai = None
+            elem.clear()
+
+    for (inicios, fins, _, _), posicao, id_pai in pendentes:
+        # Sobe a cadeia de referências até uma anotação alinhável
+        visitados = set()
+        while id_pai in referencias and id_pai not in visitados:
+            visitados.add(id_pai)
+            id_pai = referencias[id_pai]
+        inicios[posicao], fins[posicao] = tempos_anotacoes.get(id_pai, (_SEM_TEMPO, _SEM_TEMPO))
+
+    transcricao = Transcricao(nome)
+    for nome_trilha, colunas_trilha in colunas.items():
+        if colunas_trilha is None:
+            transcricao.trilhas[nome_trilha] = None
+            continue
+        inicios, fins, valores, ids = colunas_trilha
+        transcricao.trilhas[nome_trilha] = AnotacoesTrilha(inicios, fins, tuple(valores), "\n".join(ids))
+    return transcricao
+
+def _codificacao(conteudo: bytes) -> Optional[str]:
+    """
+    Codificação do documento, se for compatível com ASCII (as marcações podem então ser
+    procuradas diretamente nos bytes); None caso contrário (ex: UTF-16).
+    """
+    if conteudo[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) or b"\x00" in conteudo[:4]:
+        return None
+    inicio = len(codecs.BOM_UTF8) if conteudo.startswith(codecs.BOM_UTF8) else 0
+    declaracao = _PADRAO_DECLARACAO.match(conteudo, inicio)
+    codificacao = declaracao.group(1).decode("ascii") if declaracao else "utf-8"
+    try:
+        if "<TIER_ID=\"'>&;".encode(codificacao) != b"<TIER_ID=\"'>&;":
+            return None
+    except (LookupError, UnicodeError):
+        return None
+    return codificacao
+
+
+def _substitui_entidade(marca: "re.Match") -> str:
+    hexadecimal, decimal, nome = marca.groups()
+    if nome is not None:
+        return _ENTIDADES[nome]
+    return chr(int(hexadecimal, 16) if hexadecimal is not None else int(decimal))
+
+
+def _atributos(bruto: bytes, codificacao: str) -> Optional[Dict[str, str]]:
+    """
+    Atributos de uma marcação, com os valores normalizados como faz o parser de XML
+    (quebras de linha e tabulações viram espaços, entidades são substituídas).
+
+    :return: Os atributos; None se algum valor usa uma entidade desconhecida.
+    """
+    atributos = {}
+    for marca in _PADRAO_ATRIBUTO.finditer(bruto):
+        valor = marca.group(2) if marca.group(2) is not None else marca.group(3)
+        texto = valor.decode(codificacao).replace("\r\n", " ").translate({9: " ", 10: " ", 13: " "})
+        if "&" in texto:
+            if "&" in _PADRAO_ENTIDADE.sub("", texto):
+                return None
+            texto = _PADRAO_ENTIDADE.sub(_substitui_entidade, texto)
+        atributos[marca.group(1).decode(codificacao)] = texto
+    return atributos
+
+
+def nomes_trilhas(conteudo: bytes) -> Optional[List[str]]:
+    """
+    Nomes das trilhas de um .eaf, lidos apenas das marcações TIER, sem percorrer o XML.
+
+    Devolve a mesma lista que 'get_tier_names' depois de 'le_eaf', ou None quando o documento
+    tem algo que a busca direta nos bytes não cobre com segurança (comentários, CDATA, DTD,
+    instruções de processamento, codificação incompatível com ASCII ou uma marcação TIER
+    fora do padrão); nesse caso o arquivo deve ser lido normalmente.
+
+    :param conteudo: Conteúdo do arquivo.
+    :type conteudo: bytes
+    :return: Os nomes das trilhas, na ordem do arquivo, ou None.
+    :rtype: Optional[List[str]]
+    """
+    codificacao = _codificacao(conteudo)
+    if codificacao is None:
+        return None
+    inicio = len(codecs.BOM_UTF8) if conteudo.startswith(codecs.BOM_UTF8) else 0
+
+    # Uma única passada pelos bytes: '<' não aparece em textos nem em valores de atributos
+    nomes = []
+    for marca in _PADRAO_MARCACOES_TRIAGEM.finditer(conteudo):
+        if marca.group() == b"<?" and marca.start() == inicio and conteudo.startswith(b"<?xml", inicio):
+            continue
+        marca_tier = _PADRAO_TIER.match(conteudo, marca.start()) if marca.group().startswith(b"<TIER") else None
+        if marca_tier is None:
+            return None
+        atributos = _atributos(marca_tier.group(1), codificacao)
+        if atributos is None or "TIER_ID" not in atributos:
+            return None
+        nomes.append(atributos["TIER_ID"])
+    return list(dict.fromkeys(nomes))
+
+
+class LeituraEmFluxo:
+    """
+    Leitura de um .eaf em bytes que pode parar a qualquer momento, usada na triagem.
+
+    'anotacoes' entrega as anotações das trilhas pedidas à medida que o XML é lido. O
+    TIME_ORDER é pulado: o tempo de uma anotação só é procurado quando pedido em 'tempos'
+    (nos bytes do TIME_ORDER, lido por inteiro apenas depois de muitas consultas), de modo
+    que parar cedo custa só a leitura das anotações até ali. Lida até o fim, 'transcricao'
+    devolve o mesmo que 'le_eaf' com as mesmas trilhas.
+
+    :param conteudo: Conteúdo do arquivo.
+    :param trilhas: Trilhas cujas anotações devem ser lidas.
+    :param nome: Nome do arquivo.
+    :raises ValueError: Se o documento não tem um TIME_ORDER antes das trilhas.
+    """
+
+    # Consultas avulsas aos bytes do TIME_ORDER antes de lê-lo por inteiro
+    MAX_CONSULTAS = 32
+    # Tamanho dos trechos entregues ao parser
+    TAMANHO_TRECHO = 64 * 1024
+
+    def __init__(self, conteudo: bytes, trilhas: Iterable[str], nome: Optional[str] = None):
+        self.conteudo = conteudo
+        self.nome = nome
+        self.lidas = 0
+        self._selecionadas = set(trilhas)
+        self._codificacao = _codificacao(conteudo) or "utf-8"
+        self._colunas: Dict[str, Optional[_ColunasAdiadas]] = {}
+        # TIME_SLOT de cada anotação alinhável e anotação pai de cada anotação de referência
+        self._slots_anotacoes: Dict[str, Tuple[str, str]] = {}
+        self._referencias: Dict[str, str] = {}
+        self._pendentes: List[Tuple[str, int, str]] = []
+        self._tempos_slots: Dict[str, int] = {}
+        self._slots_completos = False
+        self._consultas = 0
+        self._concluida = False
+
+        inicio = conteudo.find(b"<TIME_ORDER>")
+        fim = conteudo.find(b"</TIME_ORDER>", inicio)
+        if inicio < 0 or fim < 0 or conteudo.find(b"<TIER", 0, fim) >= 0:
+            raise ValueError("Documento sem TIME_ORDER antes das trilhas.")
+        self._time_order = (inicio, fim + len(b"</TIME_ORDER>"))
+
+    def _trechos(self) -> Iterator[memoryview]:
+        dados = memoryview(self.conteudo)
+        inicio_time_order, fim_time_order = self._time_order
+        for inicio, fim in ((0, inicio_time_order), (fim_time_order, len(dados))):
+            for posicao in range(inicio, fim, self.TAMANHO_TRECHO):
+                yield dados[posicao:min(posicao + self.TAMANHO_TRECHO, fim)]
+
+    def anotacoes(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Percorre as anotações das trilhas pedidas, na ordem do arquivo, como (trilha, ANNOTATION_ID, valor).
+
+        Parar a iteração interrompe a leitura do XML.
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        colunas_trilha: Optional[_ColunasAdiadas] = None
+        nome_trilha = ""
+        # Elemento pai corrente (TIER), esvaziado a cada filho processado
+        pai: Optional[ET.Element] = None
+
+        for trecho in self._trechos():
+            parser.feed(trecho)
+            for evento, elem in parser.read_events():
+                tag = elem.tag
+
+                if evento == "start":
+                    if tag == "TIER":
+                        pai = elem
+                        nome_trilha = elem.attrib["TIER_ID"]
+                        if nome_trilha in self._selecionadas:
+                            colunas_trilha = self._colunas.setdefault(nome_trilha, ([], [], [], []))
+                        else:
+                            self._colunas.setdefault(nome_trilha, None)
+                            colunas_trilha = None
+                    continue
+
+                if tag == "ALIGNABLE_ANNOTATION":
+                    id_anotacao = elem.attrib["ANNOTATION_ID"]
+                    slots = (elem.attrib["TIME_SLOT_REF1"], elem.attrib["TIME_SLOT_REF2"])
+                    self._slots_anotacoes[id_anotacao] = slots
+                    if colunas_trilha is not None:
+                        valor = sys.intern(elem.findtext("ANNOTATION_VALUE") or "")
+                        slots1, slots2, valores, ids = colunas_trilha
+                        slots1.append(slots[0])
+                        slots2.append(slots[1])
+                        valores.append(valor)
+                        ids.append(id_anotacao)
+                        self.lidas += 1
+                        yield nome_trilha, id_anotacao, valor
+
+                elif tag == "REF_ANNOTATION":
+                    id_anotacao = elem.attrib["ANNOTATION_ID"]
+                    self._referencias[id_anotacao] = elem.attrib["ANNOTATION_REF"]
+                    if colunas_trilha is not None:
+                        valor = sys.intern(elem.findtext("ANNOTATION_VALUE") or "")
+                        slots1, slots2, valores, ids = colunas_trilha
+                        self._pendentes.append((nome_trilha, len(valores), elem.attrib["ANNOTATION_REF"]))
+                        slots1.append(None)
+                        slots2.append(None)
+                        valores.append(valor)
+                        ids.append(id_anotacao)
+                        self.lidas += 1
+                        yield nome_trilha, id_anotacao, valor
+
+                elif tag == "ANNOTATION":
+                    pai.clear()
+
+                elif tag == "TIER":
+                    colunas_trilha = None
+                    pai = None
+                    elem.clear()
+
+        parser.close()
+        self._concluida = True
+
+    def _procura_slot(self, id_slot: str) -> bool:
+        """
+        Procura um TIME_SLOT diretamente nos bytes do TIME_ORDER.
+        """
+        self._consultas += 1
+        inicio, fim = self._time_order
+        try:
+            chave = id_slot.encode(self._codificacao)
+        except UnicodeError:
+            return False
+        if re.search(rb"[&<\"']", chave):
+            return False
+        for aspas in (b'"', b"'"):
+            alvo = aspas + chave + aspas
+            posicao = self.conteudo.find(alvo, inicio, fim)
+            while posicao >= 0:
+                abertura = self.conteudo.rfind(b"<", inicio, posicao)
+                fechamento = self.conteudo.find(b">", posicao, fim)
+                marca = self.conteudo[abertura:fechamento + 1] if abertura >= 0 and fechamento >= 0 else b""
+                if re.match(rb"<TIME_SLOT\s", marca):
+                    atributos = _atributos(marca, self._codificacao)
+                    if atributos is not None and atributos.get("TIME_SLOT_ID") == id_slot:
+                        valor_tempo = atributos.get("TIME_VALUE")
+                        self._tempos_slots[id_slot] = _SEM_TEMPO if valor_tempo is None else int(valor_tempo)
+                        return True
+                posicao = self.conteudo.find(alvo, posicao + 1, fim)
+        return False
+
+    def _le_time_order(self) -> None:
+        inicio, fim = self._time_order
+        # Caminho rápido: todos os TIME_SLOT na forma gravada pelo ELAN; qualquer outra forma passa pelo parser
+        slots = _PADRAO_TIME_SLOT.findall(self.conteudo, inicio, fim)
+        if len(slots) == self.conteudo.count(b"<TIME_SLOT", inicio, fim):
+            for id_slot, valor_tempo in slots:
+                self._tempos_slots[id_slot.decode(self._codificacao)] = int(valor_tempo) if valor_tempo else _SEM_TEMPO
+            self._slots_completos = True
+            return
+        declaracao = f'<?xml version="1.0" encoding="{self._codificacao}"?>'.encode("ascii")
+        for _, elem in ET.iterparse(io.BytesIO(declaracao + self.conteudo[inicio:fim])):
+            if elem.tag == "TIME_SLOT":
+                valor_tempo = elem.attrib.get("TIME_VALUE")
+                self._tempos_slots[elem.attrib["TIME_SLOT_ID"]] = _SEM_TEMPO if valor_tempo is None else int(valor_tempo)
+        self._slots_completos = True
+
+    def _tempo_slot(self, id_slot: str) -> int:
+        if id_slot not in self._tempos_slots and not self._slots_completos:
+            if self._consultas >= self.MAX_CONSULTAS or not self._procura_slot(id_slot):
+                self._le_time_order()
+        return self._tempos_slots.get(id_slot, _SEM_TEMPO)
+
+    def tempos(self, id_anotacao: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Início e fim de uma anotação já lida, em milissegundos.
+
+        :raises KeyError: Se a anotação (ou a anotação alinhável de que ela depende) ainda não foi lida.
+        """
+        visitados = set()
+        while id_anotacao in self._referencias and id_anotacao not in visitados:
+            visitados.add(id_anotacao)
+            id_anotacao = self._referencias[id_anotacao]
+        slot1, slot2 = self._slots_anotacoes[id_anotacao]
+        return _tempo(self._tempo_slot(slot1)), _tempo(self._tempo_slot(slot2))
+
+    def transcricao(self) -> Transcricao:
+        """
+        Transcricao das trilhas pedidas, depois de 'anotacoes' percorrida até o fim.
+
+        :raises RuntimeError: Se a leitura foi interrompida.
+        """
+        if not self._concluida:
+            raise RuntimeError("A leitura em fluxo foi interrompida antes do fim do arquivo.")
+        if not self._slots_completos:
+            self._le_time_order()
+
+        tempos_trilhas: Dict[str, Tuple[array, array]] = {}
+        for nome_trilha, colunas_trilha in self._colunas.items():
+            if colunas_trilha is not None:
+                slots1, slots2, _, _ = colunas_trilha
+                tempos_trilhas[nome_trilha] = (
+                    array("q", [self._tempos_slots.get(slot, _SEM_TEMPO) for slot in slots1]),
+                    array("q", [self._tempos_slots.get(slot, _SEM_TEMPO) for slot in slots2]),
+                )
+        for nome_trilha, posicao, id_pai in self._pendentes:
+            # Sobe a cadeia de referências até uma anotação alinhável
+            visitados = set()
+            while id_pai in self._referencias and id_pai not in visitados:
+                visitados.add(id_pai)
+                id_pai = self._referencias[id_pai]
+            slots = self._slots_anotacoes.get(id_pai)
+            if slots is not None:
+                inicios, fins = tempos_trilhas[nome_trilha]
+                inicios[posicao] = self._tempos_slots.get(slots[0], _SEM_TEMPO)
+                fins[posicao] = self._tempos_slots.get(slots[1], _SEM_TEMPO)
+
+        transcricao = Transcricao(self.nome)
+        for nome_trilha, colunas_trilha in self._colunas.items():
+            if colunas_trilha is None:
+                transcricao.trilhas[nome_trilha] = None
+                continue
+            inicios, fins = tempos_trilhas[nome_trilha]
+            _, _, valores, ids = colunas_trilha
+            transcricao.trilhas[nome_trilha] = AnotacoesTrilha(inicios, fins, tuple(valores), "\n".join(ids))
+        return transcricao
+
+
+def le_eaf(arquivo: Union[str, os.PathLike, bytes, BinaryIO], nome_arquivo: Optional[str] = None,
+           trilhas: Optional[Iterable[str]] = None, instrumentacao: Optional[Instrumentacao] = None) -> Tuple[str, Transcricao]:
+    """
+    Lê um arquivo .eaf para uma Transcricao, sem passar pelo pympi nem por arquivos temporários.
+
+    Aceita bytes (ex: upload do Streamlit), objetos de arquivo binários ou caminhos.
+    Quando 'trilhas' é informado (ex: as chaves de um mapeamento de conteúdo), apenas as
+    anotações dessas trilhas são guardadas; os nomes de todas as trilhas continuam disponíveis,
+    e ler as anotações de uma trilha não pedida levanta TrilhaNaoCarregada.
+
+    :param arquivo: Conteúdo do arquivo, objeto de arquivo binário ou caminho.
+    :type arquivo: Union[str, os.PathLike, bytes, BinaryIO]
+    :param nome_arquivo: Nome do arquivo. Obrigatório quando 'arquivo' é bytes.
+    :type nome_arquivo: Optional[str]
+    :param trilhas: Trilhas cujas anotações devem ser lidas. None lê todas.
+    :type trilhas: Optional[Iterable[str]]
+    :param instrumentacao: Coletor opcional de tempos (etapa 'le_eaf').
+    :type instrumentacao: Optional[Instrumentacao]
+    :return: Tupla contendo (NomeDoArquivo, Transcricao).
+    :rtype: Tuple[str, Transcricao]
+    """
+    nome_final = nome_arquivo
+
+    try:
+        if isinstance(arquivo, (bytes, bytearray, memoryview)):
+            if nome_arquivo is None:
+                raise ValueError("O 'nome_arquivo' é obrigatório quando o 'arquivo' é fornecido como bytes.")
+            fonte = io.BytesIO(arquivo)
+
+        elif isinstance(arquivo, (str, os.PathLike)):
+            nome_final = nome_arquivo if nome_arquivo else os.path.basename(arquivo)
+            fonte = os.fspath(arquivo)
+
+        elif hasattr(arquivo, "read"):
+            nome_final = nome_arquivo if nome_arquivo else os.path.basename(getattr(arquivo, "name", "") or "")
+            fonte = arquivo
+
+        else:
+            raise TypeError(f"Tipo de 'arquivo' não suportado: {type(arquivo)}")
+
+        if instrumentacao is None:
+            return nome_final, _le_anotacoes(fonte, trilhas, nome_final)
+        with instrumentacao.etapa("le_eaf"):
+            return nome_final, _le_anotacoes(fonte, trilhas, nome_final)
+
+    except Exception as e:
+        raise RuntimeError(f"Erro ao processar o arquivo {nome_final}: {e}")
@@ -0,0 +1,269 @@
+import functools
+import hashlib
+import json
+import re
+from typing import Any, Dict, Optional, Tuple, Union
+
+TIPOS_REGRA = ("exato", "comeca", "termina", "contem", "regex")
+TIPOS_CONTEUDO = ("INF", "DOC", "DISF")
+
+
+class _Predicado:
+    """
+    Predicado compilado para nomes de trilha. Cada subclasse implementa um 'type' de regra.
+    """
+    __slots__ = ("valor",)
+    tipo = ""
+
+    def __init__(self, valor: str):
+        self.valor = valor
+
+    def __call__(self, nome_trilha: str) -> bool:
+        raise NotImplementedError
+
+    def __eq__(self, outro: object) -> bool:
+        return type(self) is type(outro) and self.valor == outro.valor
+
+    def __hash__(self) -> int:
+        return hash((self.tipo, self.valor))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.valor!r})"
+
+
+class _PredicadoExato(_Predicado):
+    __slots__ = ()
+    tipo = "exato"
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return nome_trilha == self.valor
+
+
+class _PredicadoComeca(_Predicado):
+    __slots__ = ()
+    tipo = "comeca"
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return nome_trilha.startswith(self.valor)
+
+
+class _PredicadoTermina(_Predicado):
+    __slots__ = ()
+    tipo = "termina"
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return nome_trilha.endswith(self.valor)
+
+
+class _PredicadoContem(_Predicado):
+    __slots__ = ()
+    tipo = "contem"
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return self.valor in nome_trilha
+
+
+class _PredicadoRegex(_Predicado):
+    __slots__ = ("padrao",)
+    tipo = "regex"
+
+    def __init__(self, valor: str):
+        super().__init__(valor)
+        try:
+            self.padrao = re.compile(valor)
+        except re.error as e:
+            raise ValueError(f"Expressão regular inválida na regra de trilha: {valor!r} ({e})")
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return self.padrao.fullmatch(nome_trilha) is not None
+
+
+_PREDICADOS = {classe.tipo: classe for classe in (
+    _PredicadoExato, _PredicadoComeca, _PredicadoTermina, _PredicadoContem, _PredicadoRegex
+)}
+
+
+class _ContagemTrilhas:
+    """
+    Predicado compilado para a regra 'num_trilhas' (ex: 3, '>1', '>=2', '<5').
+    """
+    __slots__ = ("operador", "valor")
+
+    def __init__(self, especificacao: Union[int, str]):
+        if isinstance(especificacao, bool) or not isinstance(especificacao, (int, str)):
+            raise ValueError(f"Formato de regra 'num_trilhas' inválido: {especificacao}")
+
+        if isinstance(especificacao, int):
+            self.operador, self.valor = "==", especificacao
+            return
+
+        match = re.match(r'([<>]=?|==)?\s*(\d+)', especificacao)
+        if not match:
+            raise ValueError(f"Formato de regra 'num_trilhas' inválido: {especificacao}")
+        op, val = match.groups()
+        self.operador, self.valor = op or "==", int(val)
+
+    def __call__(self, num_trilhas: int) -> bool:
+        if self.operador == ">":
+            return num_trilhas > self.valor
+        if self.operador == ">=":
+            return num_trilhas >= self.valor
+        if self.operador == "<":
+            return num_trilhas < self.valor
+        if self.operador == "<=":
+            return num_trilhas <= self.valor
+        return num_trilhas == self.valor
+
+
+class RegraTrilha:
+    """
+    Regra de trilha compilada: predicado sobre o nome, tipo de conteúdo e obrigatoriedade.
+    """
+    __slots__ = ("predicado", "content_type", "mandatory")
+
+    def __init__(self, regra: Dict[str, Any]):
+        if not isinstance(regra, dict):
+            raise ValueError(f"Regra de trilha deve ser um dicionário: {regra!r}")
+
+        tipo_regra = regra.get("type")
+        regra_valor = regra.get("value")
+        if tipo_regra not in _PREDICADOS:
+            raise ValueError(f"Tipo de regra de trilha desconhecido: {tipo_regra!r}. Esperado um de {TIPOS_REGRA}.")
+        if not isinstance(regra_valor, str):
+            raise ValueError(f"O valor da regra '{tipo_regra}' deve ser texto: {regra_valor!r}")
+
+        content_type = regra.get("content_type")
+        if content_type is not None and content_type not in TIPOS_CONTEUDO:
+            raise ValueError(f"Tipo de conteúdo desconhecido: {content_type!r}. Esperado um de {TIPOS_CONTEUDO}.")
+
+        self.predicado = _PREDICADOS[tipo_regra](regra_valor)
+        self.content_type: Optional[str] = content_type
+        self.mandatory: bool = bool(regra.get("mandatory", True))
+
+    def __call__(self, nome_trilha: str) -> bool:
+        return self.predicado(nome_trilha)
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.predicado.tipo,
+            "value": self.predicado.valor,
+            "content_type": self.content_type,
+            "mandatory": self.mandatory,
+        }
+
+    def descricao(self) -> str:
+        return f"{self.predicado.tipo} '{self.predicado.valor}'"
+
+    def __repr__(self) -> str:
+        return f"RegraTrilha({self.para_dict()!r})"
+
+
+class RuleSet:
+    """
+    Conjunto de regras de validação compilado a partir de um dicionário de regras.
+
+    O dicionário é validado e compilado uma única vez (predicados de nome de trilha e
+    expressões regulares pré-compiladas). O objeto é imutável, pode ser usado como chave
+    de dicionário e pode ser serializado com pickle para uso em processos paralelos.
+
+    Exemplo::
+
+        regras = RuleSet({
+            "num_trilhas": 3,
+            "maiusculas": True,
+            "regras_trilhas": [
+                {"type": "exato", "value": "DISF", "content_type": "DISF"},
+                {"type": "comeca", "value": "DOC", "content_type": "DOC"},
+            ],
+        })
+    """
+    __slots__ = ("num_trilhas", "contagem_trilhas", "maiusculas", "regras_trilhas", "assinatura")
+
+    def __init__(self, regras: Dict[str, Any]):
+        if not isinstance(regras, dict):
+            raise ValueError(f"As regras devem ser um dicionário, recebido: {type(regras)}")
+
+        regras_trilhas = regras.get("regras_trilhas") or []
+        if not isinstance(regras_trilhas, (list, tuple)):
+            raise ValueError("'regras_trilhas' deve ser uma lista de regras.")
+
+        num_trilhas = regras.get("num_trilhas")
+        object.__setattr__(self, "num_trilhas", num_trilhas)
+        object.__setattr__(self, "contagem_trilhas", _ContagemTrilhas(num_trilhas) if num_trilhas is not None else None)
+        object.__setattr__(self, "maiusculas", bool(regras.get("maiusculas", False)))
+        object.__setattr__(self, "regras_trilhas", tuple(RegraTrilha(r) for r in regras_trilhas))
+
+        canonico = json.dumps(self.para_dict(), sort_keys=True, ensure_ascii=False)
+        object.__setattr__(self, "assinatura", hashlib.sha256(canonico.encode("utf-8")).hexdigest())
+
+    @classmethod
+    def de(cls, regras: Union["RuleSet", Dict[str, Any]]) -> "RuleSet":
+        """
+        Retorna um RuleSet a partir de um RuleSet ou de um dicionário de regras.
+
+        Dicionários equivalentes reaproveitam a mesma compilação dentro do processo.
+        """
+        if isinstance(regras, RuleSet):
+            return regras
+        try:
+            chave = json.dumps(regras, sort_keys=True)
+        except TypeError:
+            return cls(regras)
+        return _compila_regras(chave)
+
+    @property
+    def num_mandatorias(self) -> int:
+        return sum(1 for regra in self.regras_trilhas if regra.mandatory)
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "num_trilhas": self.num_trilhas,
+            "maiusculas": self.maiusculas,
+            "regras_trilhas": [regra.para_dict() for regra in self.regras_trilhas],
+        }
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        raise AttributeError("RuleSet é imutável.")
+
+    def __eq__(self, outro: object) -> bool:
+        return isinstance(outro, RuleSet) and self.assinatura == outro.assinatura
+
+    def __hash__(self) -> int:
+        return hash(self.assinatura)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (RuleSet, (self.para_dict(),))
+
+    def __repr__(self) -> str:
+        return f"RuleSet({self.para_dict()!r})"
+
+
+@functools.lru_cache(maxsize=32)
+def _compila_regras(chave: str) -> RuleSet:
+    return RuleSet(json.loads(chave))
+
+
+# Conjuntos de regras predefinidos, usados pelo app e pela linha de comando
+REGRAS_ENTREVISTA = {
+    "num_trilhas": 3,
+    "maiusculas": True,
+    "regras_trilhas": [
+        {"type": "exato", "value": "DISF", "content_type": "DISF"},
+        {"type": "comeca", "value": "DOC", "content_type": "DOC"},
+        {"type": "regex", "value": r"^[A-Z]+\d?[A-Z]+$", "content_type": "INF"}
+    ]
+}
+
+REGRAS_NOMEACAO = {
+    "num_trilhas": 2,
+    "maiusculas": False,
+    "regras_trilhas": [
+        {"type": "regex", "value": r"^[A-Z]+\d?[A-Z]+$", "content_type": "INF"},
+        {"type": "regex", "value": r"^[A-Z]+\d{1}[A-Z]+$", "content_type": "INF"}
+    ]
+}
+
+REGRAS_PREDEFINIDAS = {
+    "entrevista": REGRAS_ENTREVISTA,
+    "nomeacao": REGRAS_NOMEACAO,
+}
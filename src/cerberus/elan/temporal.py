@@ -0,0 +1,167 @@
+import bisect
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..instrumentacao import Instrumentacao
+from .erros import AgregadorErros, OrcamentoErros
+from .regras import RuleSet
+from .transcricao import FonteAnotacoes
+from .validador import _resolve_mapeamento
+
+# Tipos de conteúdo cujas anotações delimitam os trechos de fala
+TIPOS_FALA = ("INF", "DOC")
+
+# Códigos da varredura de cada trilha, usados no modo de triagem
+_CODIGOS_VARREDURA = ("DURACAO_INVALIDA", "SOBREPOSICAO")
+
+
+def _intervalos(anotacoes: List[Tuple[Optional[int], Optional[int], str]]) -> List[Tuple[int, int, str]]:
+    """
+    Anotações com tempos definidos, ordenadas por início e fim.
+    """
+    return sorted(
+        ((inicio, fim, valor) for inicio, fim, valor in anotacoes if inicio is not None and fim is not None),
+        key=lambda anotacao: (anotacao[0], anotacao[1]),
+    )
+
+
+def _varre_trilha(nome_trilha: str, intervalos: List[Tuple[int, int, str]], erros: AgregadorErros) -> None:
+    """
+    Verifica durações e sobreposições de uma trilha em uma única varredura das anotações ordenadas.
+
+    Uma anotação se sobrepõe a alguma anterior quando começa antes do maior fim visto até
+    ela; anotações que apenas se tocam (fim == início) não são sobrepostas.
+    """
+    limitado = erros.orcamento is not None
+    maior_fim = None
+    for inicio, fim, _ in intervalos:
+        if fim <= inicio:
+            erros.adiciona("DURACAO_INVALIDA", nome_trilha, inicio, fim)
+        else:
+            if maior_fim is not None and inicio < maior_fim:
+                erros.adiciona("SOBREPOSICAO", nome_trilha, inicio, fim)
+            if maior_fim is None or fim > maior_fim:
+                maior_fim = fim
+        if limitado and erros.trilha_esgotada(nome_trilha, _CODIGOS_VARREDURA):
+            erros.orcamento.interrompe()
+            return
+
+
+def _une_intervalos(intervalos: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """
+    União de intervalos ordenados por início, como listas paralelas de inícios e fins disjuntos.
+    """
+    inicios: List[int] = []
+    fins: List[int] = []
+    for inicio, fim in intervalos:
+        if fins and inicio <= fins[-1]:
+            if fim > fins[-1]:
+                fins[-1] = fim
+        else:
+            inicios.append(inicio)
+            fins.append(fim)
+    return inicios, fins
+
+
+def valida_tempos_trilhas(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                          instrumentacao: Optional[Instrumentacao] = None) -> Tuple[bool, List[str]]:
+    """
+    Valida os TEMPOS das anotações: durações, sobreposições e disfluências fora dos trechos de fala.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo} ou RuleSet.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
+    :return: Tupla contendo (Sucesso, ListaDeRelatorio), no mesmo formato de 'valida_conteudo_trilhas'.
+    :rtype: Tuple[bool, List[str]]
+    """
+    relatorio_final = valida_tempos_estruturado(eaf, regras_mapeamento, instrumentacao).mensagens()
+    return (not relatorio_final, relatorio_final)
+
+
+def valida_tempos_estruturado(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                              instrumentacao: Optional[Instrumentacao] = None,
+                              max_exemplos: int = 3, orcamento: Optional[OrcamentoErros] = None) -> AgregadorErros:
+    """
+    Valida os TEMPOS das anotações e devolve os erros estruturados.
+
+    Cada trilha é ordenada uma vez e percorrida em uma única varredura (O(n log n)):
+        - DURACAO_INVALIDA: anotação com fim menor ou igual ao início;
+        - SOBREPOSICAO: anotação que começa antes do fim de outra da mesma trilha;
+        - DISF_FORA_DA_FALA: anotação DISF que não está contida na união dos trechos das
+          anotações INF/DOC (busca binária nos trechos unidos).
+
+    Trilhas ausentes são ignoradas; elas já são apontadas pela validação de conteúdo.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo} ou RuleSet.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
+    :param max_exemplos: Quantidade de exemplos guardados por (código de erro, trilha).
+    :type max_exemplos: int
+    :param orcamento: Limites de erros do arquivo (modo de triagem), como em 'valida_conteudo_estruturado'.
+    :type orcamento: Optional[OrcamentoErros]
+    :return: Erros encontrados; vazio se os tempos são válidos.
+    :rtype: AgregadorErros
+    """
+    if instrumentacao is None:
+        return _valida_tempos_trilhas(eaf, regras_mapeamento, max_exemplos, orcamento)
+    with instrumentacao.etapa("valida_tempos_trilhas"):
+        erros = _valida_tempos_trilhas(eaf, regras_mapeamento, max_exemplos, orcamento)
+    for grupo in erros:
+        instrumentacao.conta(f"erros.{grupo.primeiro.codigo}", grupo.total)
+    return erros
+
+
+def _valida_tempos_trilhas(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                           max_exemplos: int, orcamento: Optional[OrcamentoErros] = None) -> AgregadorErros:
+    """
+    Implementação de 'valida_tempos_estruturado'.
+    """
+    erros = AgregadorErros(max_exemplos, orcamento)
+
+    regras_mapeamento = _resolve_mapeamento(eaf, regras_mapeamento)
+    if regras_mapeamento is None:
+        erros.adiciona_global("MAPEAMENTO_RULESET")
+        return erros
+
+    trilhas_existentes = set(eaf.get_tier_names())
+    fala: List[Tuple[int, int]] = []
+    disfluencias: List[Tuple[str, List[Tuple[int, int, str]]]] = []
+
+    for nome_trilha, tipo_regra in regras_mapeamento.items():
+        if erros.esgotado:
+            orcamento.interrompe()
+            return erros
+        if nome_trilha not in trilhas_existentes:
+            continue
+        intervalos = _intervalos(eaf.get_annotation_data_for_tier(nome_trilha))
+        _varre_trilha(nome_trilha, intervalos, erros)
+
+        if tipo_regra in TIPOS_FALA:
+            fala.extend((inicio, fim) for inicio, fim, valor in intervalos if fim > inicio and valor and valor.strip())
+        elif tipo_regra == "DISF":
+            disfluencias.append((nome_trilha, intervalos))
+
+    if disfluencias:
+        fala.sort()
+        inicios_fala, fins_fala = _une_intervalos(fala)
+        for nome_trilha, intervalos in disfluencias:
+            if erros.trilha_esgotada(nome_trilha, ("DISF_FORA_DA_FALA",)):
+                orcamento.interrompe()
+                continue
+            for inicio, fim, valor in intervalos:
+                if fim <= inicio or not valor or not valor.strip():
+                    continue
+                # Trecho de fala unido que começa mais perto do início da disfluência (sem passar dele)
+                posicao = bisect.bisect_right(inicios_fala, inicio) - 1
+                if posicao < 0 or fim > fins_fala[posicao]:
+                    erros.adiciona("DISF_FORA_DA_FALA", nome_trilha, inicio, fim)
+                    if erros.trilha_esgotada(nome_trilha, ("DISF_FORA_DA_FALA",)):
+                        orcamento.interrompe()
+                        break
+
+    return erros
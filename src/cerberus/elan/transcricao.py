@@ -0,0 +1,190 @@
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, KeysView, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pympi
+
+Anotacao = Tuple[Optional[int], Optional[int], str]
+
+# Valor guardado nas colunas de tempo para anotações sem tempo (TIME_SLOT sem TIME_VALUE)
+_SEM_TEMPO = -(2 ** 63)
+
+
+def _tempo(valor: int) -> Optional[int]:
+    return None if valor == _SEM_TEMPO else valor
+
+
+class AnotacoesTrilha(Sequence):
+    """
+    Anotações de uma trilha em colunas: inícios e fins em array('q') e valores em uma tupla.
+
+    Comporta-se como a lista de tuplas (inicio, fim, valor) de 'get_annotation_data_for_tier'
+    (len, índice, iteração), montando cada tupla apenas quando ela é lida.
+
+    :param inicios: Inícios das anotações, em milissegundos.
+    :param fins: Fins das anotações, em milissegundos.
+    :param valores: Textos das anotações.
+    :param ids: ANNOTATION_ID das anotações, na mesma ordem, unidos por '\n' em um único texto
+        (um ID do XML não contém espaços), já que só a validação incremental os consulta.
+    """
+
+    __slots__ = ("inicios", "fins", "valores", "ids", "_com_tempos_ausentes")
+
+    def __init__(self, inicios: array, fins: array, valores: Tuple[str, ...], ids: str = ""):
+        self.inicios = inicios
+        self.fins = fins
+        self.valores = valores
+        self.ids = ids
+        self._com_tempos_ausentes = _SEM_TEMPO in inicios or _SEM_TEMPO in fins
+
+    @classmethod
+    def de_anotacoes(cls, anotacoes: Iterable[Anotacao], ids: Iterable[str] = ()) -> "AnotacoesTrilha":
+        """
+        Monta as colunas a partir de tuplas (inicio, fim, valor); textos repetidos passam a ser um único objeto.
+
+        Campos além dos três primeiros são ignorados: em trilhas de referência o pympi devolve
+        (inicio, fim, valor, valor_referenciado), com os tempos já herdados da anotação pai.
+        """
+        inicios, fins = array("q"), array("q")
+        valores = []
+        for inicio, fim, valor, *_ in anotacoes:
+            inicios.append(_SEM_TEMPO if inicio is None else inicio)
+            fins.append(_SEM_TEMPO if fim is None else fim)
+            valores.append(sys.intern(valor))
+        return cls(inicios, fins, tuple(valores), "\n".join(ids))
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        return _tempo(self.inicios[indice]), _tempo(self.fins[indice]), self.valores[indice]
+
+    def __iter__(self) -> Iterator[Anotacao]:
+        if not self._com_tempos_ausentes:
+            return zip(self.inicios, self.fins, self.valores)
+        return ((_tempo(inicio), _tempo(fim), valor) for inicio, fim, valor in zip(self.inicios, self.fins, self.valores))
+
+    def __reduce__(self):
+        # Para pools de processos: as colunas de tempo viajam como bytes e cada texto repetido uma única vez
+        return (AnotacoesTrilha, (self.inicios, self.fins, self.valores, self.ids))
+
+    def __repr__(self) -> str:
+        return f"AnotacoesTrilha({len(self)} anotações)"
+
+
+class TrilhaNaoCarregada(KeyError):
+    """
+    A trilha existe no arquivo, mas suas anotações não foram lidas (ficou fora das 'trilhas' pedidas a 'le_eaf').
+    """
+
+
+class Transcricao:
+    """
+    Representação compacta das trilhas e anotações de um arquivo .eaf, independente do pympi.
+
+    É o que 'le_eaf' devolve e o que as etapas de validação recebem em todos os caminhos
+    (lote, serviço, observação e aplicativo). Expõe a interface usada pelos validadores
+    ('get_tier_names', 'get_annotation_data_for_tier' e 'get_annotation_ids_for_tier'), a mesma
+    de um pympi.Elan.Eaf. Cada trilha guarda suas anotações em colunas (AnotacoesTrilha), o que
+    ocupa uma fração da memória das tuplas do pympi e é serializada rapidamente entre processos.
+
+    Uma trilha cujas anotações não foram lidas continua em 'get_tier_names', mas aparece
+    em 'trilhas' como None e a leitura das suas anotações levanta TrilhaNaoCarregada.
+
+    :param nome: Nome do arquivo de origem.
+    """
+
+    __slots__ = ("nome", "trilhas")
+
+    def __init__(self, nome: Optional[str] = None):
+        self.nome = nome
+        self.trilhas: Dict[str, Optional[AnotacoesTrilha]] = {}
+
+    def _trilha(self, id_tier: str) -> AnotacoesTrilha:
+        trilha = self.trilhas[id_tier]
+        if trilha is None:
+            raise TrilhaNaoCarregada(id_tier)
+        return trilha
+
+    @classmethod
+    def de_eaf(cls, eaf: "FonteAnotacoes", nome: Optional[str] = None) -> "Transcricao":
+        """
+        Converte um pympi.Elan.Eaf (ou qualquer objeto com a interface dos validadores).
+
+        Os ANNOTATION_ID são obtidos por 'ids_anotacoes'.
+
+        :param eaf: Objeto Eaf carregado.
+        :type eaf: FonteAnotacoes
+        :param nome: Nome do arquivo de origem.
+        :type nome: Optional[str]
+        :return: Transcrição com todas as trilhas do objeto.
+        :rtype: Transcricao
+        """
+        transcricao = cls(nome)
+        for nome_trilha in eaf.get_tier_names():
+            anotacoes = eaf.get_annotation_data_for_tier(nome_trilha)
+            transcricao.trilhas[nome_trilha] = AnotacoesTrilha.de_anotacoes(
+                anotacoes, ids_anotacoes(eaf, nome_trilha, len(anotacoes))
+            )
+        return transcricao
+
+    def get_tier_names(self) -> KeysView[str]:
+        return self.trilhas.keys()
+
+    def get_annotation_data_for_tier(self, id_tier: str) -> AnotacoesTrilha:
+        """
+        Retorna as anotações da trilha como uma sequência de (inicio, fim, valor), em milissegundos.
+
+        :raises KeyError: Se a trilha não existir no arquivo.
+        :raises TrilhaNaoCarregada: Se as anotações da trilha não foram lidas.
+        """
+        return self._trilha(id_tier)
+
+    def get_annotation_ids_for_tier(self, id_tier: str) -> List[str]:
+        """
+        Retorna os ANNOTATION_ID da trilha, na mesma ordem de 'get_annotation_data_for_tier'.
+
+        :raises KeyError: Se a trilha não existir no arquivo.
+        :raises TrilhaNaoCarregada: Se as anotações da trilha não foram lidas.
+        """
+        trilha = self._trilha(id_tier)
+        return trilha.ids.split("\n") if trilha.ids else [str(i) for i in range(len(trilha))]
+
+    def __repr__(self) -> str:
+        return f"Transcricao({self.nome!r}, {len(self.trilhas)} trilhas)"
+
+
+# Objetos aceitos pelas etapas de validação: a Transcricao do leitor nativo ou um pympi.Elan.Eaf
+FonteAnotacoes = Union[Transcricao, "pympi.Elan.Eaf"]
+
+
+def ids_anotacoes(eaf: FonteAnotacoes, nome_trilha: str, quantidade: int) -> List[str]:
+    """
+    Obtém os ANNOTATION_ID de uma trilha, na ordem de 'get_annotation_data_for_tier'.
+
+    Funciona com a Transcricao e com o pympi.Elan.Eaf. Sem identificadores disponíveis,
+    usa a posição da anotação na trilha.
+
+    :param eaf: Objeto com as trilhas do arquivo.
+    :type eaf: FonteAnotacoes
+    :param nome_trilha: Nome da trilha.
+    :type nome_trilha: str
+    :param quantidade: Quantidade de anotações da trilha.
+    :type quantidade: int
+    :return: Os identificadores das anotações.
+    :rtype: List[str]
+    """
+    obtem_ids = getattr(eaf, "get_annotation_ids_for_tier", None)
+    if obtem_ids is not None:
+        return obtem_ids(nome_trilha)
+
+    trilhas = getattr(eaf, "tiers", None)
+    if trilhas is not None and nome_trilha in trilhas:
+        alinhadas, referencias = trilhas[nome_trilha][0], trilhas[nome_trilha][1]
+        return list(referencias if referencias else alinhadas)
+
+    return [str(i) for i in range(quantidade)]
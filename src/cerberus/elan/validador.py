@@ -1,143 +1,376 @@
 import collections
 import re
-from itertools import permutations, combinations
-from typing import Any, Dict, List, Tuple, Optional
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional, Sequence, Union
 
-import pympi
+from ..instrumentacao import Instrumentacao
+from .erros import AgregadorErros, OrcamentoErros
+from .layouts import MemoLayouts
+from .leitor import LeituraEmFluxo
+from .regras import RegraTrilha, RuleSet
+from .transcricao import FonteAnotacoes
 
-def _valida_regra(nome_trilha: str, regra: Dict[str, Any]) -> bool:
+def _hopcroft_karp(adjacencia: List[List[int]], num_direita: int) -> List[Optional[int]]:
     """
-    Função auxiliar para checar um nome de trilha contra uma regra específica.
+    Calcula um emparelhamento máximo em um grafo bipartido (algoritmo de Hopcroft-Karp).
 
-    :param nome_trilha: O nome da trilha a ser validada.
-    :type nome_trilha: str
-    :param regra: Dicionário contendo o tipo ('type') e o valor ('value') da regra.
-    :type regra: Dict[str, Any]
-    :return: True se a trilha satisfaz a regra, False caso contrário.
+    :param adjacencia: Para cada vértice da esquerda, a lista de vértices da direita compatíveis.
+    :type adjacencia: List[List[int]]
+    :param num_direita: Quantidade de vértices do lado direito.
+    :type num_direita: int
+    :return: Para cada vértice da esquerda, o índice do vértice da direita emparelhado (ou None).
+    :rtype: List[Optional[int]]
+    """
+    num_esquerda = len(adjacencia)
+    par_esquerda: List[Optional[int]] = [None] * num_esquerda
+    par_direita: List[Optional[int]] = [None] * num_direita
+    distancia: List[float] = [0] * num_esquerda
+    infinito = float("inf")
+
+    def busca_em_largura() -> bool:
+        fila = collections.deque()
+        for u in range(num_esquerda):
+            if par_esquerda[u] is None:
+                distancia[u] = 0
+                fila.append(u)
+            else:
+                distancia[u] = infinito
+        encontrou_livre = False
+        while fila:
+            u = fila.popleft()
+            for v in adjacencia[u]:
+                w = par_direita[v]
+                if w is None:
+                    encontrou_livre = True
+                elif distancia[w] == infinito:
+                    distancia[w] = distancia[u] + 1
+                    fila.append(w)
+        return encontrou_livre
+
+    def busca_em_profundidade(raiz: int, proximo: List[int]) -> bool:
+        # Iterativa, para não depender do limite de recursão: a pilha é o caminho alternante em construção
+        pilha = [raiz]
+        while pilha:
+            u = pilha[-1]
+            if proximo[u] == len(adjacencia[u]):
+                distancia[u] = infinito
+                pilha.pop()
+                continue
+            v = adjacencia[u][proximo[u]]
+            proximo[u] += 1
+            w = par_direita[v]
+            if w is None:
+                # Caminho aumentante: cada vértice da pilha passa a ocupar o par do seguinte
+                while pilha:
+                    u = pilha.pop()
+                    anterior = par_esquerda[u]
+                    par_esquerda[u] = v
+                    par_direita[v] = u
+                    v = anterior
+                return True
+            if distancia[w] == distancia[u] + 1:
+                pilha.append(w)
+        return False
+
+    while busca_em_largura():
+        proximo = [0] * num_esquerda
+        for u in range(num_esquerda):
+            if par_esquerda[u] is None:
+                busca_em_profundidade(u, proximo)
+
+    return par_esquerda
+
+def _realoca(origem: int, destino: int, vizinhos: Callable[[int], Iterable[int]],
+             par_esquerda: List[Optional[int]], par_direita: List[Optional[int]]) -> bool:
+    """
+    Troca pares ao longo de um caminho alternante de 'origem' (esquerda) até 'destino' (direita).
+
+    'origem' perde seu par atual e 'destino' passa a ser ocupado por outro vértice da esquerda;
+    os demais vértices do caminho apenas trocam de par. Nada muda se o caminho não existir.
+
+    :param vizinhos: Arestas permitidas de cada vértice da esquerda.
+    :type vizinhos: Callable[[int], Iterable[int]]
+    :return: True se o caminho foi encontrado e aplicado.
     :rtype: bool
     """
-    tipo_regra = regra.get("type")
-    regra_valor = regra.get("value")
-
-    if tipo_regra == "exato":
-        return nome_trilha == regra_valor
-    if tipo_regra == "comeca":
-        return nome_trilha.startswith(regra_valor)
-    if tipo_regra == "termina":
-        return nome_trilha.endswith(regra_valor)
-    if tipo_regra == "contem":
-        return regra_valor in nome_trilha
-    if tipo_regra == "regex":
-        return re.fullmatch(regra_valor, nome_trilha) is not None
-    
+    alcancado_por: Dict[int, int] = {}
+    fila = collections.deque([origem])
+    while fila:
+        u = fila.popleft()
+        for v in vizinhos(u):
+            if v == par_esquerda[u] or v in alcancado_por:
+                continue
+            alcancado_por[v] = u
+            if v != destino:
+                fila.append(par_direita[v])
+                continue
+            while True:
+                u = alcancado_por[v]
+                anterior = par_esquerda[u]
+                par_esquerda[u] = v
+                par_direita[v] = u
+                if u == origem:
+                    return True
+                v = anterior
     return False
 
-def valida_id_trilhas(eaf: pympi.Elan.Eaf, regras: Dict[str, Any]) -> Tuple[bool, List[str], Optional[Dict[str, str]]]:
+def _emparelha_trilhas_regras(compatibilidade: List[List[int]], regras_trilhas: Sequence[RegraTrilha]) -> Optional[List[int]]:
+    """
+    Procura uma atribuição de regras às trilhas que use todas as regras obrigatórias.
+
+    As regras que sobram (quantidade de regras menos quantidade de trilhas) são absorvidas
+    por vértices fictícios ligados apenas às regras opcionais. Assim, um emparelhamento
+    perfeito do grafo aumentado equivale a uma atribuição válida.
+
+    Quando há mais de uma atribuição válida, devolve a que a busca exaustiva anterior
+    (combinações de regras e permutações de trilhas, em ordem) encontrava primeiro, para que
+    trilhas ambíguas recebam o mesmo tipo de conteúdo: a partir do emparelhamento perfeito,
+    cada regra, na ordem do conjunto, é incluída se ainda houver atribuição que a use, e em
+    seguida cada regra incluída recebe a primeira trilha que ainda permite completar a atribuição.
+
+    :param compatibilidade: Para cada trilha, os índices das regras que ela satisfaz.
+    :type compatibilidade: List[List[int]]
+    :param regras_trilhas: Lista de regras de trilha compiladas.
+    :type regras_trilhas: Sequence[RegraTrilha]
+    :return: Índice da regra atribuída a cada trilha, ou None se não houver atribuição válida.
+    :rtype: Optional[List[int]]
+    """
+    num_trilhas = len(compatibilidade)
+    num_regras = len(regras_trilhas)
+    if num_trilhas > num_regras:
+        return None
+
+    opcionais = [j for j, regra in enumerate(regras_trilhas) if not regra.mandatory]
+    num_ficticios = num_regras - num_trilhas
+    if num_ficticios > len(opcionais):
+        return None
+
+    adjacencia = list(compatibilidade) + [opcionais] * num_ficticios
+    par_esquerda = _hopcroft_karp(adjacencia, num_regras)
+    if any(par is None for par in par_esquerda):
+        return None
+    par_direita: List[Optional[int]] = [None] * num_regras
+    for u, j in enumerate(par_esquerda):
+        par_direita[j] = u
+
+    # 1) Regras usadas: a primeira combinação de regras (em ordem) que admite uma atribuição
+    incluida = [False] * num_regras
+    excluida = [False] * num_regras
+    for j in range(num_regras):
+        if par_direita[j] < num_trilhas:
+            incluida[j] = True
+            continue
+
+        def vizinhos_inclusao(u: int) -> Iterable[int]:
+            if u < num_trilhas:
+                return (k for k in adjacencia[u] if not excluida[k])
+            return (k for k in opcionais if not incluida[k] and k != j)
+
+        # A regra está com um vértice fictício: tenta passá-la a uma trilha sem desfazer as escolhas anteriores
+        if _realoca(par_direita[j], j, vizinhos_inclusao, par_esquerda, par_direita):
+            incluida[j] = True
+        else:
+            excluida[j] = True
+
+    # 2) Trilha de cada regra usada: a primeira permutação das trilhas (em ordem) compatível com a combinação
+    trilhas_compativeis: List[List[int]] = [[] for _ in range(num_regras)]
+    for i, regras_compativeis in enumerate(compatibilidade):
+        for j in regras_compativeis:
+            trilhas_compativeis[j].append(i)
+    fixada = [False] * num_regras
+    for j in range(num_regras):
+        if not incluida[j]:
+            continue
+
+        def vizinhos_permutacao(u: int) -> Iterable[int]:
+            return (k for k in compatibilidade[u] if incluida[k] and not fixada[k] and k != j)
+
+        for i in trilhas_compativeis[j]:
+            if fixada[par_esquerda[i]]:
+                continue
+            if par_direita[j] == i:
+                break
+            # A trilha i deixa o par atual, que passa adiante pelo caminho até a trilha que hoje ocupa a regra j
+            if _realoca(par_direita[j], par_esquerda[i], vizinhos_permutacao, par_esquerda, par_direita):
+                par_esquerda[i], par_direita[j] = j, i
+                break
+        fixada[j] = True
+
+    return par_esquerda[:num_trilhas]
+
+def _diagnostica_emparelhamento(trilhas_presentes: List[str], compatibilidade: List[List[int]], regras_trilhas: Sequence[RegraTrilha]) -> List[str]:
+    """
+    Explica por que não existe atribuição válida entre trilhas e regras.
+
+    Aponta as trilhas que não satisfazem nenhuma regra e as regras obrigatórias que ficam
+    descobertas em um emparelhamento máximo entre trilhas e regras obrigatórias.
+
+    :return: Lista de mensagens de erro.
+    :rtype: List[str]
+    """
+    erros = []
+
+    for nome_trilha, regras_compativeis in zip(trilhas_presentes, compatibilidade):
+        if not regras_compativeis:
+            erros.append(f"A trilha '{nome_trilha}' não corresponde a nenhuma regra.")
+
+    obrigatorias = [j for j, regra in enumerate(regras_trilhas) if regra.mandatory]
+    posicao = {j: k for k, j in enumerate(obrigatorias)}
+    adjacencia = [[posicao[j] for j in regras_compativeis if j in posicao] for regras_compativeis in compatibilidade]
+    cobertas = {par for par in _hopcroft_karp(adjacencia, len(obrigatorias)) if par is not None}
+
+    for k, j in enumerate(obrigatorias):
+        if k not in cobertas:
+            erros.append(f"A regra obrigatória #{j + 1} ({regras_trilhas[j].descricao()}) não foi satisfeita por nenhuma trilha.")
+
+    return erros
+
+def _mapeia_trilhas(trilhas_presentes: List[str], regras: RuleSet) -> Tuple[Optional[Dict[str, str]], List[List[int]]]:
+    """
+    Associa cada trilha a uma regra do conjunto e deriva o mapeamento {trilha: tipo_de_conteudo}.
+
+    :param trilhas_presentes: Nomes das trilhas do arquivo.
+    :type trilhas_presentes: List[str]
+    :param regras: Conjunto de regras compilado.
+    :type regras: RuleSet
+    :return: Tupla (MapeamentoDeConteudo ou None se não houver atribuição válida, MatrizDeCompatibilidade).
+    :rtype: Tuple[Optional[Dict[str, str]], List[List[int]]]
+    """
+    regras_trilhas = regras.regras_trilhas
+    compatibilidade = [
+        [j for j, regra in enumerate(regras_trilhas) if regra(nome_trilha)]
+        for nome_trilha in trilhas_presentes
+    ]
+
+    emparelhamento = _emparelha_trilhas_regras(compatibilidade, regras_trilhas)
+    if emparelhamento is None:
+        return None, compatibilidade
+
+    # Na ordem das regras, como na busca exaustiva anterior (é a ordem em que o conteúdo é validado e relatado)
+    trilha_da_regra = {j: i for i, j in enumerate(emparelhamento)}
+    mapeamento_conteudo = {}
+    for j in sorted(trilha_da_regra):
+        content_type = regras_trilhas[j].content_type
+        if content_type:
+            mapeamento_conteudo[trilhas_presentes[trilha_da_regra[j]]] = content_type
+    return mapeamento_conteudo, compatibilidade
+
+def valida_id_trilhas(eaf: FonteAnotacoes, regras: Union[RuleSet, Dict[str, Any]],
+                      instrumentacao: Optional[Instrumentacao] = None,
+                      orcamento: Optional[OrcamentoErros] = None,
+                      memo: Optional[MemoLayouts] = None) -> Tuple[bool, List[str], Optional[Dict[str, str]]]:
     """
     Valida as trilhas (tiers) de um objeto Eaf contra um conjunto de regras estruturais.
 
     Verifica a quantidade de trilhas, formatação (maiúsculas) e aplica regras de correspondência 
     permitindo trilhas opcionais e intervalos de quantidade.
 
-    :param eaf: Objeto Eaf carregado via pympi.
-    :type eaf: pympi.Elan.Eaf
-    :param regras: Dicionário contendo configurações como 'num_trilhas', 'maiusculas' e 'regras_trilhas'.
-    :type regras: Dict[str, Any]
+    O resultado depende apenas das regras e dos nomes das trilhas, e pode ser memorizado em
+    'memo' por disposição de trilhas: arquivos com as mesmas trilhas reaproveitam o resultado.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras: RuleSet compilado, ou dicionário contendo configurações como 'num_trilhas', 'maiusculas' e 'regras_trilhas'.
+    :type regras: Union[RuleSet, Dict[str, Any]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
+    :param orcamento: Limites de erros do arquivo (modo de triagem). Esgotado o orçamento, as
+                      verificações restantes (inclusive o emparelhamento) não são executadas.
+    :type orcamento: Optional[OrcamentoErros]
+    :param memo: Memória de disposições de trilhas já resolvidas (ex: MEMO_LAYOUTS, a do processo).
+                 None (padrão): sem memorização.
+    :type memo: Optional[MemoLayouts]
     :return: Uma tupla contendo (Sucesso, ListaDeErros, MapeamentoDeConteudo).
     :rtype: Tuple[bool, List[str], Optional[Dict[str, str]]]
     """
+    if instrumentacao is None:
+        return _valida_id_trilhas_memo(eaf, regras, None, orcamento, memo)
+    with instrumentacao.etapa("valida_id_trilhas"):
+        return _valida_id_trilhas_memo(eaf, regras, instrumentacao, orcamento, memo)
+
+def _valida_id_trilhas_memo(eaf: FonteAnotacoes, regras: Union[RuleSet, Dict[str, Any]],
+                            instrumentacao: Optional[Instrumentacao], orcamento: Optional[OrcamentoErros],
+                            memo: Optional[MemoLayouts]) -> Tuple[bool, List[str], Optional[Dict[str, str]]]:
+    """
+    Consulta a memória de disposições antes de executar '_valida_id_trilhas'.
+    """
+    if memo is None:
+        return _valida_id_trilhas(eaf, regras, instrumentacao, orcamento)
+    regras = RuleSet.de(regras)
+    trilhas_presentes = list(eaf.get_tier_names())
+    resultado = memo.obtem(regras, trilhas_presentes)
+    # Com orçamento, um resultado com erros é recalculado para que os erros sejam registrados nele
+    if resultado is not None and (orcamento is None or resultado[0]):
+        if instrumentacao is not None:
+            instrumentacao.conta("ids_memo.acertos")
+        return resultado
+    if instrumentacao is not None:
+        instrumentacao.conta("ids_memo.falhas")
+    resultado = _valida_id_trilhas(eaf, regras, instrumentacao, orcamento)
+    # Um resultado interrompido pelo orçamento não é o resultado completo da disposição
+    if orcamento is None or resultado[0]:
+        memo.guarda(regras, trilhas_presentes, resultado)
+    return resultado
+
+def _esgota(orcamento: Optional[OrcamentoErros], codigo: str, trilha: Optional[str] = None) -> bool:
+    """
+    Registra um erro de IDs no orçamento e indica se a validação deve parar.
+    """
+    if orcamento is None:
+        return False
+    orcamento.registra(codigo, trilha)
+    if orcamento.esgotado:
+        orcamento.interrompe()
+        return True
+    return False
+
+def _valida_id_trilhas(eaf: FonteAnotacoes, regras: Union[RuleSet, Dict[str, Any]], instrumentacao: Optional[Instrumentacao],
+                       orcamento: Optional[OrcamentoErros] = None) -> Tuple[bool, List[str], Optional[Dict[str, str]]]:
+    """
+    Implementação de 'valida_id_trilhas'.
+    """
+    regras = RuleSet.de(regras)
     trilhas_presentes = list(eaf.get_tier_names())
     erros = []
     mapeamento_conteudo = None
 
-    num_trilhas_esperado = regras.get("num_trilhas")
     num_trilhas_encontrado = len(trilhas_presentes)
     
-    # Lógica de validação de quantidade flexível
-    qtd_valida = True
-    if num_trilhas_esperado is not None:
-        if isinstance(num_trilhas_esperado, int):
-            if num_trilhas_encontrado != num_trilhas_esperado:
-                qtd_valida = False
-        elif isinstance(num_trilhas_esperado, str):
-            # Parser simples para operadores: >1, >=2, <5, etc.
-            match = re.match(r'([<>]=?|==)?\s*(\d+)', num_trilhas_esperado)
-            if match:
-                op, val = match.groups()
-                val = int(val)
-                if op == '>' and not (num_trilhas_encontrado > val): qtd_valida = False
-                elif op == '>=' and not (num_trilhas_encontrado >= val): qtd_valida = False
-                elif op == '<' and not (num_trilhas_encontrado < val): qtd_valida = False
-                elif op == '<=' and not (num_trilhas_encontrado <= val): qtd_valida = False
-                elif (op == '==' or op is None) and not (num_trilhas_encontrado == val): qtd_valida = False
-            else:
-                erros.append(f"Formato de regra 'num_trilhas' inválido: {num_trilhas_esperado}")
+    # Lógica de validação de quantidade flexível (já compilada no RuleSet)
+    qtd_valida = regras.contagem_trilhas is None or regras.contagem_trilhas(num_trilhas_encontrado)
 
     if not qtd_valida:
-        erros.append(f"Número incorreto de trilhas. Esperado: {num_trilhas_esperado}, Encontrado: {num_trilhas_encontrado}.")
+        erros.append(f"Número incorreto de trilhas. Esperado: {regras.num_trilhas}, Encontrado: {num_trilhas_encontrado}.")
         erros.append(f"   Trilhas presentes: {trilhas_presentes}")
+        if _esgota(orcamento, "NUM_TRILHAS"):
+            return (False, erros, None)
         
-    if regras.get("maiusculas", False):
+    if regras.maiusculas:
         for trilha in trilhas_presentes:
             if not trilha.isupper():
                 erros.append(f"A trilha '{trilha}' não está em maiúsculas.")
+                if _esgota(orcamento, "MAIUSCULAS"):
+                    return (False, erros, None)
     
-    regras_trilhas = regras.get("regras_trilhas", [])
+    regras_trilhas = regras.regras_trilhas
     if not regras_trilhas:
         return (not erros, erros, None)
 
     # Validar se há trilhas suficientes para cobrir as regras obrigatórias
-    num_mandatorias = sum(1 for r in regras_trilhas if r.get("mandatory", True))
+    num_mandatorias = regras.num_mandatorias
     if num_trilhas_encontrado < num_mandatorias:
         erros.append(f"Número de trilhas encontradas ({num_trilhas_encontrado}) é menor que o número de regras obrigatórias ({num_mandatorias}).")
         return (False, erros, None)
 
-    # Lógica de Combinação + Permutação para suportar regras opcionais
-    # Se temos 2 trilhas e 3 regras (1 opcional), precisamos achar qual subconjunto de 2 regras satisfaz as trilhas.
-    
-    permutacao_valida = False
-    indices_regras = range(len(regras_trilhas))
-    
-    # Itera sobre todas as combinações de regras que tenham o mesmo tamanho das trilhas encontradas
-    # Ex: Se achei 2 trilhas, testo todas as combinações de 2 regras disponíveis.
-    for subset_indices in combinations(indices_regras, num_trilhas_encontrado):
-        
-        # Verifica se as regras que NÃO foram escolhidas são todas opcionais
-        indices_ignorados = set(indices_regras) - set(subset_indices)
-        regras_ignoradas_sao_opcionais = all(
-            not regras_trilhas[idx].get("mandatory", True) for idx in indices_ignorados
-        )
-        
-        if not regras_ignoradas_sao_opcionais:
-            continue # Essa combinação ignorou uma regra obrigatória, então é inválida
-            
-        # Pega o subconjunto de regras para testar contra as trilhas
-        subset_regras = [regras_trilhas[i] for i in subset_indices]
-        
-        # Aqui entra a lógica original de permutação para alinhar trilhas com as regras escolhidas
-        for perm in permutations(trilhas_presentes):
-            status_permutacao = True
-            mapeamento_temp = {}
-            
-            for i, nome_trilha in enumerate(perm):
-                rule = subset_regras[i]
-                if not _valida_regra(nome_trilha, rule):
-                    status_permutacao = False
-                    break 
-                
-                content_type = rule.get("content_type")
-                if content_type:
-                    mapeamento_temp[nome_trilha] = content_type
-            
-            if status_permutacao:
-                permutacao_valida = True
-                mapeamento_conteudo = mapeamento_temp
-                break 
-        
-        if permutacao_valida:
-            break
+    # Emparelhamento bipartido trilhas x regras: cada trilha recebe exatamente uma regra,
+    # cada regra é usada no máximo uma vez e toda regra obrigatória precisa ser coberta.
+    mapeamento_conteudo, compatibilidade = _mapeia_trilhas(trilhas_presentes, regras)
+    if instrumentacao is not None:
+        instrumentacao.conta("emparelhamento.testes", num_trilhas_encontrado * len(regras_trilhas))
+    permutacao_valida = mapeamento_conteudo is not None
 
     if not permutacao_valida:
+        erros.extend(_diagnostica_emparelhamento(trilhas_presentes, compatibilidade, regras_trilhas))
         erros.append("Não foi encontrada uma combinação válida que satisfaça todas as regras de trilha (considerando obrigatórias/opcionais).")
         erros.append(f"   Trilhas Encontradas: {trilhas_presentes}")
         
@@ -151,159 +384,264 @@ def valida_id_trilhas(eaf: pympi.Elan.Eaf, regras: Dict[str, Any]) -> Tuple[bool
 
     return (sucesso, erros, mapeamento_conteudo if sucesso else None)
    
-def _valida_conteudo_disf(valor: str) -> List[str]:
+# Padrões de conteúdo compilados uma única vez por processo
+_PADRAO_DISF_PADRONIZADA = re.compile(r'\(\([A-Z\s]+\)\)')
+_PADRAO_DISF_DUPLA = re.compile(r'\(\(.*\)\)')
+# Sequências de caracteres fora do conjunto permitido (letras, acentos, espaços e pontuação da norma)
+_PADRAO_CARACTERES_INVALIDOS = re.compile(r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]+')
+
+def _valida_conteudo_disf(valor: str) -> List[Tuple[str, str]]:
     """
     Valida o conteúdo de uma anotação de uma trilha DISF.
 
     :param valor: O texto da anotação.
     :type valor: str
-    :return: Lista de códigos de erro encontrados.
-    :rtype: List[str]
+    :return: Lista de pares (código de erro, caracteres envolvidos) encontrados.
+    :rtype: List[Tuple[str, str]]
     """
     erros = []
     
     if valor == '(EST)' or valor == '(HES)':
         return [] 
         
-    if re.fullmatch(r'\(\([A-Z\s]+\)\)', valor):
+    if _PADRAO_DISF_PADRONIZADA.fullmatch(valor):
         return [] 
     
     if valor.upper() == '(EST)' or valor.upper() == '(HES)':
-        erros.append("ERRO_DISF") # Disfluência fora do padrão
+        erros.append(("ERRO_DISF", "")) # Disfluência fora do padrão
     
-    elif re.fullmatch(r'\(\(.*\)\)', valor):
-        erros.append("ERRO_DISF") # Disfluência fora do padrão
+    elif _PADRAO_DISF_DUPLA.fullmatch(valor):
+        erros.append(("ERRO_DISF", "")) # Disfluência fora do padrão
     
     else:
-        erros.append("DISF_INVALIDA") # Conteúdo inválido
+        erros.append(("DISF_INVALIDA", "")) # Conteúdo inválido
         
     return erros
 
-def _valida_conteudo_inf_doc(valor: str) -> List[str]:
+def _valida_conteudo_inf_doc(valor: str) -> List[Tuple[str, str]]:
     """
     Valida o conteúdo de uma anotação do tipo INF ou DOC.
 
     Verifica presença de dígitos, disfluências mal posicionadas e caracteres inválidos.
+    O texto é percorrido uma única vez pelo padrão de caracteres inválidos; como todo
+    dígito é também um caractere inválido, a checagem de dígitos usa apenas esse resultado.
 
     :param valor: O texto da anotação.
     :type valor: str
-    :return: Lista de códigos de erro encontrados.
-    :rtype: List[str]
+    :return: Lista de pares (código de erro, caracteres envolvidos) encontrados; os caracteres
+             (distintos e ordenados) só são preenchidos em 'CARACTERE_INVALIDO'.
+    :rtype: List[Tuple[str, str]]
     """
     erros = []
     
-    if re.search(r'\d', valor):
-        erros.append("DIGITO_PRESENTE") # Número encontrado
-        
-    if '(EST)' in valor or '(HES)' in valor or '((' in valor:
-        erros.append("DISF_PRESENTE") # Disfluência em trilha errada
-        
-    hipoteses = re.findall(r'\((?!\s*\))([^)]+)\)', valor)
-    for h in hipoteses:
-        if h.upper() == 'EST' or h.upper() == 'HES':
-            continue
-            
-        if h.strip() == '?':
-            continue
-            
-        padrao_caracteres_invalidos = r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]'
-        caracteres_invalidos = re.findall(padrao_caracteres_invalidos, valor)
+    caracteres_invalidos = "".join(_PADRAO_CARACTERES_INVALIDOS.findall(valor))
     
-    # Nota: o código original verificava caracteres_invalidos fora do loop, mantive a lógica
-    padrao_caracteres_invalidos = r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]'
-    caracteres_invalidos = re.findall(padrao_caracteres_invalidos, valor)
+    if caracteres_invalidos and any(c.isdecimal() for c in caracteres_invalidos):
+        erros.append(("DIGITO_PRESENTE", "")) # Número encontrado
+        
+    if '(' in valor and ('(EST)' in valor or '(HES)' in valor or '((' in valor):
+        erros.append(("DISF_PRESENTE", "")) # Disfluência em trilha errada
     
     if caracteres_invalidos:
-        erros.append(f"CARACTERE_INVALIDO:{sorted(list(set(caracteres_invalidos)))}")
+        erros.append(("CARACTERE_INVALIDO", "".join(sorted(set(caracteres_invalidos)))))
         
     return erros
 
+# Validador de conteúdo para cada tipo de conteúdo aceito em 'content_type'
+_VALIDADORES_CONTEUDO = {
+    "INF": _valida_conteudo_inf_doc,
+    "DOC": _valida_conteudo_inf_doc,
+    "DISF": _valida_conteudo_disf,
+}
+
+# Códigos (base) que cada validador de conteúdo pode devolver, usados no modo de triagem
+_CODIGOS_CONTEUDO = {
+    "INF": ("DIGITO_PRESENTE", "DISF_PRESENTE", "CARACTERE_INVALIDO"),
+    "DOC": ("DIGITO_PRESENTE", "DISF_PRESENTE", "CARACTERE_INVALIDO"),
+    "DISF": ("ERRO_DISF", "DISF_INVALIDA"),
+}
+
+
+def _resolve_mapeamento(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """
+    Devolve o mapeamento {nome_da_trilha: tipo_de_conteudo}, derivando-o das trilhas do arquivo quando recebe um RuleSet.
+    """
+    if isinstance(regras_mapeamento, RuleSet):
+        mapeamento, _ = _mapeia_trilhas(list(eaf.get_tier_names()), regras_mapeamento)
+        return mapeamento
+    return regras_mapeamento
+
+
+def valida_conteudo_em_fluxo(leitura: LeituraEmFluxo, regras_mapeamento: Dict[str, str],
+                             orcamento: OrcamentoErros, instrumentacao: Optional[Instrumentacao] = None,
+                             max_exemplos: int = 3) -> Optional[AgregadorErros]:
+    """
+    Valida o CONTEÚDO à medida que o arquivo é lido, parando a leitura quando o orçamento acaba (triagem).
+
+    Cada anotação é validada assim que sai de 'leitura.anotacoes'; quando o orçamento do
+    arquivo ('max_erros') se esgota, o resto do XML não é lido. Os erros relatados são então
+    os primeiros na ordem do arquivo (e não na ordem do mapeamento), e os tempos só são
+    resolvidos para os exemplos guardados.
+
+    :param leitura: Leitura em fluxo do arquivo, com as trilhas do mapeamento.
+    :type leitura: LeituraEmFluxo
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo}.
+    :type regras_mapeamento: Dict[str, str]
+    :param orcamento: Limites de erros do arquivo.
+    :type orcamento: OrcamentoErros
+    :param instrumentacao: Coletor opcional de contadores ('erros.<CODIGO>'), atualizado só quando a leitura para.
+    :type instrumentacao: Optional[Instrumentacao]
+    :param max_exemplos: Quantidade de exemplos guardados por (código de erro, trilha).
+    :type max_exemplos: int
+    :return: Os erros, se a leitura parou pelo orçamento; None se o arquivo foi lido até o fim
+        sem esgotá-lo, caso em que a validação segue normalmente sobre 'leitura.transcricao()'.
+    :rtype: Optional[AgregadorErros]
+    """
+    erros = AgregadorErros(max_exemplos, orcamento)
+    validadores = {nome_trilha: _VALIDADORES_CONTEUDO[tipo] for nome_trilha, tipo in regras_mapeamento.items()}
+    # Trilhas que ainda podem registrar erros
+    abertas = {nome_trilha: _CODIGOS_CONTEUDO[tipo] for nome_trilha, tipo in regras_mapeamento.items()}
+
+    for nome_trilha, id_anotacao, valor in leitura.anotacoes():
+        if nome_trilha not in abertas:
+            continue
+        valor_limpo = valor.strip()
+        if not valor_limpo:
+            continue
+        codigos_erro_anotacao = validadores[nome_trilha](valor_limpo)
+        if codigos_erro_anotacao:
+            for codigo_erro, caracteres in codigos_erro_anotacao:
+                # O ANNOTATION_ID ocupa o lugar do início até os tempos serem resolvidos, abaixo
+                erros.adiciona(codigo_erro, nome_trilha, id_anotacao, None, caracteres)
+            if erros.esgotado:
+                break
+            if erros.trilha_esgotada(nome_trilha, abertas[nome_trilha]):
+                # A leitura continua: sem o orçamento do arquivo esgotado, a etapa temporal ainda precisa das anotações
+                del abertas[nome_trilha]
+    else:
+        return None
+
+    orcamento.interrompe()
+    for grupo in erros:
+        for exemplo in grupo.exemplos:
+            exemplo.inicio, exemplo.fim = leitura.tempos(exemplo.inicio)
+        if instrumentacao is not None:
+            instrumentacao.conta(f"erros.{grupo.primeiro.codigo}", grupo.total)
+    return erros
+
 
-def valida_conteudo_trilhas(eaf: pympi.Elan.Eaf, regras_mapeamento: Dict[str, str]) -> Tuple[bool, List[str]]:
+def valida_conteudo_trilhas(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                            instrumentacao: Optional[Instrumentacao] = None) -> Tuple[bool, List[str]]:
     """
     Valida o CONTEÚDO das anotações em um EAF com base em um mapeamento de regras.
 
-    :param eaf: Objeto Eaf carregado.
-    :type eaf: pympi.Elan.Eaf
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
     :param regras_mapeamento: Dicionário mapeando {nome_da_trilha: tipo_de_conteudo}.
                               Ex: {'Trilha1': 'INF', 'Trilha2': 'DISF'}
-    :type regras_mapeamento: Dict[str, str]
+                              Também aceita um RuleSet, caso em que o mapeamento é obtido
+                              associando as trilhas do arquivo às regras do conjunto.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
     :return: Tupla contendo (Sucesso, ListaDeRelatorio).
     :rtype: Tuple[bool, List[str]]
     """
+    relatorio_final = valida_conteudo_estruturado(eaf, regras_mapeamento, instrumentacao).mensagens()
+    return (not relatorio_final, relatorio_final)
+
+def valida_conteudo_estruturado(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                                instrumentacao: Optional[Instrumentacao] = None,
+                                max_exemplos: int = 3, orcamento: Optional[OrcamentoErros] = None) -> AgregadorErros:
+    """
+    Valida o CONTEÚDO das anotações e devolve os erros estruturados, sem montar as mensagens.
+
+    Para cada (código de erro, trilha) são guardados apenas a quantidade de ocorrências e os
+    primeiros 'max_exemplos' registros, de modo que a memória usada não cresce com a
+    quantidade de anotações inválidas.
+
+    :param eaf: Transcricao (ou pympi.Elan.Eaf) carregada.
+    :type eaf: FonteAnotacoes
+    :param regras_mapeamento: Dicionário {nome_da_trilha: tipo_de_conteudo} ou RuleSet.
+    :type regras_mapeamento: Union[RuleSet, Dict[str, str]]
+    :param instrumentacao: Coletor opcional de tempos e contadores.
+    :type instrumentacao: Optional[Instrumentacao]
+    :param max_exemplos: Quantidade de exemplos guardados por (código de erro, trilha).
+    :type max_exemplos: int
+    :param orcamento: Limites de erros do arquivo (modo de triagem). Uma trilha deixa de ser
+                      percorrida quando nenhum dos seus códigos de erro cabe mais no orçamento.
+    :type orcamento: Optional[OrcamentoErros]
+    :return: Erros encontrados; vazio se o conteúdo é válido.
+    :rtype: AgregadorErros
+    """
+    if instrumentacao is None:
+        return _valida_conteudo_trilhas(eaf, regras_mapeamento, None, max_exemplos, orcamento)
+    with instrumentacao.etapa("valida_conteudo_trilhas"):
+        return _valida_conteudo_trilhas(eaf, regras_mapeamento, instrumentacao, max_exemplos, orcamento)
+
+def _valida_conteudo_trilhas(eaf: FonteAnotacoes, regras_mapeamento: Union[RuleSet, Dict[str, str]],
+                             instrumentacao: Optional[Instrumentacao], max_exemplos: int,
+                             orcamento: Optional[OrcamentoErros] = None) -> AgregadorErros:
+    """
+    Implementação de 'valida_conteudo_estruturado'.
+    """
+    erros = AgregadorErros(max_exemplos, orcamento)
     
-    erros_agrupados = collections.defaultdict(list)
-    erros_globais = []
-    
+    regras_mapeamento = _resolve_mapeamento(eaf, regras_mapeamento)
+    if regras_mapeamento is None:
+        erros.adiciona_global("MAPEAMENTO_RULESET")
+        return erros
+
     trilhas_para_validar = regras_mapeamento.keys()
+    trilhas_existentes = set(eaf.get_tier_names())
     
     for nome_trilha in trilhas_para_validar:
+        if erros.esgotado:
+            orcamento.interrompe()
+            break
+
         tipo_regra = regras_mapeamento.get(nome_trilha)
+        validador_conteudo = _VALIDADORES_CONTEUDO.get(tipo_regra)
+        codigos_tipo = _CODIGOS_CONTEUDO.get(tipo_regra, ())
         
-        if nome_trilha not in eaf.get_tier_names():
-            erros_globais.append(f"[Global] A trilha obrigatória '{nome_trilha}' não foi encontrada no arquivo.")
+        if nome_trilha not in trilhas_existentes:
+            erros.adiciona_global("TRILHA_AUSENTE", nome_trilha)
             continue 
             
         try:
             anotacoes = eaf.get_annotation_data_for_tier(nome_trilha)
         except KeyError:
-            erros_globais.append(f"[Global] Erro ao tentar ler anotações da trilha '{nome_trilha}'.")
+            erros.adiciona_global("LEITURA_TRILHA", nome_trilha)
             continue
 
+        if instrumentacao is not None:
+            inicio_trilha = time.perf_counter()
+
         for (inicio, fim, valor) in anotacoes: 
             if not valor or not valor.strip():
                 continue
                 
             valor_limpo = valor.strip()
             codigos_erro_anotacao = []
-            
-            loc_exemplo = f"[Tempo: {inicio/1000:.3f}s]"
 
-            if tipo_regra == "INF" or tipo_regra == "DOC":
-                codigos_erro_anotacao = _valida_conteudo_inf_doc(valor_limpo)
-            
-            elif tipo_regra == "DISF":
-                codigos_erro_anotacao = _valida_conteudo_disf(valor_limpo)
+            if validador_conteudo is not None:
+                codigos_erro_anotacao = validador_conteudo(valor_limpo)
             
             else:
-                erros_globais.append(f"[Global] Tipo de regra desconhecido '{tipo_regra}' para a trilha '{nome_trilha}'.")
+                erros.adiciona_global("TIPO_DESCONHECIDO", nome_trilha, tipo_regra)
                 break 
 
             if codigos_erro_anotacao:
-                for codigo_erro in codigos_erro_anotacao:
-                    chave_agrupamento = (codigo_erro, nome_trilha)
-                    erros_agrupados[chave_agrupamento].append(loc_exemplo)
-
-    relatorio_final = []
-    relatorio_final.extend(erros_globais)
-    
-    for chave_agrupamento, exemplos in erros_agrupados.items():
-        codigo_erro, nome_trilha = chave_agrupamento
-        msg_final = ""
-
-        # Mapeia códigos de erro para as mensagens formatadas
-        if codigo_erro == "DIGITO_PRESENTE":
-            msg_final = f"[Trilha: {nome_trilha}] [Erro: Número (dígito) encontrado na trilha]"
+                for codigo_erro, caracteres in codigos_erro_anotacao:
+                    erros.adiciona(codigo_erro, nome_trilha, inicio, fim, caracteres)
+                    if instrumentacao is not None:
+                        instrumentacao.conta(f"erros.{codigo_erro}")
+                if orcamento is not None and erros.trilha_esgotada(nome_trilha, codigos_tipo):
+                    orcamento.interrompe()
+                    break
 
-        elif codigo_erro == "DISF_PRESENTE":
-            msg_final = f"[Trilha: {nome_trilha}] [Erro: Anotação de disfluência fora da trilha DISF]"
+        if instrumentacao is not None:
+            instrumentacao.adiciona_tempo(f"conteudo.{tipo_regra}", time.perf_counter() - inicio_trilha)
+            instrumentacao.conta(f"anotacoes.{nome_trilha}", len(anotacoes))
 
-        elif codigo_erro == "DISF_INVALIDA":
-            msg_final = f"[Trilha: {nome_trilha}] [Erro: Conteúdo inválido]"
-
-        elif codigo_erro == "ERRO_DISF":
-            msg_final = f"[Trilha: {nome_trilha}] [Erro: Disfluência fora do padrão]"
-
-        elif codigo_erro.startswith("CARACTERE_INVALIDO:"):
-            detalhes = codigo_erro.split(':', 1)[1]
-            msg_final = f"[Trilha: {nome_trilha}] [Erro: Caracteres inválidos {detalhes}]"
-        else:
-            msg_final = f"[{codigo_erro} na trilha {nome_trilha}]" 
-
-        exemplos_str = ", ".join(exemplos[:3])
-        if len(exemplos) > 3:
-            exemplos_str += f", e mais {len(exemplos) - 3}"
-            
-        relatorio_final.append(f"{msg_final} {exemplos_str}")
-        
-    return (not relatorio_final, relatorio_final)
+    return erros
@@ -0,0 +1,125 @@
+import collections
+import contextlib
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+
+class Instrumentacao:
+    """
+    Coletor de tempos por etapa e de contadores da leitura e da validação.
+
+    Passado como argumento 'instrumentacao' para 'abre_eaf', 'le_eaf', 'valida_id_trilhas',
+    'valida_conteudo_trilhas' e 'valida_tempos_trilhas'. Quando o argumento é None (padrão), nada é medido.
+
+    Nomes registrados:
+        - tempos: 'abre_eaf', 'le_eaf', 'valida_id_trilhas', 'valida_conteudo_trilhas',
+          'valida_tempos_trilhas', 'conteudo.<TIPO>' (tempo por tipo de conteúdo)
+        - contadores: 'emparelhamento.testes' (pares trilha x regra testados),
+          'anotacoes.<TRILHA>' (anotações validadas por trilha), 'erros.<CODIGO>'
+
+    :param destinos: Funções chamadas com esta instância em 'publica' (ex: DestinoLogging).
+    """
+
+    def __init__(self, *destinos: Callable[["Instrumentacao"], None]):
+        self.tempos: Dict[str, float] = collections.defaultdict(float)
+        self.contadores: Dict[str, int] = collections.Counter()
+        self.destinos = list(destinos)
+
+    @contextlib.contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] += time.perf_counter() - inicio
+
+    def adiciona_tempo(self, nome: str, segundos: float) -> None:
+        self.tempos[nome] += segundos
+
+    def conta(self, nome: str, quantidade: int = 1) -> None:
+        self.contadores[nome] += quantidade
+
+    def mescla(self, outra: Union["Instrumentacao", Dict[str, Any]]) -> None:
+        """
+        Soma os tempos e contadores de outra instância (ou do seu 'para_dict', ex: vindo de outro processo).
+        """
+        dados = outra.para_dict() if isinstance(outra, Instrumentacao) else outra
+        for nome, segundos in dados.get("tempos_s", {}).items():
+            self.tempos[nome] += segundos
+        for nome, quantidade in dados.get("contadores", {}).items():
+            self.contadores[nome] += quantidade
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {"tempos_s": dict(self.tempos), "contadores": dict(self.contadores)}
+
+    def para_json(self) -> str:
+        return json.dumps(self.para_dict(), ensure_ascii=False, indent=2)
+
+    def para_prometheus(self, prefixo: str = "cerberus") -> str:
+        """
+        Exporta no formato texto do Prometheus: tempos como '<prefixo>_etapa_segundos_total'
+        e contadores como '<prefixo>_<grupo>_total', com o restante do nome como rótulo.
+        """
+        linhas = [f"# TYPE {prefixo}_etapa_segundos_total counter"]
+        for nome, segundos in sorted(self.tempos.items()):
+            linhas.append(f'{prefixo}_etapa_segundos_total{{etapa="{_escapa_rotulo(nome)}"}} {segundos:.9f}')
+
+        por_grupo: Dict[str, list] = collections.defaultdict(list)
+        for nome, quantidade in sorted(self.contadores.items()):
+            grupo, _, rotulo = nome.partition(".")
+            por_grupo[re.sub(r"[^a-zA-Z0-9_]", "_", grupo)].append((rotulo, quantidade))
+        for grupo, valores in por_grupo.items():
+            linhas.append(f"# TYPE {prefixo}_{grupo}_total counter")
+            for rotulo, quantidade in valores:
+                sufixo = f'{{nome="{_escapa_rotulo(rotulo)}"}}' if rotulo else ""
+                linhas.append(f"{prefixo}_{grupo}_total{sufixo} {quantidade}")
+        return "\n".join(linhas) + "\n"
+
+    def para_texto(self) -> str:
+        """
+        Resumo legível, usado no relatório para download do app.
+        """
+        linhas = [f"{nome}: {segundos * 1000:.2f} ms" for nome, segundos in sorted(self.tempos.items())]
+        linhas += [f"{nome}: {quantidade}" for nome, quantidade in sorted(self.contadores.items())]
+        return "\n".join(linhas) + "\n"
+
+    def publica(self) -> None:
+        for destino in self.destinos:
+            destino(self)
+
+
+def _escapa_rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class DestinoLogging:
+    """
+    Destino que registra as medições em um logger (uma mensagem JSON por publicação).
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, nivel: int = logging.INFO):
+        self.logger = logger or logging.getLogger("cerberus.instrumentacao")
+        self.nivel = nivel
+
+    def __call__(self, instrumentacao: Instrumentacao) -> None:
+        self.logger.log(self.nivel, "%s", json.dumps(instrumentacao.para_dict(), ensure_ascii=False))
+
+
+class DestinoArquivo:
+    """
+    Destino que grava as medições em um arquivo, no formato 'json' ou 'prometheus'.
+    """
+
+    def __init__(self, caminho: str, formato: str = "json"):
+        if formato not in ("json", "prometheus"):
+            raise ValueError(f"Formato de métricas desconhecido: {formato!r}. Use 'json' ou 'prometheus'.")
+        self.caminho = caminho
+        self.formato = formato
+
+    def __call__(self, instrumentacao: Instrumentacao) -> None:
+        conteudo = instrumentacao.para_json() if self.formato == "json" else instrumentacao.para_prometheus()
+        with open(self.caminho, "w", encoding="utf-8") as f:
+            f.write(conteudo)
@@ -0,0 +1,486 @@
+import concurrent.futures
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import elan, pacotes
+from .cache import CacheValidacao, chave_cache
+from .elan import OrcamentoErros, RuleSet, REGRAS_PREDEFINIDAS
+from .instrumentacao import Instrumentacao
+
+# Conjunto de regras e cache de cada processo trabalhador, definidos uma única vez pelo inicializador
+_regras_trabalhador: Optional[RuleSet] = None
+_cache_trabalhador: Optional[CacheValidacao] = None
+_memo_trabalhador: Optional[elan.MemoLayouts] = None
+
+
+def carrega_regras(especificacao: str) -> RuleSet:
+    """
+    Carrega um conjunto de regras a partir do nome de um conjunto predefinido ou de um arquivo JSON.
+
+    :param especificacao: Nome predefinido (ex: 'entrevista') ou caminho para um arquivo .json.
+    :type especificacao: str
+    :return: Conjunto de regras compilado.
+    :rtype: RuleSet
+    """
+    if especificacao in REGRAS_PREDEFINIDAS:
+        return RuleSet(REGRAS_PREDEFINIDAS[especificacao])
+
+    if not os.path.isfile(especificacao):
+        raise ValueError(f"Regras '{especificacao}' não encontradas. Use um arquivo .json ou um de {sorted(REGRAS_PREDEFINIDAS)}.")
+
+    with open(especificacao, encoding="utf-8") as f:
+        return RuleSet(json.load(f))
+
+
+def encontra_arquivos(caminhos: Iterable[str]) -> Iterator[str]:
+    """
+    Expande diretórios (recursivamente) e padrões glob em caminhos de arquivos .eaf.
+
+    :param caminhos: Arquivos, diretórios ou padrões glob (ex: 'corpus/**/*.eaf').
+    :type caminhos: Iterable[str]
+    :return: Caminhos dos arquivos, sem repetições, na ordem em que são encontrados.
+    :rtype: Iterator[str]
+    """
+    vistos = set()
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            candidatos = (
+                os.path.join(raiz, nome)
+                for raiz, _, nomes in os.walk(caminho)
+                for nome in sorted(nomes)
+                if nome.lower().endswith(".eaf")
+            )
+        elif glob.has_magic(caminho):
+            candidatos = (c for c in sorted(glob.iglob(caminho, recursive=True)) if os.path.isfile(c))
+        else:
+            candidatos = [caminho]
+
+        for candidato in candidatos:
+            if candidato not in vistos:
+                vistos.add(candidato)
+                yield candidato
+
+
+# Item de 'valida_corpus': caminho de um arquivo .eaf ou de um pacote, ou um par (nome, conteúdo)
+ItemValidacao = Union[str, Tuple[str, bytes]]
+
+
+def _nome_item(item: ItemValidacao) -> str:
+    return item[0] if isinstance(item, tuple) else item
+
+
+def expande_pacotes(itens: Iterable[ItemValidacao], falhas: Optional[List[Dict[str, Any]]] = None) -> Iterator[ItemValidacao]:
+    """
+    Substitui os caminhos de pacotes (.zip, .tar.gz...) pelos arquivos .eaf que eles contêm, sem extraí-los.
+
+    Os membros são lidos um por vez, à medida que a iteração avança, como pares (nome, bytes)
+    que podem ser enviados a um processo trabalhador. Os demais itens passam inalterados.
+
+    :param itens: Caminhos de arquivos .eaf ou de pacotes, ou pares (nome, conteúdo).
+    :type itens: Iterable[ItemValidacao]
+    :param falhas: Lista que recebe um resultado de erro para cada pacote que não pôde ser lido
+        até o fim. None propaga a exceção.
+    :type falhas: Optional[List[Dict[str, Any]]]
+    :return: Itens com os pacotes expandidos.
+    :rtype: Iterator[ItemValidacao]
+    """
+    for item in itens:
+        if isinstance(item, tuple) or not pacotes.eh_pacote(item):
+            yield item
+            continue
+        try:
+            yield from pacotes.le_membros(item)
+        except Exception as e:
+            if falhas is None:
+                raise
+            falhas.append(_resultado_falha(item, f"Erro ao ler o pacote: {type(e).__name__}: {e}"))
+
+
+def _le_em_triagem(conteudo: bytes, nome_arquivo: Optional[str], regras: RuleSet, orcamento: OrcamentoErros,
+                   instrumentacao: Optional[Instrumentacao], resultado: Dict[str, Any],
+                   memo_layouts: Optional[elan.MemoLayouts] = None) -> Optional[elan.Transcricao]:
+    """
+    Leitura da triagem: IDs a partir das marcações TIER e conteúdo validado durante a leitura em fluxo.
+
+    Com IDs inválidos, nenhuma anotação é lida; com o orçamento esgotado no conteúdo, a
+    leitura do XML para ali. Em ambos os casos 'resultado' já sai preenchido. Um arquivo
+    que chega ao fim sem esgotar o orçamento (ou que a leitura em fluxo não cobre) é
+    devolvido como Transcricao para a validação normal, com o mesmo resultado de sempre.
+
+    :return: None se 'resultado' já foi preenchido; caso contrário, a Transcricao do arquivo.
+    :rtype: Optional[elan.Transcricao]
+    """
+    nomes = elan.nomes_trilhas(conteudo)
+    if nomes is None:
+        return elan.le_eaf(conteudo, nome_arquivo, instrumentacao=instrumentacao)[1]
+
+    cabecalho = elan.Transcricao(nome_arquivo)
+    cabecalho.trilhas = dict.fromkeys(nomes)
+    id_valido, id_erros, mapeamento_conteudo = elan.valida_id_trilhas(cabecalho, regras, instrumentacao, orcamento,
+                                                                      memo=memo_layouts)
+    if not id_valido:
+        resultado.update(id_valido=id_valido, id_erros=id_erros, mapeamento=mapeamento_conteudo)
+        return None
+    if orcamento.max_erros is None:
+        # Sem limite por arquivo o orçamento nunca se esgota e a leitura não teria onde parar
+        return elan.le_eaf(conteudo, nome_arquivo, instrumentacao=instrumentacao)[1]
+
+    try:
+        leitura = elan.LeituraEmFluxo(conteudo, mapeamento_conteudo, nome_arquivo)
+        if instrumentacao is None:
+            erros_conteudo = elan.valida_conteudo_em_fluxo(leitura, mapeamento_conteudo, orcamento)
+        else:
+            with instrumentacao.etapa("le_eaf"):
+                erros_conteudo = elan.valida_conteudo_em_fluxo(leitura, mapeamento_conteudo, orcamento, instrumentacao)
+    except Exception:
+        # Estrutura fora do alcance da leitura em fluxo (ou XML malformado): a leitura normal decide
+        return elan.le_eaf(conteudo, nome_arquivo, instrumentacao=instrumentacao)[1]
+
+    if erros_conteudo is None:
+        if instrumentacao is None:
+            return leitura.transcricao()
+        with instrumentacao.etapa("le_eaf"):
+            return leitura.transcricao()
+
+    # Como na validação normal com o orçamento esgotado no conteúdo: a etapa temporal não executa,
+    # e 'anotacoes' conta apenas as anotações lidas até a interrupção
+    resultado.update(id_valido=True, id_erros=id_erros, mapeamento=mapeamento_conteudo, conteudo_valido=False,
+                     conteudo_erros=erros_conteudo.mensagens(), conteudo_detalhes=erros_conteudo.para_dict(),
+                     anotacoes=leitura.lidas)
+    if instrumentacao is not None:
+        instrumentacao.conta("triagem.leituras_interrompidas")
+    return None
+
+
+def valida_arquivo(arquivo: Union[str, bytes, BinaryIO], regras: RuleSet, nome_arquivo: Optional[str] = None,
+                   cache: Optional[CacheValidacao] = None, instrumenta: bool = False,
+                   orcamento: Optional[OrcamentoErros] = None, incremental: bool = False,
+                   snapshot: Optional[Dict[str, Any]] = None,
+                   memo_layouts: Optional[elan.MemoLayouts] = None) -> Dict[str, Any]:
+    """
+    Executa a validação completa (IDs, conteúdo e tempos) de um arquivo e devolve um resultado estruturado.
+
+    Qualquer exceção é capturada e registrada no campo 'erro', para que um arquivo
+    malformado não interrompa a validação dos demais. Com um cache, o resultado de um
+    conteúdo já validado com as mesmas regras é devolvido sem ler o XML ('cache': True).
+
+    :param arquivo: Caminho do arquivo, seu conteúdo em bytes ou um objeto de arquivo binário
+        (ex: um membro de 'pacotes.itera_pacote', lido diretamente pelo leitor).
+    :type arquivo: Union[str, bytes, BinaryIO]
+    :param regras: Conjunto de regras compilado.
+    :type regras: RuleSet
+    :param nome_arquivo: Nome do arquivo. Obrigatório quando 'arquivo' é bytes ou um objeto de arquivo.
+    :type nome_arquivo: Optional[str]
+    :param cache: Cache de resultados consultado antes da leitura do arquivo.
+    :type cache: Optional[CacheValidacao]
+    :param instrumenta: Se True, inclui em 'instrumentacao' os tempos por etapa e os contadores.
+    :type instrumenta: bool
+    :param orcamento: Limites de erros (modo de triagem); cada arquivo recebe uma cópia nova
+        ('OrcamentoErros.novo'). O cache não é consultado; se a validação parar pelo limite,
+        'truncado' fica True e o resultado não é guardado no cache. Os IDs são validados a
+        partir das marcações TIER e a leitura do XML para quando o orçamento acaba
+        (ver '_le_em_triagem').
+    :type orcamento: Optional[OrcamentoErros]
+    :param incremental: Se True, o conteúdo é validado por 'elan.valida_conteudo_incremental_estruturado'
+        a partir de 'snapshot', e o novo snapshot (não serializável em JSON, e fora do cache) é
+        devolvido em 'snapshot'. Ignorado na triagem ('orcamento').
+    :type incremental: bool
+    :param snapshot: Snapshot de uma validação anterior do mesmo arquivo ('incremental').
+    :type snapshot: Optional[Dict[str, Any]]
+    :param memo_layouts: Memória de disposições de trilhas usada na validação de IDs
+        (ver 'elan.valida_id_trilhas'). None: sem memorização.
+    :type memo_layouts: Optional[elan.MemoLayouts]
+    :return: Dicionário serializável em JSON com o resultado da validação (exceto 'snapshot').
+    :rtype: Dict[str, Any]
+    """
+    inicio = time.perf_counter()
+    instrumentacao = Instrumentacao() if instrumenta else None
+    resultado: Dict[str, Any] = {
+        "arquivo": nome_arquivo if nome_arquivo is not None else getattr(arquivo, "name", arquivo),
+        "valido": False,
+        "id_valido": None,
+        "id_erros": [],
+        "mapeamento": None,
+        "conteudo_valido": None,
+        "conteudo_erros": [],
+        "conteudo_detalhes": None,
+        "tempo_valido": None,
+        "tempo_erros": [],
+        "tempo_detalhes": None,
+        "anotacoes": 0,
+        "erro": None,
+        "cache": False,
+        "truncado": False,
+    }
+    if orcamento is not None:
+        orcamento = orcamento.novo()
+        incremental = False
+    # Sem uma nova validação do conteúdo (cache, erro de leitura), o snapshot recebido continua valendo
+    novo_snapshot = snapshot
+
+    try:
+        chave = None
+        if cache is not None or orcamento is not None:
+            if hasattr(arquivo, "read"):
+                arquivo = arquivo.read()
+            elif not isinstance(arquivo, (bytes, bytearray)):
+                with open(arquivo, "rb") as f:
+                    arquivo = f.read()
+                nome_arquivo = resultado["arquivo"]
+        if cache is not None:
+            chave = chave_cache(arquivo, regras)
+            # Na triagem o resultado guardado (completo) não é consultado: ele não respeitaria os
+            # limites do orçamento. Um resultado que não atingiu o limite continua sendo guardado.
+            guardado = cache.obtem(chave) if orcamento is None else None
+            if guardado is not None:
+                resultado.update(guardado, cache=True)
+                if instrumentacao is not None:
+                    instrumentacao.conta("cache.acertos")
+                    resultado["instrumentacao"] = instrumentacao.para_dict()
+                if incremental:
+                    resultado["snapshot"] = novo_snapshot
+                resultado["duracao"] = round(time.perf_counter() - inicio, 6)
+                return resultado
+
+        if orcamento is None:
+            _, eaf = elan.le_eaf(arquivo, nome_arquivo, instrumentacao=instrumentacao)
+        else:
+            eaf = _le_em_triagem(arquivo, nome_arquivo, regras, orcamento, instrumentacao, resultado, memo_layouts)
+            if eaf is None:
+                # Resultado da triagem já preenchido sem ler o XML inteiro: não responde por uma validação no cache
+                chave = None
+            else:
+                # Lido até o fim sem esgotar o orçamento: a validação normal recomeça do zero
+                orcamento = orcamento.novo()
+
+        if eaf is not None:
+            id_valido, id_erros, mapeamento_conteudo = elan.valida_id_trilhas(eaf, regras, instrumentacao, orcamento,
+                                                                              memo=memo_layouts)
+            resultado.update(id_valido=id_valido, id_erros=id_erros, mapeamento=mapeamento_conteudo)
+
+            if id_valido:
+                if incremental:
+                    erros_conteudo, novo_snapshot = elan.valida_conteudo_incremental_estruturado(
+                        eaf, mapeamento_conteudo, snapshot, instrumentacao
+                    )
+                else:
+                    erros_conteudo = elan.valida_conteudo_estruturado(eaf, mapeamento_conteudo, instrumentacao,
+                                                                      orcamento=orcamento)
+                conteudo_valido = not erros_conteudo
+                resultado.update(conteudo_valido=conteudo_valido, conteudo_erros=erros_conteudo.mensagens(),
+                                 conteudo_detalhes=erros_conteudo.para_dict())
+                if orcamento is not None and orcamento.esgotado:
+                    # Triagem: o conteúdo já esgotou o orçamento e a validação temporal fica sem executar
+                    orcamento.interrompe()
+                    tempo_valido = None
+                else:
+                    erros_tempo = elan.valida_tempos_estruturado(eaf, mapeamento_conteudo, instrumentacao, orcamento=orcamento)
+                    tempo_valido = not erros_tempo
+                    resultado.update(tempo_valido=tempo_valido, tempo_erros=erros_tempo.mensagens(),
+                                     tempo_detalhes=erros_tempo.para_dict())
+                resultado["anotacoes"] = sum(
+                    len(eaf.get_annotation_data_for_tier(nome_trilha))
+                    for nome_trilha in mapeamento_conteudo
+                    if nome_trilha in eaf.get_tier_names()
+                )
+                # 'tempo_valido' None: etapa temporal não executada (triagem), o que não conta como falha dos tempos;
+                # o orçamento só se esgota com erros já registrados, e o conteúdo já torna o arquivo inválido
+                resultado["valido"] = conteudo_valido and tempo_valido is not False
+
+        if orcamento is not None and orcamento.truncado:
+            # Um resultado parcial não pode responder por uma validação completa no cache
+            resultado["truncado"] = True
+        elif chave is not None:
+            cache.guarda(chave, resultado)
+
+    except Exception as e:
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+
+    if instrumentacao is not None:
+        resultado["instrumentacao"] = instrumentacao.para_dict()
+    if incremental:
+        resultado["snapshot"] = novo_snapshot
+    resultado["duracao"] = round(time.perf_counter() - inicio, 6)
+    return resultado
+
+
+def _inicializa_trabalhador(regras: RuleSet, caminho_cache: Optional[str], memo_layouts: bool = False) -> None:
+    global _regras_trabalhador, _cache_trabalhador, _memo_trabalhador
+    _regras_trabalhador = regras
+    _cache_trabalhador = CacheValidacao(caminho_cache) if caminho_cache else None
+    _memo_trabalhador = elan.MEMO_LAYOUTS if memo_layouts else None
+    if _memo_trabalhador is not None:
+        # As disposições de trilhas já resolvidas são compartilhadas pelos trabalhadores e entre execuções
+        _memo_trabalhador.persistencia = _cache_trabalhador
+
+
+def _valida_lote(itens: List[ItemValidacao], instrumenta: bool = False,
+                 orcamento: Optional[OrcamentoErros] = None) -> List[Dict[str, Any]]:
+    return [
+        valida_arquivo(item[1], _regras_trabalhador, item[0], cache=_cache_trabalhador, instrumenta=instrumenta,
+                       orcamento=orcamento, memo_layouts=_memo_trabalhador)
+        if isinstance(item, tuple) else
+        valida_arquivo(item, _regras_trabalhador, cache=_cache_trabalhador, instrumenta=instrumenta, orcamento=orcamento,
+                       memo_layouts=_memo_trabalhador)
+        for item in itens
+    ]
+
+
+def cria_pool(regras: RuleSet, num_processos: Optional[int] = None, caminho_cache: Optional[str] = None,
+              contexto: Optional[multiprocessing.context.BaseContext] = None,
+              memo_layouts: bool = False) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Cria um pool de processos já configurado com o conjunto de regras (e o cache) em cada trabalhador.
+
+    Tarefas enviadas ao pool devem usar 'valida_no_trabalhador'.
+
+    :param regras: Conjunto de regras compilado.
+    :type regras: RuleSet
+    :param num_processos: Quantidade de processos. None usa a quantidade de CPUs.
+    :type num_processos: Optional[int]
+    :param caminho_cache: Banco de cache de resultados. None desativa o cache.
+    :type caminho_cache: Optional[str]
+    :param contexto: Contexto do multiprocessing (ex: 'spawn'). None usa o padrão da plataforma.
+    :type contexto: Optional[multiprocessing.context.BaseContext]
+    :param memo_layouts: Se True, cada trabalhador memoriza a validação de IDs por disposição de
+        trilhas em 'elan.MEMO_LAYOUTS', persistida no cache (se houver) e compartilhada entre execuções.
+    :type memo_layouts: bool
+    :return: Pool de processos.
+    :rtype: concurrent.futures.ProcessPoolExecutor
+    """
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=num_processos or os.cpu_count() or 1,
+        initializer=_inicializa_trabalhador,
+        initargs=(regras, caminho_cache, memo_layouts),
+        mp_context=contexto,
+    )
+
+
+def valida_no_trabalhador(arquivo: Union[str, bytes], nome_arquivo: Optional[str] = None,
+                          instrumenta: bool = False, orcamento: Optional[OrcamentoErros] = None,
+                          incremental: bool = False, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Executa 'valida_arquivo' em um processo de um pool criado por 'cria_pool'.
+    """
+    return valida_arquivo(arquivo, _regras_trabalhador, nome_arquivo, cache=_cache_trabalhador, instrumenta=instrumenta,
+                          orcamento=orcamento, incremental=incremental, snapshot=snapshot,
+                          memo_layouts=_memo_trabalhador)
+
+
+def _resultado_falha(caminho: str, mensagem: str) -> Dict[str, Any]:
+    return {"arquivo": caminho, "valido": False, "anotacoes": 0, "erro": mensagem}
+
+
+def valida_corpus(caminhos: Iterable[ItemValidacao], regras: RuleSet, num_processos: Optional[int] = None,
+                  tamanho_lote: int = 1, max_pendentes: Optional[int] = None,
+                  caminho_cache: Optional[str] = None, instrumenta: bool = False,
+                  orcamento: Optional[OrcamentoErros] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Valida vários arquivos em paralelo, em um pool de processos, devolvendo cada resultado assim que fica pronto.
+
+    Os arquivos são enviados em lotes de 'tamanho_lote' caminhos por tarefa, com no máximo
+    'max_pendentes' tarefas em andamento, de modo que a lista de arquivos pode ser consumida
+    aos poucos. Se um processo trabalhador morrer, o pool é recriado e os arquivos afetados
+    são revalidados isoladamente; o que voltar a derrubar o processo é registrado como erro.
+
+    Pacotes (.zip, .tar.gz, ver 'pacotes.EXTENSOES_PACOTE') são expandidos por 'expande_pacotes':
+    cada membro é lido do pacote e enviado ao pool assim que há espaço entre as tarefas em
+    andamento, de modo que apenas os membros dessas tarefas ficam em memória.
+
+    :param caminhos: Caminhos dos arquivos .eaf ou de pacotes, ou pares (nome, conteúdo).
+    :type caminhos: Iterable[ItemValidacao]
+    :param regras: Conjunto de regras compilado (enviado uma única vez a cada processo).
+    :type regras: RuleSet
+    :param num_processos: Quantidade de processos. None usa a quantidade de CPUs.
+    :type num_processos: Optional[int]
+    :param tamanho_lote: Quantidade de arquivos por tarefa enviada ao pool.
+    :type tamanho_lote: int
+    :param max_pendentes: Máximo de tarefas em andamento. None usa o dobro de processos.
+    :type max_pendentes: Optional[int]
+    :param caminho_cache: Banco de cache de resultados compartilhado pelos processos. None desativa o cache.
+    :type caminho_cache: Optional[str]
+    :param instrumenta: Se True, cada resultado traz os tempos por etapa e os contadores em 'instrumentacao'.
+    :type instrumenta: bool
+    :param orcamento: Limites de erros por arquivo (modo de triagem); ver 'valida_arquivo'.
+    :type orcamento: Optional[OrcamentoErros]
+    :return: Resultados de 'valida_arquivo', na ordem de conclusão.
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    num_processos = num_processos or os.cpu_count() or 1
+    max_pendentes = max_pendentes or 2 * num_processos
+    tamanho_lote = max(1, tamanho_lote)
+
+    def novo_pool() -> concurrent.futures.ProcessPoolExecutor:
+        return cria_pool(regras, num_processos, caminho_cache, memo_layouts=True)
+
+    falhas_pacotes: List[Dict[str, Any]] = []
+
+    def lotes() -> Iterator[List[ItemValidacao]]:
+        lote = []
+        for item in expande_pacotes(caminhos, falhas_pacotes):
+            lote.append(item)
+            if len(lote) >= tamanho_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    fila_lotes = lotes()
+    suspeitos: List[ItemValidacao] = []
+    pool = novo_pool()
+    pendentes: Dict[concurrent.futures.Future, List[ItemValidacao]] = {}
+
+    try:
+        esgotado = False
+        while True:
+            while not esgotado and len(pendentes) < max_pendentes:
+                lote = next(fila_lotes, None)
+                if lote is None:
+                    esgotado = True
+                    break
+                pendentes[pool.submit(_valida_lote, lote, instrumenta, orcamento)] = lote
+
+            # Pacotes ilegíveis (ou corrompidos no meio) viram resultados de erro, como arquivos ilegíveis
+            while falhas_pacotes:
+                yield falhas_pacotes.pop(0)
+
+            if not pendentes:
+                break
+
+            concluidos, _ = concurrent.futures.wait(pendentes, return_when=concurrent.futures.FIRST_COMPLETED)
+            pool_quebrado = False
+            for futuro in concluidos:
+                lote = pendentes.pop(futuro)
+                try:
+                    yield from futuro.result()
+                except BrokenProcessPool:
+                    pool_quebrado = True
+                    suspeitos.extend(lote)
+                except Exception as e:
+                    for item in lote:
+                        yield _resultado_falha(_nome_item(item), f"{type(e).__name__}: {e}")
+
+            if pool_quebrado:
+                # Todas as tarefas em andamento falham junto com o pool; são revalidadas depois
+                for lote in pendentes.values():
+                    suspeitos.extend(lote)
+                pendentes.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = novo_pool()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    # Revalida um a um os arquivos que estavam em andamento quando um processo morreu
+    for item in suspeitos:
+        with cria_pool(regras, 1, caminho_cache, memo_layouts=True) as pool_isolado:
+            try:
+                yield from pool_isolado.submit(_valida_lote, [item], instrumenta, orcamento).result()
+            except BrokenProcessPool:
+                yield _resultado_falha(_nome_item(item), "O processo de validação foi encerrado inesperadamente ao ler este arquivo.")
+            except Exception as e:
+                yield _resultado_falha(_nome_item(item), f"{type(e).__name__}: {e}")
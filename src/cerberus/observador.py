@@ -0,0 +1,467 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import lote, relatorios
+from .elan import RuleSet
+
+# Assinatura de um arquivo no índice: (tamanho, mtime em ns, sha256 do conteúdo, assinatura das regras)
+AssinaturaArquivo = Tuple[int, int, str, str]
+
+_logger = logging.getLogger(__name__)
+
+
+def caminho_indice_padrao() -> str:
+    """
+    Caminho padrão do índice do modo observação: variável de ambiente CERBERUS_INDICE ou ~/.cache/cerberus/indice.sqlite.
+    """
+    return os.environ.get("CERBERUS_INDICE") or os.path.join(os.path.expanduser("~"), ".cache", "cerberus", "indice.sqlite")
+
+
+class IndiceArquivos:
+    """
+    Índice persistente (SQLite) dos arquivos observados: caminho, tamanho, mtime, hash do conteúdo,
+    regras usadas e último resultado de validação.
+
+    Entre execuções, o índice permite revalidar apenas os arquivos que mudaram desde a última vez.
+
+    :param caminho: Arquivo do banco SQLite. Diretórios ausentes são criados.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho or caminho_indice_padrao()
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS arquivos ("
+            " caminho TEXT PRIMARY KEY, tamanho INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL,"
+            " regras TEXT NOT NULL, resultado TEXT NOT NULL, validado_em REAL NOT NULL)"
+        )
+
+    def assinaturas(self, prefixos: Iterable[str] = ()) -> Dict[str, AssinaturaArquivo]:
+        """
+        Assinaturas de todos os arquivos do índice (ou só dos que estão sob um dos diretórios em 'prefixos').
+        """
+        prefixos = tuple(os.path.join(p, "") for p in prefixos)
+        with self._trava:
+            linhas = self._conexao.execute("SELECT caminho, tamanho, mtime_ns, sha256, regras FROM arquivos").fetchall()
+        return {
+            caminho: (tamanho, mtime_ns, sha256, regras)
+            for caminho, tamanho, mtime_ns, sha256, regras in linhas
+            if not prefixos or caminho.startswith(prefixos)
+        }
+
+    def guarda(self, caminho: str, assinatura: AssinaturaArquivo, resultado: Dict[str, Any]) -> None:
+        """
+        Guarda a assinatura e o resultado de validação de um arquivo.
+        """
+        dados = json.dumps({campo: valor for campo, valor in resultado.items() if campo != "instrumentacao"},
+                           ensure_ascii=False)
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO arquivos (caminho, tamanho, mtime_ns, sha256, regras, resultado, validado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (caminho, *assinatura, dados, time.time()),
+            )
+
+    def atualiza_assinatura(self, caminho: str, tamanho: int, mtime_ns: int) -> None:
+        """
+        Atualiza tamanho e mtime de um arquivo salvo de novo sem mudança de conteúdo (o resultado continua valendo).
+        """
+        with self._trava:
+            self._conexao.execute("UPDATE arquivos SET tamanho = ?, mtime_ns = ? WHERE caminho = ?",
+                                  (tamanho, mtime_ns, caminho))
+
+    def remove(self, caminho: str) -> None:
+        with self._trava:
+            self._conexao.execute("DELETE FROM arquivos WHERE caminho = ?", (caminho,))
+
+    def resultados(self, prefixos: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+        """
+        Últimos resultados de validação, em ordem de caminho (opcionalmente só os que estão sob 'prefixos').
+        """
+        prefixos = tuple(os.path.join(p, "") for p in prefixos)
+        with self._trava:
+            linhas = self._conexao.execute("SELECT caminho, resultado FROM arquivos ORDER BY caminho").fetchall()
+        for caminho, resultado in linhas:
+            if not prefixos or caminho.startswith(prefixos):
+                yield json.loads(resultado)
+
+    def fecha(self) -> None:
+        with self._trava:
+            self._conexao.close()
+
+
+def _varre_diretorio(diretorio: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Arquivos .eaf sob o diretório (recursivamente) com seus stat, usando os.scandir (sem ler os arquivos).
+    """
+    pilha = [diretorio]
+    while pilha:
+        atual = pilha.pop()
+        try:
+            entradas = list(os.scandir(atual))
+        except OSError:
+            continue
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    pilha.append(entrada.path)
+                elif entrada.name.lower().endswith(".eaf") and entrada.is_file():
+                    yield entrada.path, entrada.stat()
+            except OSError:
+                continue
+
+
+def _watchdog_disponivel() -> bool:
+    try:
+        import watchdog.observers  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Observador:
+    """
+    Modo observação: mantém os resultados de validação de pastas de projeto atualizados enquanto
+    os arquivos .eaf são salvos.
+
+    Cada mudança (evento do sistema de arquivos via watchdog/inotify, ou varredura periódica
+    de stat quando o watchdog não está instalado) coloca apenas o arquivo alterado na fila.
+    O arquivo só é validado depois de 'atraso' segundos sem novas mudanças, de modo que uma
+    sequência de salvamentos resulta em uma única validação. Arquivos cujo conteúdo (sha256)
+    não mudou, com as mesmas regras, não são revalidados. As validações correm no pool sem
+    bloquear o laço, que continua recebendo mudanças; os resultados ficam no índice persistente
+    e o relatório de situação da pasta é regravado a cada rodada que traz resultados novos.
+
+    :param diretorios: Diretórios observados (recursivamente).
+    :param regras: Conjunto de regras compilado.
+    :param caminho_indice: Banco do índice (padrão: caminho_indice_padrao()).
+    :param num_processos: Processos do pool de validação (padrão: número de CPUs).
+    :param atraso: Segundos sem mudanças em um arquivo antes de validá-lo.
+    :param intervalo: Intervalo entre varreduras, em segundos, quando o watchdog não está disponível.
+    :param caminho_status: Relatório de situação da pasta, no formato deduzido da extensão
+        (ver relatorios.formato_por_extensao). None desativa o relatório.
+    :param caminho_cache: Banco de cache de resultados compartilhado pelos processos. None desativa o cache.
+    :param ao_validar: Função chamada com cada resultado novo (ex: para exibi-lo).
+    :param usa_eventos: Se False, usa a varredura periódica mesmo com o watchdog instalado.
+    :param max_snapshots: Quantidade de arquivos (os validados mais recentemente) cujo snapshot de
+        conteúdo fica em memória para a revalidação incremental (ver 'lote.valida_arquivo'). 0 desativa.
+    """
+
+    def __init__(self, diretorios: Iterable[str], regras: RuleSet, caminho_indice: Optional[str] = None,
+                 num_processos: Optional[int] = None, atraso: float = 1.0, intervalo: float = 2.0,
+                 caminho_status: Optional[str] = None, caminho_cache: Optional[str] = None,
+                 ao_validar: Optional[Callable[[Dict[str, Any]], None]] = None, usa_eventos: bool = True,
+                 max_snapshots: int = 32):
+        self.diretorios = [os.path.abspath(d) for d in diretorios]
+        self.regras = regras
+        self.indice = IndiceArquivos(caminho_indice)
+        self.num_processos = num_processos
+        self.atraso = atraso
+        self.intervalo = intervalo
+        self.caminho_status = caminho_status
+        self.caminho_cache = caminho_cache
+        self.ao_validar = ao_validar
+        self.usa_eventos = usa_eventos
+        self.max_snapshots = max_snapshots
+        self.validacoes = 0
+
+        self._assinaturas = self.indice.assinaturas(self.diretorios)
+        self._pendentes: Dict[str, float] = {}
+        self._varredura_solicitada = False
+        self._trava = threading.Lock()
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # Validações enviadas ao pool e ainda não recolhidas: tarefa -> (caminho, assinatura, pool)
+        self._em_andamento: Dict[concurrent.futures.Future,
+                                 Tuple[str, AssinaturaArquivo, concurrent.futures.ProcessPoolExecutor]] = {}
+        # Snapshots da validação incremental, do menos para o mais recentemente usado
+        self._snapshots: Dict[str, Dict[str, Any]] = collections.OrderedDict()
+
+    def notifica(self, caminho: str) -> None:
+        """
+        Registra uma mudança no arquivo; a validação é adiada até 'atraso' segundos após a última mudança.
+        Pode ser chamado de outras threads (ex: a do watchdog).
+        """
+        with self._trava:
+            self._pendentes[os.path.abspath(caminho)] = time.monotonic() + self.atraso
+
+    def solicita_varredura(self) -> None:
+        """
+        Pede uma varredura completa na próxima rodada (ex: um diretório foi criado, movido ou removido).
+        """
+        self._varredura_solicitada = True
+
+    def varre(self) -> int:
+        """
+        Compara o stat de todos os arquivos .eaf com o índice e coloca na fila os novos, os alterados
+        e os removidos. Os arquivos não são lidos.
+
+        :return: Quantidade de arquivos colocados na fila.
+        :rtype: int
+        """
+        self._varredura_solicitada = False
+        vistos = set()
+        alterados = []
+        for diretorio in self.diretorios:
+            for caminho, estado in _varre_diretorio(diretorio):
+                vistos.add(caminho)
+                assinatura = self._assinaturas.get(caminho)
+                if (assinatura is None or assinatura[0] != estado.st_size or assinatura[1] != estado.st_mtime_ns
+                        or assinatura[3] != self.regras.assinatura):
+                    alterados.append(caminho)
+        alterados.extend(caminho for caminho in self._assinaturas if caminho not in vistos)
+
+        with self._trava:
+            pendentes = self._pendentes
+            novos = [caminho for caminho in alterados if caminho not in pendentes]
+            # Arquivos já na fila mantêm o prazo: a varredura não reinicia o atraso de quem está sendo salvo
+            for caminho in novos:
+                pendentes[caminho] = time.monotonic() + self.atraso
+        return len(novos)
+
+    def _prontos(self) -> List[str]:
+        agora = time.monotonic()
+        # Um arquivo ainda em validação continua na fila: a revalidação parte do resultado (e do snapshot) dela
+        em_andamento = {caminho for caminho, _, _ in self._em_andamento.values()}
+        with self._trava:
+            prontos = [caminho for caminho, prazo in self._pendentes.items()
+                       if prazo <= agora and caminho not in em_andamento]
+            for caminho in prontos:
+                del self._pendentes[caminho]
+        return sorted(prontos)
+
+    @property
+    def pendentes(self) -> int:
+        """
+        Arquivos na fila ou em validação.
+        """
+        return len(self._pendentes) + len(self._em_andamento)
+
+    def _obtem_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = lote.cria_pool(self.regras, self.num_processos, self.caminho_cache, memo_layouts=True)
+        return self._pool
+
+    def _descarta_pool(self, pool: concurrent.futures.ProcessPoolExecutor) -> None:
+        """
+        Encerra um pool quebrado (um trabalhador morreu, ex: falta de memória) sem esperar por ele;
+        o próximo envio cria outro. Um pool que já foi substituído não é tocado de novo.
+        """
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def processa_pendentes(self, espera: Optional[float] = 0) -> int:
+        """
+        Envia ao pool os arquivos cujo atraso terminou e recolhe as validações já concluídas.
+        Arquivos removidos saem do índice e arquivos salvos de novo com o mesmo conteúdo apenas
+        atualizam a assinatura.
+
+        :param espera: Segundos de espera pelas validações em andamento. 0 (padrão) recolhe só as
+            já concluídas, sem bloquear; None espera todas.
+        :type espera: Optional[float]
+        :return: Quantidade de arquivos validados (resultados recolhidos nesta chamada).
+        :rtype: int
+        """
+        alterou_indice = False
+        for caminho in self._prontos():
+            try:
+                estado = os.stat(caminho)
+                with open(caminho, "rb") as f:
+                    conteudo = f.read()
+            except FileNotFoundError:
+                self._snapshots.pop(caminho, None)
+                if self._assinaturas.pop(caminho, None) is not None:
+                    self.indice.remove(caminho)
+                    alterou_indice = True
+                continue
+            except OSError as e:
+                _logger.warning("Não foi possível ler %s: %s", caminho, e)
+                continue
+
+            assinatura = (estado.st_size, estado.st_mtime_ns, hashlib.sha256(conteudo).hexdigest(), self.regras.assinatura)
+            anterior = self._assinaturas.get(caminho)
+            if anterior is not None and anterior[2:] == assinatura[2:]:
+                if anterior[:2] != assinatura[:2]:
+                    self.indice.atualiza_assinatura(caminho, estado.st_size, estado.st_mtime_ns)
+                    self._assinaturas[caminho] = assinatura
+                continue
+            tarefa, pool = self._envia(caminho, conteudo)
+            self._em_andamento[tarefa] = (caminho, assinatura, pool)
+
+        validados = self._recolhe(espera)
+        if validados or alterou_indice:
+            self.escreve_status()
+        return validados
+
+    def _recolhe(self, espera: Optional[float]) -> int:
+        if not self._em_andamento:
+            return 0
+        concluidas, _ = concurrent.futures.wait(self._em_andamento, timeout=espera)
+        # Na ordem de envio, para que os resultados saiam na mesma ordem em que os arquivos ficaram prontos
+        for tarefa in [tarefa for tarefa in self._em_andamento if tarefa in concluidas]:
+            caminho, assinatura, pool = self._em_andamento.pop(tarefa)
+            try:
+                resultado = tarefa.result()
+            except BrokenProcessPool:
+                self._descarta_pool(pool)
+                resultado = lote._resultado_falha(caminho, "O processo de validação foi encerrado inesperadamente ao ler este arquivo.")
+            except Exception as e:
+                resultado = lote._resultado_falha(caminho, f"{type(e).__name__}: {e}")
+            self._guarda_snapshot(caminho, resultado.pop("snapshot", None))
+            self.indice.guarda(caminho, assinatura, resultado)
+            self._assinaturas[caminho] = assinatura
+            self.validacoes += 1
+            if self.ao_validar is not None:
+                self.ao_validar(resultado)
+        return len(concluidas)
+
+    def _guarda_snapshot(self, caminho: str, snapshot: Optional[Dict[str, Any]]) -> None:
+        if snapshot is None or not self.max_snapshots:
+            self._snapshots.pop(caminho, None)
+            return
+        self._snapshots[caminho] = snapshot
+        self._snapshots.move_to_end(caminho)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+
+    def _envia(self, caminho: str, conteudo: bytes) -> Tuple[concurrent.futures.Future, concurrent.futures.ProcessPoolExecutor]:
+        # Os trabalhadores são criados no envio e herdam o tratamento de sinais: eles ignoram
+        # o Ctrl+C, e quem encerra a observação (e o pool) é o processo principal
+        principal = threading.current_thread() is threading.main_thread()
+        tratador = signal.signal(signal.SIGINT, signal.SIG_IGN) if principal else None
+        # Só as trilhas alteradas desde a última validação do arquivo são percorridas de novo
+        argumentos = (lote.valida_no_trabalhador, conteudo, caminho)
+        opcoes = {"incremental": bool(self.max_snapshots), "snapshot": self._snapshots.get(caminho)}
+        try:
+            pool = self._obtem_pool()
+            try:
+                return pool.submit(*argumentos, **opcoes), pool
+            except BrokenProcessPool:
+                self._descarta_pool(pool)
+                pool = self._obtem_pool()
+                return pool.submit(*argumentos, **opcoes), pool
+        finally:
+            if principal:
+                signal.signal(signal.SIGINT, tratador)
+
+    def resumo(self) -> Dict[str, int]:
+        """
+        Situação agregada da pasta: arquivos no índice, válidos, inválidos, com erro de leitura e na fila.
+        """
+        resumo = {"arquivos": 0, "validos": 0, "invalidos": 0, "com_erro": 0, "pendentes": self.pendentes}
+        for resultado in self.indice.resultados(self.diretorios):
+            resumo["arquivos"] += 1
+            if resultado.get("erro"):
+                resumo["com_erro"] += 1
+            elif resultado.get("valido"):
+                resumo["validos"] += 1
+            else:
+                resumo["invalidos"] += 1
+        return resumo
+
+    def escreve_status(self) -> None:
+        """
+        Regrava o relatório de situação com o último resultado de cada arquivo observado.
+
+        O relatório é escrito em um arquivo temporário e substituído de uma vez, de modo que
+        quem o lê nunca encontra um relatório pela metade.
+        """
+        if not self.caminho_status:
+            return
+        temporario = f"{self.caminho_status}.tmp"
+        with open(temporario, "w", encoding="utf-8", newline="") as destino:
+            with relatorios.cria_escritor(relatorios.formato_por_extensao(self.caminho_status), destino) as escritor:
+                escritor.escreve_todos(self.indice.resultados(self.diretorios))
+        os.replace(temporario, self.caminho_status)
+
+    def _inicia_eventos(self) -> Optional[Any]:
+        """
+        Inicia a observação por eventos (watchdog; inotify no Linux). Devolve None se o watchdog não estiver instalado.
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        observador = self
+
+        class _Tratador(FileSystemEventHandler):
+            def on_any_event(self, evento) -> None:
+                if evento.event_type in ("opened", "closed_no_write"):
+                    return
+                if evento.is_directory:
+                    if evento.event_type != "modified":
+                        observador.solicita_varredura()
+                    return
+                for caminho in (evento.src_path, getattr(evento, "dest_path", "")):
+                    if caminho and os.fsdecode(caminho).lower().endswith(".eaf"):
+                        observador.notifica(os.fsdecode(caminho))
+
+        eventos = Observer()
+        for diretorio in self.diretorios:
+            eventos.schedule(_Tratador(), diretorio, recursive=True)
+        eventos.start()
+        return eventos
+
+    def executa(self, parar: Optional[threading.Event] = None) -> None:
+        """
+        Observa os diretórios até 'parar' ser sinalizado (ou até KeyboardInterrupt).
+
+        Na partida, uma varredura compara a pasta com o índice, de modo que só o que mudou
+        desde a última execução é validado.
+
+        :param parar: Evento que encerra a observação.
+        :type parar: Optional[threading.Event]
+        """
+        parar = parar or threading.Event()
+        eventos = self._inicia_eventos() if self.usa_eventos else None
+        self.varre()
+        self.escreve_status()
+        proxima_varredura = time.monotonic() + self.intervalo
+        try:
+            while not parar.is_set():
+                self.processa_pendentes()
+                if self._varredura_solicitada or (eventos is None and time.monotonic() >= proxima_varredura):
+                    self.varre()
+                    proxima_varredura = time.monotonic() + self.intervalo
+                # Com atraso ou intervalo 0, a espera mínima evita que o laço ocupe um núcleo inteiro
+                parar.wait(max(0.01, min(0.2, self.atraso, self.intervalo)))
+        finally:
+            if eventos is not None:
+                eventos.stop()
+                eventos.join()
+            self._encerra_pool()
+
+    @property
+    def modo(self) -> str:
+        """
+        'eventos' (watchdog) ou 'varredura' (stat periódico).
+        """
+        return "eventos" if self.usa_eventos and _watchdog_disponivel() else "varredura"
+
+    def _encerra_pool(self) -> None:
+        self._em_andamento.clear()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def fecha(self) -> None:
+        self._encerra_pool()
+        self.indice.fecha()
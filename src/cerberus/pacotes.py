@@ -0,0 +1,110 @@
+import gzip
+import os
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+# Extensões reconhecidas como pacotes de arquivos .eaf
+EXTENSOES_PACOTE = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".eaf.gz")
+
+
+def eh_pacote(nome: str) -> bool:
+    """
+    Indica se o nome (ou caminho) tem a extensão de um pacote aceito em 'itera_pacote'.
+
+    :param nome: Nome ou caminho do arquivo.
+    :type nome: str
+    :return: True para .zip, .tar (comprimido ou não) e .eaf.gz.
+    :rtype: bool
+    """
+    return nome.lower().endswith(EXTENSOES_PACOTE)
+
+
+def _eh_membro_eaf(nome_membro: str) -> bool:
+    # Ignora os metadados que o macOS inclui em pacotes .zip (__MACOSX/, ._arquivo.eaf)
+    base = os.path.basename(nome_membro)
+    return (nome_membro.lower().endswith(".eaf") and not base.startswith("._")
+            and not nome_membro.startswith("__MACOSX/"))
+
+
+def _itera_zip(fonte: Union[str, BinaryIO], nome_pacote: str) -> Iterator[Tuple[str, BinaryIO]]:
+    with zipfile.ZipFile(fonte) as pacote:
+        for info in pacote.infolist():
+            if info.is_dir() or not _eh_membro_eaf(info.filename):
+                continue
+            with pacote.open(info) as membro:
+                yield f"{nome_pacote}/{info.filename}", membro
+
+
+def _itera_tar(fonte: Union[str, BinaryIO], nome_pacote: str) -> Iterator[Tuple[str, BinaryIO]]:
+    # Modo de fluxo ('r|*'): os membros são lidos em sequência, sem posicionamento no arquivo,
+    # o que também funciona para pacotes recebidos por um socket ou pela entrada padrão
+    argumentos = {"name": fonte} if isinstance(fonte, str) else {"fileobj": fonte}
+    with tarfile.open(mode="r|*", **argumentos) as pacote:
+        for info in pacote:
+            if not info.isfile() or not _eh_membro_eaf(info.name):
+                continue
+            membro = pacote.extractfile(info)
+            if membro is not None:
+                with membro:
+                    yield f"{nome_pacote}/{info.name}", membro
+
+
+def _itera_gzip(fonte: Union[str, BinaryIO], nome_pacote: str) -> Iterator[Tuple[str, BinaryIO]]:
+    with gzip.open(fonte, "rb") as membro:
+        yield nome_pacote[:-len(".gz")], membro
+
+
+def itera_pacote(pacote: Union[str, os.PathLike, BinaryIO], nome_pacote: Optional[str] = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Percorre os arquivos .eaf de um pacote .zip, .tar (.gz, .bz2, .xz) ou .eaf.gz sem extraí-lo.
+
+    Cada membro é entregue como um objeto de arquivo binário que descomprime sob demanda
+    e pode ser passado diretamente a 'elan.le_eaf'. O objeto só é válido até o próximo
+    passo da iteração; nem o pacote nem os membros são lidos inteiros para a memória.
+
+    O tipo do pacote é deduzido da extensão de 'nome_pacote' (ou do caminho); sem uma
+    extensão reconhecida, um objeto de arquivo posicionável é testado como .zip e, se
+    não for, lido como .tar.
+
+    :param pacote: Caminho do pacote ou objeto de arquivo binário (ex: upload do Streamlit).
+    :type pacote: Union[str, os.PathLike, BinaryIO]
+    :param nome_pacote: Nome do pacote, usado como prefixo do nome de cada membro.
+    :type nome_pacote: Optional[str]
+    :return: Pares (nome do membro prefixado pelo nome do pacote, objeto de arquivo).
+    :rtype: Iterator[Tuple[str, BinaryIO]]
+    """
+    if isinstance(pacote, os.PathLike):
+        pacote = os.fspath(pacote)
+    if nome_pacote is None:
+        nome_pacote = os.path.basename(pacote if isinstance(pacote, str) else getattr(pacote, "name", "") or "pacote")
+
+    nome = nome_pacote.lower()
+    if nome.endswith(".zip"):
+        return _itera_zip(pacote, nome_pacote)
+    if nome.endswith(".eaf.gz"):
+        return _itera_gzip(pacote, nome_pacote)
+    if eh_pacote(nome) or isinstance(pacote, str) or not pacote.seekable():
+        return _itera_tar(pacote, nome_pacote)
+    # zipfile.is_zipfile não devolve o objeto à posição original, da qual o .tar precisa ser lido
+    posicao = pacote.tell()
+    eh_zip = zipfile.is_zipfile(pacote)
+    pacote.seek(posicao)
+    return _itera_zip(pacote, nome_pacote) if eh_zip else _itera_tar(pacote, nome_pacote)
+
+
+def le_membros(pacote: Union[str, os.PathLike, BinaryIO], nome_pacote: Optional[str] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Como 'itera_pacote', mas com o conteúdo de cada membro em bytes, para envio a outro processo.
+
+    Apenas um membro por vez é lido para a memória.
+
+    :param pacote: Caminho do pacote ou objeto de arquivo binário.
+    :type pacote: Union[str, os.PathLike, BinaryIO]
+    :param nome_pacote: Nome do pacote, usado como prefixo do nome de cada membro.
+    :type nome_pacote: Optional[str]
+    :return: Pares (nome do membro, conteúdo).
+    :rtype: Iterator[Tuple[str, bytes]]
+    """
+    for nome_membro, membro in itera_pacote(pacote, nome_pacote):
+        yield nome_membro, membro.read()
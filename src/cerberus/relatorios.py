@@ -0,0 +1,279 @@
+import csv
+import datetime
+import html
+import json
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+from .elan import AgregadorErros
+
+# Aviso dos resultados de execuções de triagem que pararam no limite de erros
+AVISO_TRUNCADO = "Relatório truncado: a validação parou ao atingir o limite de erros (modo de triagem)."
+
+
+class EscritorRelatorio:
+    """
+    Base dos escritores de relatório: recebem os resultados de 'lote.valida_arquivo' um a um
+    e gravam cada um assim que chega, sem acumular o relatório em memória.
+
+    O destino é qualquer objeto de texto com 'write' (arquivo aberto, io.StringIO, ou um
+    socket via 'socket.makefile("w", encoding="utf-8")').
+
+    :param destino: Destino do relatório.
+    """
+
+    def __init__(self, destino: TextIO):
+        self.destino = destino
+        self.quantidade = 0
+
+    def escreve(self, resultado: Dict[str, Any]) -> None:
+        if self.quantidade == 0:
+            self._inicia()
+        self._escreve(resultado)
+        self.quantidade += 1
+        self.destino.flush()
+
+    def escreve_todos(self, resultados: Iterable[Dict[str, Any]]) -> None:
+        for resultado in resultados:
+            self.escreve(resultado)
+
+    def finaliza(self) -> None:
+        if self.quantidade == 0:
+            self._inicia()
+        self._finaliza()
+        self.destino.flush()
+
+    def _inicia(self) -> None:
+        pass
+
+    def _escreve(self, resultado: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _finaliza(self) -> None:
+        pass
+
+    def __enter__(self) -> "EscritorRelatorio":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.finaliza()
+
+
+class EscritorTexto(EscritorRelatorio):
+    """
+    Relatório em texto, no formato do relatório para download do app.
+    """
+
+    def _escreve(self, resultado: Dict[str, Any]) -> None:
+        escreve = self.destino.write
+        if self.quantidade:
+            escreve("\n\n")
+        escreve("Relatório de Validação Cerberus\n")
+        escreve(f"Arquivo: {resultado['arquivo']}\n")
+        escreve(f"Data: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        escreve("=" * 40 + "\n\n")
+
+        if resultado.get("erro"):
+            escreve(f"Erro crítico ao processar o arquivo: {resultado['erro']}\n")
+            return
+        if resultado.get("truncado"):
+            escreve(f"{AVISO_TRUNCADO}\n\n")
+
+        escreve("--- RESULTADO DA VALIDAÇÃO DE IDS ---\n")
+        if resultado["id_valido"]:
+            escreve("Status: SUCESSO\n\n")
+        else:
+            escreve("Status: FALHA\n")
+            for erro in resultado["id_erros"]:
+                escreve(f"- {erro}\n")
+            escreve("\n")
+
+        escreve("--- RESULTADO DA VALIDAÇÃO DE CONTEÚDO ---\n")
+        if not resultado["id_valido"]:
+            escreve("Status: NÃO EXECUTADO (IDs de trilha inválidos)\n")
+        elif resultado["conteudo_valido"]:
+            escreve("Status: SUCESSO\n")
+        else:
+            escreve("Status: FALHA\n")
+            for erro in resultado["conteudo_erros"]:
+                escreve(f"- {erro}\n")
+
+        escreve("\n--- RESULTADO DA VALIDAÇÃO TEMPORAL ---\n")
+        if not resultado["id_valido"]:
+            escreve("Status: NÃO EXECUTADO (IDs de trilha inválidos)\n")
+        elif resultado.get("tempo_valido") is None:
+            escreve("Status: NÃO EXECUTADO (limite de erros atingido)\n")
+        elif resultado["tempo_valido"]:
+            escreve("Status: SUCESSO\n")
+        else:
+            escreve("Status: FALHA\n")
+            for erro in resultado["tempo_erros"]:
+                escreve(f"- {erro}\n")
+
+
+class EscritorJSONL(EscritorRelatorio):
+    """
+    Uma linha JSON por arquivo, com o resultado completo.
+    """
+
+    def _escreve(self, resultado: Dict[str, Any]) -> None:
+        self.destino.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+
+class EscritorCSV(EscritorRelatorio):
+    """
+    Uma linha por erro encontrado (arquivos válidos não geram linhas).
+
+    Erros de conteúdo e de tempo geram uma linha por exemplo guardado, com a quantidade total de
+    ocorrências do mesmo erro na trilha em 'ocorrencias'. Resultados truncados pelo limite de
+    erros ganham uma linha com o código 'TRUNCADO'.
+    """
+
+    COLUNAS = ("arquivo", "etapa", "codigo", "trilha", "caracteres", "ocorrencias", "inicio_ms", "fim_ms", "mensagem")
+
+    def __init__(self, destino: TextIO):
+        super().__init__(destino)
+        self._csv = csv.writer(destino, lineterminator="\n")
+
+    def _inicia(self) -> None:
+        self._csv.writerow(self.COLUNAS)
+
+    def _escreve(self, resultado: Dict[str, Any]) -> None:
+        arquivo = resultado["arquivo"]
+        linha = self._csv.writerow
+
+        if resultado.get("erro"):
+            linha((arquivo, "leitura", "ERRO_LEITURA", "", "", 1, "", "", resultado["erro"]))
+            return
+
+        for erro in resultado.get("id_erros") or []:
+            linha((arquivo, "ids", "ID_TRILHA", "", "", 1, "", "", erro))
+        if resultado.get("truncado"):
+            linha((arquivo, "triagem", "TRUNCADO", "", "", "", "", "", AVISO_TRUNCADO))
+
+        self._escreve_detalhes(arquivo, "conteudo", resultado.get("conteudo_detalhes"), resultado.get("conteudo_erros"))
+        self._escreve_detalhes(arquivo, "tempos", resultado.get("tempo_detalhes"), resultado.get("tempo_erros"))
+
+    def _escreve_detalhes(self, arquivo: str, etapa: str, detalhes: Optional[Dict[str, Any]],
+                          mensagens: Optional[Iterable[str]]) -> None:
+        linha = self._csv.writerow
+        if detalhes is None:
+            # Resultado sem erros estruturados (ex: guardado no cache por uma versão anterior)
+            for mensagem in mensagens or []:
+                linha((arquivo, etapa, "", "", "", "", "", "", mensagem))
+            return
+
+        erros = AgregadorErros.de_dict(detalhes)
+        for erro_global in erros.globais:
+            linha((arquivo, etapa, erro_global.codigo, erro_global.trilha or "", "", 1, "", "", erro_global.mensagem()))
+        for grupo in erros:
+            for erro in grupo.exemplos:
+                linha((arquivo, etapa, erro.codigo, erro.trilha, erro.caracteres, grupo.total,
+                       erro.inicio, erro.fim, erro.mensagem()))
+
+
+class EscritorHTML(EscritorRelatorio):
+    """
+    Página HTML com uma seção por arquivo; o cabeçalho é gravado no primeiro resultado e o rodapé em 'finaliza'.
+    """
+
+    def _inicia(self) -> None:
+        self.destino.write(
+            '<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+            "<title>Relatório de Validação Cerberus</title>\n"
+            "<style>body{font-family:sans-serif;margin:2em}section{border:1px solid #ccc;border-radius:6px;"
+            "padding:0 1em;margin-bottom:1em}.sucesso{color:#1a7f37}.falha{color:#cf222e}.aviso{color:#9a6700}</style>\n"
+            "</head>\n<body>\n<h1>Relatório de Validação Cerberus</h1>\n"
+            f"<p>Data: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n"
+        )
+
+    def _escreve(self, resultado: Dict[str, Any]) -> None:
+        escreve = self.destino.write
+        escreve(f"<section>\n<h2>{html.escape(str(resultado['arquivo']))}</h2>\n")
+
+        if resultado.get("erro"):
+            escreve(f'<p class="falha">Erro crítico ao processar o arquivo: {html.escape(resultado["erro"])}</p>\n</section>\n')
+            return
+        if resultado.get("truncado"):
+            escreve(f'<p class="aviso">{html.escape(AVISO_TRUNCADO)}</p>\n')
+
+        escreve("<h3>Validação de IDs</h3>\n")
+        if resultado["id_valido"]:
+            escreve('<p class="sucesso">SUCESSO</p>\n')
+        else:
+            escreve('<p class="falha">FALHA</p>\n')
+            self._lista(resultado["id_erros"])
+
+        escreve("<h3>Validação de conteúdo</h3>\n")
+        if not resultado["id_valido"]:
+            escreve('<p class="aviso">NÃO EXECUTADO (IDs de trilha inválidos)</p>\n')
+        elif resultado["conteudo_valido"]:
+            escreve('<p class="sucesso">SUCESSO</p>\n')
+        else:
+            escreve('<p class="falha">FALHA</p>\n')
+            self._lista(resultado["conteudo_erros"])
+
+        escreve("<h3>Validação temporal</h3>\n")
+        if not resultado["id_valido"]:
+            escreve('<p class="aviso">NÃO EXECUTADO (IDs de trilha inválidos)</p>\n')
+        elif resultado.get("tempo_valido") is None:
+            escreve('<p class="aviso">NÃO EXECUTADO (limite de erros atingido)</p>\n')
+        elif resultado["tempo_valido"]:
+            escreve('<p class="sucesso">SUCESSO</p>\n')
+        else:
+            escreve('<p class="falha">FALHA</p>\n')
+            self._lista(resultado["tempo_erros"])
+        escreve("</section>\n")
+
+    def _lista(self, mensagens: Iterable[str]) -> None:
+        self.destino.write("<ul>\n")
+        for mensagem in mensagens:
+            self.destino.write(f"<li>{html.escape(mensagem)}</li>\n")
+        self.destino.write("</ul>\n")
+
+    def _finaliza(self) -> None:
+        self.destino.write("</body>\n</html>\n")
+
+
+ESCRITORES = {
+    "jsonl": EscritorJSONL,
+    "texto": EscritorTexto,
+    "csv": EscritorCSV,
+    "html": EscritorHTML,
+}
+
+# Formato deduzido da extensão do arquivo de saída
+_EXTENSOES = {".jsonl": "jsonl", ".json": "jsonl", ".txt": "texto", ".csv": "csv", ".html": "html", ".htm": "html"}
+
+
+def formato_por_extensao(caminho: Optional[str], padrao: str = "jsonl") -> str:
+    """
+    Deduz o formato do relatório pela extensão do arquivo de saída.
+
+    :param caminho: Caminho do arquivo de saída (None: saída padrão).
+    :type caminho: Optional[str]
+    :param padrao: Formato usado quando a extensão não é reconhecida.
+    :type padrao: str
+    :return: Chave de ESCRITORES.
+    :rtype: str
+    """
+    if caminho:
+        for extensao, formato in _EXTENSOES.items():
+            if caminho.lower().endswith(extensao):
+                return formato
+    return padrao
+
+
+def cria_escritor(formato: str, destino: TextIO) -> EscritorRelatorio:
+    """
+    Cria o escritor de relatório de um formato ('jsonl', 'texto', 'csv' ou 'html').
+
+    :param formato: Formato do relatório.
+    :type formato: str
+    :param destino: Destino do relatório (arquivo, io.StringIO, socket.makefile...).
+    :type destino: TextIO
+    :return: Escritor do formato pedido.
+    :rtype: EscritorRelatorio
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de relatório desconhecido: {formato!r}. Use um de {sorted(ESCRITORES)}.")
+    return ESCRITORES[formato](destino)
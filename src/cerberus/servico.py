@@ -0,0 +1,368 @@
+import asyncio
+import concurrent.futures
+import io
+import json
+import multiprocessing
+import signal
+import time
+import urllib.parse
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from email import policy
+from email.parser import BytesParser
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import lote
+from .elan import RuleSet
+from .instrumentacao import Instrumentacao
+
+_MOTIVOS = {
+    100: "Continue", 200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+    413: "Payload Too Large", 417: "Expectation Failed", 500: "Internal Server Error", 503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class ErroHTTP(Exception):
+    """
+    Erro que interrompe uma requisição e vira uma resposta JSON {"erro": mensagem} com o status dado.
+    """
+
+    def __init__(self, status: int, mensagem: str, cabecalhos: Optional[Dict[str, str]] = None):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+        self.cabecalhos = cabecalhos or {}
+
+
+def _extrai_multipart(tipo_conteudo: str, corpo: bytes) -> List[Tuple[str, bytes]]:
+    """
+    Arquivos (nome, bytes) de um corpo multipart/form-data.
+    """
+    mensagem = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + tipo_conteudo.encode("latin-1") + b"\r\n\r\n" + corpo
+    )
+    if not mensagem.is_multipart():
+        raise ErroHTTP(400, "Corpo multipart inválido.")
+    return [
+        (parte.get_filename() or "arquivo.eaf", parte.get_payload(decode=True) or b"")
+        for parte in mensagem.iter_parts()
+        if parte.get_filename() is not None
+    ]
+
+
+def _extrai_zip(corpo: bytes, max_bytes: int) -> List[Tuple[str, bytes]]:
+    """
+    Arquivos .eaf (nome, bytes) de um .zip, recusando pacotes que descompactam para mais de 'max_bytes'.
+    """
+    try:
+        pacote = zipfile.ZipFile(io.BytesIO(corpo))
+    except zipfile.BadZipFile:
+        raise ErroHTTP(400, "Arquivo .zip inválido.")
+    membros = [m for m in pacote.infolist() if not m.is_dir() and m.filename.lower().endswith(".eaf")]
+    if sum(m.file_size for m in membros) > max_bytes:
+        raise ErroHTTP(413, f"O conteúdo descompactado do .zip excede {max_bytes} bytes.")
+    return [(m.filename, pacote.read(m)) for m in membros]
+
+
+class ServicoValidacao:
+    """
+    Serviço HTTP local de validação, com front end asyncio e validação em um pool de processos.
+
+    Rotas:
+        - POST /validate: um arquivo .eaf, no corpo (nome em '?nome=') ou em multipart/form-data;
+        - POST /validate/batch: vários arquivos em multipart/form-data, ou um .zip (application/zip);
+        - GET /metrics: métricas no formato texto do Prometheus.
+
+    As respostas de validação trazem o resultado de 'lote.valida_arquivo' (IDs, mapeamento,
+    conteúdo e tempos). O serviço recusa (503) requisições que fariam a fila de arquivos
+    passar de 'max_fila' (413 se a requisição sozinha já tem mais arquivos que 'max_fila') e
+    responde 504 a arquivos que não terminam em 'tempo_limite' segundos. Um POST com
+    'Expect: 100-continue' recebe '100 Continue' depois que os cabeçalhos são aceitos, ou a
+    recusa (411, 413) sem que o corpo seja enviado.
+
+    :param regras: Conjunto de regras compilado.
+    :param num_processos: Quantidade de processos do pool. None usa a quantidade de CPUs.
+    :param max_fila: Máximo de arquivos em validação ou aguardando um processo.
+    :param tempo_limite: Tempo máximo (em segundos) de validação de cada arquivo.
+    :param max_corpo: Tamanho máximo do corpo de uma requisição (e do conteúdo de um .zip), em bytes.
+    :param caminho_cache: Banco de cache de resultados. None desativa o cache.
+    """
+
+    def __init__(self, regras: RuleSet, num_processos: Optional[int] = None, max_fila: int = 64,
+                 tempo_limite: float = 30.0, max_corpo: int = 64 * 1024 * 1024, caminho_cache: Optional[str] = None):
+        self.regras = regras
+        self.num_processos = num_processos
+        self.max_fila = max_fila
+        self.tempo_limite = tempo_limite
+        self.max_corpo = max_corpo
+        self.caminho_cache = caminho_cache
+        self.metricas = Instrumentacao()
+        self.na_fila = 0
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._rotas = {
+            ("POST", "/validate"): self._valida,
+            ("POST", "/validate/batch"): self._valida_lote,
+            ("GET", "/metrics"): self._metricas,
+        }
+
+    # --- Pool de processos ---
+
+    def _obtem_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # 'spawn': processos criados depois da abertura do socket não herdam o descritor de escuta
+            self._pool = lote.cria_pool(self.regras, self.num_processos, self.caminho_cache,
+                                        multiprocessing.get_context("spawn"), memo_layouts=True)
+        return self._pool
+
+    def _reserva(self, quantidade: int) -> None:
+        if quantidade > self.max_fila:
+            # Nem com a fila vazia a requisição caberia: tentar de novo não adianta
+            self.metricas.conta("arquivos.recusados", quantidade)
+            raise ErroHTTP(413, f"A requisição tem {quantidade} arquivos, mais que a capacidade da fila de validação "
+                                f"({self.max_fila} arquivos). Envie os arquivos em lotes menores.")
+        if self.na_fila + quantidade > self.max_fila:
+            self.metricas.conta("arquivos.recusados", quantidade)
+            raise ErroHTTP(503, f"Fila de validação cheia ({self.na_fila}/{self.max_fila} arquivos). Tente novamente.",
+                           {"Retry-After": "1"})
+        self.na_fila += quantidade
+
+    def _libera(self) -> None:
+        self.na_fila -= 1
+
+    def _descarta_pool(self, pool: concurrent.futures.ProcessPoolExecutor, encerra_processos: bool = False) -> None:
+        """
+        Tira o pool de uso (o próximo envio cria outro) e o encerra sem esperar.
+
+        Com 'encerra_processos', os processos são terminados: um arquivo que excedeu o tempo
+        limite continuaria ocupando um deles sem ser contado na fila. As demais tarefas do
+        pool falham com BrokenProcessPool e são reenviadas ao novo pool por '_valida_arquivo'.
+        """
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=not encerra_processos)
+        if encerra_processos:
+            self.metricas.conta("pool.reciclagens")
+            for processo in list((getattr(pool, "_processes", None) or {}).values()):
+                processo.terminate()
+
+    async def _valida_arquivo(self, nome_arquivo: str, conteudo: bytes) -> Dict[str, Any]:
+        """
+        Valida um arquivo no pool (a vaga na fila deve ter sido reservada com '_reserva').
+
+        A vaga é liberada ao final, em qualquer caso. Um arquivo que excede o tempo limite já
+        em execução faz o pool ser reciclado, de modo que nenhum processo fique ocupado sem
+        estar contado na fila. Se o pool quebrar (ou for reciclado por outra requisição), o
+        arquivo é reenviado uma vez ao novo pool.
+        """
+        try:
+            for tentativa in range(2):
+                pool = self._obtem_pool()
+                try:
+                    futuro = pool.submit(lote.valida_no_trabalhador, conteudo, nome_arquivo, True)
+                    resultado = await asyncio.wait_for(asyncio.wrap_future(futuro), self.tempo_limite)
+                except asyncio.TimeoutError:
+                    self.metricas.conta("arquivos.tempo_esgotado")
+                    # Ainda na fila do pool, a tarefa é cancelada; em execução, só encerrando o processo
+                    if not futuro.cancel():
+                        self._descarta_pool(pool, encerra_processos=True)
+                    raise ErroHTTP(504, f"A validação de '{nome_arquivo}' excedeu o tempo limite de {self.tempo_limite:g}s.")
+                except BrokenProcessPool:
+                    self._descarta_pool(pool)
+                    if tentativa == 0:
+                        continue
+                    self.metricas.conta("arquivos.falhas")
+                    raise ErroHTTP(500, f"O processo de validação foi encerrado inesperadamente ao ler '{nome_arquivo}'.")
+
+                self.metricas.mescla(resultado.pop("instrumentacao", {}))
+                self.metricas.conta("arquivos.validados")
+                return resultado
+        finally:
+            self._libera()
+
+    # --- Rotas ---
+
+    async def _valida(self, consulta: Dict[str, List[str]], cabecalhos: Dict[str, str], corpo: bytes) -> Dict[str, Any]:
+        tipo_conteudo = cabecalhos.get("content-type", "")
+        if tipo_conteudo.startswith("multipart/"):
+            arquivos = _extrai_multipart(tipo_conteudo, corpo)
+            if len(arquivos) != 1:
+                raise ErroHTTP(400, "Envie exatamente um arquivo em /validate (use /validate/batch para vários).")
+            nome_arquivo, conteudo = arquivos[0]
+        else:
+            nome_arquivo, conteudo = consulta.get("nome", ["arquivo.eaf"])[0], corpo
+        if not conteudo:
+            raise ErroHTTP(400, "Corpo da requisição vazio.")
+
+        self._reserva(1)
+        return await self._valida_arquivo(nome_arquivo, conteudo)
+
+    async def _valida_lote(self, consulta: Dict[str, List[str]], cabecalhos: Dict[str, str], corpo: bytes) -> Dict[str, Any]:
+        tipo_conteudo = cabecalhos.get("content-type", "")
+        if tipo_conteudo.startswith("multipart/"):
+            arquivos = []
+            for nome_arquivo, conteudo in _extrai_multipart(tipo_conteudo, corpo):
+                if nome_arquivo.lower().endswith(".zip"):
+                    arquivos.extend(_extrai_zip(conteudo, self.max_corpo))
+                else:
+                    arquivos.append((nome_arquivo, conteudo))
+        elif tipo_conteudo.startswith(("application/zip", "application/x-zip")):
+            arquivos = _extrai_zip(corpo, self.max_corpo)
+        else:
+            raise ErroHTTP(400, "Envie os arquivos em multipart/form-data ou um .zip (application/zip).")
+        if not arquivos:
+            raise ErroHTTP(400, "Nenhum arquivo .eaf encontrado na requisição.")
+
+        self._reserva(len(arquivos))
+        respostas = await asyncio.gather(
+            *(self._valida_arquivo(nome_arquivo, conteudo) for nome_arquivo, conteudo in arquivos),
+            return_exceptions=True,
+        )
+
+        resultados = []
+        for (nome_arquivo, _), resposta in zip(arquivos, respostas):
+            if isinstance(resposta, ErroHTTP):
+                resposta = lote._resultado_falha(nome_arquivo, resposta.mensagem)
+            elif isinstance(resposta, BaseException):
+                resposta = lote._resultado_falha(nome_arquivo, f"{type(resposta).__name__}: {resposta}")
+            resultados.append(resposta)
+        return {
+            "total": len(resultados),
+            "validos": sum(1 for r in resultados if r.get("valido")),
+            "resultados": resultados,
+        }
+
+    async def _metricas(self, consulta: Dict[str, List[str]], cabecalhos: Dict[str, str], corpo: bytes) -> str:
+        return self.metricas.para_prometheus() + (
+            "# TYPE cerberus_fila_arquivos gauge\n"
+            f"cerberus_fila_arquivos {self.na_fila}\n"
+            "# TYPE cerberus_fila_limite gauge\n"
+            f"cerberus_fila_limite {self.max_fila}\n"
+        )
+
+    # --- HTTP ---
+
+    async def _le_requisicao(self, leitor: asyncio.StreamReader,
+                             escritor: asyncio.StreamWriter) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        linha = await leitor.readline()
+        if not linha:
+            return None
+        try:
+            metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ErroHTTP(400, "Linha de requisição inválida.")
+
+        cabecalhos: Dict[str, str] = {}
+        while True:
+            linha = await leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        corpo = b""
+        if metodo == "POST":
+            if "content-length" not in cabecalhos:
+                raise ErroHTTP(411, "Cabeçalho Content-Length obrigatório.")
+            try:
+                tamanho = int(cabecalhos["content-length"])
+            except ValueError:
+                raise ErroHTTP(400, "Cabeçalho Content-Length inválido.")
+            if tamanho > self.max_corpo:
+                raise ErroHTTP(413, f"O corpo da requisição excede {self.max_corpo} bytes.")
+            expectativa = cabecalhos.get("expect", "").lower()
+            if expectativa == "100-continue":
+                # O cliente espera a aceitação dos cabeçalhos antes de enviar o corpo
+                escritor.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await escritor.drain()
+            elif expectativa:
+                raise ErroHTTP(417, f"Expectativa não suportada: {cabecalhos['expect']}.")
+            corpo = await leitor.readexactly(tamanho)
+        return metodo, alvo, cabecalhos, corpo
+
+    async def _atende(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                inicio = time.perf_counter()
+                manter = False
+                rota = "?"
+                try:
+                    requisicao = await self._le_requisicao(leitor, escritor)
+                    if requisicao is None:
+                        break
+                    metodo, alvo, cabecalhos, corpo = requisicao
+                    manter = cabecalhos.get("connection", "").lower() != "close"
+                    url = urllib.parse.urlsplit(alvo)
+                    rota = url.path
+                    tratador = self._rotas.get((metodo, url.path))
+                    if tratador is None:
+                        if any(caminho == url.path for _, caminho in self._rotas):
+                            raise ErroHTTP(405, f"Método {metodo} não permitido em {url.path}.")
+                        raise ErroHTTP(404, f"Rota {url.path} não encontrada.")
+                    resposta = await tratador(urllib.parse.parse_qs(url.query), cabecalhos, corpo)
+                    status, extras = 200, {}
+                except ErroHTTP as e:
+                    status, extras, resposta = e.status, e.cabecalhos, {"erro": e.mensagem}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, extras, resposta = 500, {}, {"erro": f"{type(e).__name__}: {e}"}
+
+                if isinstance(resposta, str):
+                    dados, tipo = resposta.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    dados, tipo = json.dumps(resposta, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+
+                cabecalhos_resposta = {"Content-Type": tipo, "Content-Length": str(len(dados)),
+                                       "Connection": "keep-alive" if manter else "close", **extras}
+                escritor.write(
+                    f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n".encode("latin-1")
+                    + "".join(f"{nome}: {valor}\r\n" for nome, valor in cabecalhos_resposta.items()).encode("latin-1")
+                    + b"\r\n" + dados
+                )
+                await escritor.drain()
+
+                if rota in ("/validate", "/validate/batch"):
+                    self.metricas.conta(f"requisicoes.{rota}")
+                    self.metricas.conta(f"respostas.{status}")
+                    self.metricas.adiciona_tempo(f"requisicao{rota}", time.perf_counter() - inicio)
+                if not manter:
+                    break
+        except asyncio.CancelledError:
+            # Conexão ociosa (keep-alive) interrompida pelo encerramento do servidor
+            pass
+        finally:
+            escritor.close()
+
+    async def inicia(self, host: str = "127.0.0.1", porta: int = 8765) -> asyncio.AbstractServer:
+        """
+        Abre o servidor (e o pool de processos) e devolve o asyncio.Server já aceitando conexões.
+        """
+        self._obtem_pool()
+        return await asyncio.start_server(self._atende, host, porta)
+
+    def encerra(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+async def executa_servidor(servico: ServicoValidacao, host: str = "127.0.0.1", porta: int = 8765) -> None:
+    """
+    Executa o serviço até ser interrompido.
+    """
+    servidor = await servico.inicia(host, porta)
+    loop = asyncio.get_running_loop()
+    try:
+        # SIGTERM encerra o servidor como o Ctrl+C, desligando também o pool de processos
+        loop.add_signal_handler(signal.SIGTERM, servidor.close)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        # Sem suporte a sinais no loop (Windows) ou loop fora da thread principal
+        pass
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        servico.encerra()
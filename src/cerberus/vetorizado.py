@@ -0,0 +1,224 @@
+import functools
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import elan
+from .elan import RuleSet
+
+# Colunas da tabela de anotações e da tabela de erros
+COLUNAS_ANOTACOES = ("arquivo", "trilha", "content_type", "inicio", "fim", "valor")
+COLUNAS_ERROS = ("arquivo", "trilha", "content_type", "inicio", "fim", "codigo", "caracteres")
+
+
+def _classe_re2(codigos: Iterable[int]) -> str:
+    """
+    Conteúdo de uma classe de caracteres do RE2 (sem os colchetes) com exatamente os códigos dados.
+    """
+    faixas: List[List[int]] = []
+    for codigo in sorted(codigos):
+        if faixas and faixas[-1][1] == codigo - 1:
+            faixas[-1][1] = codigo
+        else:
+            faixas.append([codigo, codigo])
+    return "".join(
+        f"\\x{{{inicio:X}}}" if inicio == fim else f"\\x{{{inicio:X}}}-\\x{{{fim:X}}}"
+        for inicio, fim in faixas
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _classes() -> Dict[str, str]:
+    """
+    Classes de caracteres equivalentes às do módulo 're' do Python.
+
+    No RE2 (usado pelo pyarrow) '\\s' e '\\d' só reconhecem ASCII, enquanto no Python
+    reconhecem qualquer espaço ou dígito Unicode. As classes são geradas a partir do
+    próprio Python (str.isspace e str.isdecimal), para que os resultados sejam idênticos.
+    """
+    espacos = [c for c in range(0x3001) if chr(c).isspace()]
+    decimais = [c for c in range(0x110000) if chr(c).isdecimal()]
+    return {
+        "espacos": _classe_re2(espacos),
+        "caracteres_espaco": "".join(map(chr, espacos)),
+        "decimais": _classe_re2(decimais),
+    }
+
+
+def tabela_anotacoes(arquivos: Iterable[Union[str, bytes, Tuple[str, bytes]]], regras: RuleSet) -> pa.Table:
+    """
+    Lê vários arquivos .eaf e reúne em uma única tabela Arrow as anotações das trilhas mapeadas.
+
+    Arquivos cujas trilhas não passam na validação de IDs (ou que não podem ser lidos)
+    ficam de fora, como na validação arquivo a arquivo, em que o conteúdo não é validado.
+
+    :param arquivos: Caminhos dos arquivos ou pares (nome, bytes).
+    :type arquivos: Iterable[Union[str, bytes, Tuple[str, bytes]]]
+    :param regras: Conjunto de regras usado para mapear as trilhas.
+    :type regras: RuleSet
+    :return: Tabela com as colunas arquivo, trilha, content_type, inicio, fim e valor.
+    :rtype: pa.Table
+    """
+    colunas: Dict[str, List[Any]] = {nome: [] for nome in COLUNAS_ANOTACOES}
+
+    for arquivo in arquivos:
+        nome_arquivo, conteudo = arquivo if isinstance(arquivo, tuple) else (None, arquivo)
+        try:
+            nome_final, eaf = elan.le_eaf(conteudo, nome_arquivo)
+        except RuntimeError:
+            continue
+
+        id_valido, _, mapeamento = elan.valida_id_trilhas(eaf, regras, memo=elan.MEMO_LAYOUTS)
+        if not id_valido:
+            continue
+
+        for nome_trilha, tipo_conteudo in mapeamento.items():
+            anotacoes = eaf.get_annotation_data_for_tier(nome_trilha)
+            if not anotacoes:
+                continue
+            quantidade = len(anotacoes)
+            colunas["arquivo"] += [nome_final] * quantidade
+            colunas["trilha"] += [nome_trilha] * quantidade
+            colunas["content_type"] += [tipo_conteudo] * quantidade
+            inicios, fins, valores = zip(*anotacoes)
+            colunas["inicio"] += inicios
+            colunas["fim"] += fins
+            colunas["valor"] += valores
+
+    return pa.table({
+        "arquivo": pa.array(colunas["arquivo"], pa.string()).dictionary_encode(),
+        "trilha": pa.array(colunas["trilha"], pa.string()).dictionary_encode(),
+        "content_type": pa.array(colunas["content_type"], pa.string()).dictionary_encode(),
+        "inicio": pa.array(colunas["inicio"], pa.int64()),
+        "fim": pa.array(colunas["fim"], pa.int64()),
+        "valor": pa.array(colunas["valor"], pa.string()),
+    })
+
+
+def _erros_inf_doc(valores: pa.Array) -> List[Tuple[pa.Array, str, Union[str, pa.Array]]]:
+    """
+    Versão vetorizada de '_valida_conteudo_inf_doc'. Devolve, na ordem dos códigos do
+    validador, triplas (posições das linhas com o erro, código, caracteres): os caracteres
+    são um texto único ou um array com os caracteres de cada posição.
+    """
+    classes = _classes()
+    permitidos = f'a-zA-Zá-úÁ-Ú{classes["espacos"]}\\(\\)\\?\\/\\-"çÇàÀ-'
+
+    # Só as linhas com algum caractere inválido passam pela extração dos caracteres
+    com_invalidos = pc.indices_nonzero(pc.match_substring_regex(valores, f"[^{permitidos}]"))
+    invalidos = pc.replace_substring_regex(pc.take(valores, com_invalidos), f"[{permitidos}]+", "")
+
+    digito = pc.match_substring_regex(invalidos, f'[{classes["decimais"]}]')
+    disf = pc.match_substring_regex(valores, r"\(EST\)|\(HES\)|\(\(")
+
+    # O conjunto (distinto e ordenado) dos caracteres inválidos é montado uma vez por combinação distinta
+    distintos = pc.unique(invalidos)
+    conjuntos = pa.array(["".join(sorted(set(caracteres))) for caracteres in distintos.to_pylist()], pa.string())
+
+    return [
+        (com_invalidos.filter(digito), "DIGITO_PRESENTE", ""),
+        (pc.indices_nonzero(disf), "DISF_PRESENTE", ""),
+        (com_invalidos, "CARACTERE_INVALIDO", pc.take(conjuntos, pc.index_in(invalidos, value_set=distintos))),
+    ]
+
+
+def _erros_disf(valores: pa.Array) -> List[Tuple[pa.Array, str, Union[str, pa.Array]]]:
+    """
+    Versão vetorizada de '_valida_conteudo_disf'. Devolve triplas (posições, código, caracteres), como '_erros_inf_doc'.
+    """
+    classes = _classes()
+    padrao = pc.or_(
+        pc.is_in(valores, value_set=pa.array(["(EST)", "(HES)"])),
+        pc.match_substring_regex(valores, f'^\\(\\([A-Z{classes["espacos"]}]+\\)\\)$'),
+    )
+    fora_do_padrao = pc.and_not(
+        pc.or_(
+            pc.is_in(pc.utf8_upper(valores), value_set=pa.array(["(EST)", "(HES)"])),
+            pc.match_substring_regex(valores, r"^\(\(.*\)\)$"),
+        ),
+        padrao,
+    )
+    invalida = pc.invert(pc.or_(padrao, fora_do_padrao))
+
+    return [
+        (pc.indices_nonzero(fora_do_padrao), "ERRO_DISF", ""),
+        (pc.indices_nonzero(invalida), "DISF_INVALIDA", ""),
+    ]
+
+
+# Kernel vetorizado para cada tipo de conteúdo aceito em 'content_type'
+_KERNELS_CONTEUDO = {
+    "INF": _erros_inf_doc,
+    "DOC": _erros_inf_doc,
+    "DISF": _erros_disf,
+}
+
+
+def valida_tabela(tabela: pa.Table) -> pa.Table:
+    """
+    Valida o conteúdo de todas as anotações de uma tabela de 'tabela_anotacoes' com kernels vetorizados do Arrow.
+
+    Os erros (código e caracteres) são os mesmos de '_valida_conteudo_inf_doc' e '_valida_conteudo_disf'
+    aplicados a cada anotação (após remover os espaços das pontas; anotações vazias são
+    ignoradas), na mesma ordem: por anotação e, dentro de cada anotação, na ordem do validador.
+
+    :param tabela: Tabela com as colunas de COLUNAS_ANOTACOES.
+    :type tabela: pa.Table
+    :return: Tabela com uma linha por erro e as colunas de COLUNAS_ERROS.
+    :rtype: pa.Table
+    """
+    classes = _classes()
+    valores = pc.utf8_trim(tabela.column("valor"), characters=classes["caracteres_espaco"])
+    preenchidos = pc.fill_null(pc.greater(pc.utf8_length(valores), 0), False)
+    tipos = pc.cast(tabela.column("content_type"), pa.string())
+
+    partes = []
+    for tipo_conteudo, kernel in _KERNELS_CONTEUDO.items():
+        mascara = pc.and_(preenchidos, pc.equal(tipos, tipo_conteudo))
+        indices = pc.indices_nonzero(mascara)
+        if not len(indices):
+            continue
+
+        selecionados = pc.take(valores, indices).combine_chunks()
+        for ordem, (posicoes, codigo, caracteres) in enumerate(kernel(selecionados)):
+            indices_erro = pc.take(indices, posicoes)
+            if isinstance(caracteres, str):
+                caracteres = pa.repeat(pa.scalar(caracteres, pa.string()), len(indices_erro))
+            partes.append(pa.table({
+                "indice": indices_erro,
+                "ordem": pa.repeat(pa.scalar(ordem, pa.int8()), len(indices_erro)),
+                "codigo": pa.repeat(pa.scalar(codigo, pa.string()), len(indices_erro)),
+                "caracteres": caracteres,
+            }))
+
+    if not partes:
+        erros = pa.table({"indice": pa.array([], pa.uint64()), "ordem": pa.array([], pa.int8()),
+                          "codigo": pa.array([], pa.string()), "caracteres": pa.array([], pa.string())})
+    else:
+        erros = pa.concat_tables(partes).sort_by([("indice", "ascending"), ("ordem", "ascending")])
+
+    linhas = tabela.take(erros.column("indice"))
+    return pa.table({
+        "arquivo": linhas.column("arquivo"),
+        "trilha": linhas.column("trilha"),
+        "content_type": linhas.column("content_type"),
+        "inicio": linhas.column("inicio"),
+        "fim": linhas.column("fim"),
+        "codigo": erros.column("codigo"),
+        "caracteres": erros.column("caracteres"),
+    })
+
+
+def valida_corpus_vetorizado(arquivos: Iterable[Union[str, bytes, Tuple[str, bytes]]], regras: RuleSet) -> pa.Table:
+    """
+    Lê os arquivos e valida o conteúdo de todas as anotações de uma vez ('tabela_anotacoes' + 'valida_tabela').
+
+    :param arquivos: Caminhos dos arquivos ou pares (nome, bytes).
+    :type arquivos: Iterable[Union[str, bytes, Tuple[str, bytes]]]
+    :param regras: Conjunto de regras usado para mapear as trilhas.
+    :type regras: RuleSet
+    :return: Tabela de erros (COLUNAS_ERROS); 'to_pandas()' converte para um DataFrame.
+    :rtype: pa.Table
+    """
+    return valida_tabela(tabela_anotacoes(arquivos, regras))
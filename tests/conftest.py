@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Os testes usam o pacote a partir de 'src' e o gerador de arquivos sintéticos do pacote 'benchmarks'
+_RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_RAIZ / "src"))
+sys.path.insert(0, str(_RAIZ))
@@ -0,0 +1,226 @@
+"""
+Testes do cache persistente (cerberus.cache.CacheValidacao) e da memória de disposições de trilhas (elan.MemoLayouts).
+"""
+import sqlite3
+
+import pytest
+
+from cerberus import cache as modulo_cache
+from cerberus import elan, lote
+from cerberus.cache import CacheValidacao, chave_cache
+from benchmarks.gerador import gera_eaf
+
+REGRAS = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+
+class _TrilhasFalsas:
+    """Fonte mínima de trilhas para o validador, sem leitura de arquivo."""
+
+    def __init__(self, nomes):
+        self._nomes = nomes
+
+    def get_tier_names(self):
+        return self._nomes
+
+
+class _Relogio:
+    """Relógio que avança um segundo por leitura: a ordem de acesso da expulsão LRU não depende da resolução do relógio."""
+
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def __call__(self) -> float:
+        self.agora += 1
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(modulo_cache.time, "time", relogio)
+    return relogio
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.fecha()
+
+
+def test_resultado_guardado_e_devolvido_pelo_conteudo(cache):
+    conteudo = gera_eaf(3, 50, {"digito": 0.2}, semente=1)
+
+    primeiro = lote.valida_arquivo(conteudo, REGRAS, "a.eaf", cache=cache)
+    segundo = lote.valida_arquivo(conteudo, REGRAS, "copia.eaf", cache=cache)
+
+    assert primeiro["cache"] is False and segundo["cache"] is True
+    assert segundo["arquivo"] == "copia.eaf"
+    campos_variaveis = ("arquivo", "cache", "duracao")
+    assert ({k: v for k, v in segundo.items() if k not in campos_variaveis}
+            == {k: v for k, v in primeiro.items() if k not in campos_variaveis})
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+
+def test_falha_com_outro_conteudo_ou_outras_regras(cache):
+    conteudo = gera_eaf(3, 50, semente=1)
+    lote.valida_arquivo(conteudo, REGRAS, "a.eaf", cache=cache)
+
+    assert lote.valida_arquivo(conteudo + b" ", REGRAS, "a.eaf", cache=cache)["cache"] is False
+    assert lote.valida_arquivo(conteudo, elan.RuleSet(dict(elan.REGRAS_ENTREVISTA, maiusculas=False)), "a.eaf",
+                               cache=cache)["cache"] is False
+    assert cache.acertos == 0
+
+
+def test_mudanca_da_versao_dos_resultados_invalida_o_cache(cache, monkeypatch):
+    conteudo = gera_eaf(3, 50, semente=1)
+    chave = chave_cache(conteudo, REGRAS)
+    cache.guarda(chave, {"valido": True})
+    assert cache.obtem(chave) == {"valido": True}
+
+    monkeypatch.setattr(modulo_cache, "VERSAO_RESULTADOS", modulo_cache.VERSAO_RESULTADOS + 1)
+
+    assert chave_cache(conteudo, REGRAS) != chave
+    assert cache.obtem(chave_cache(conteudo, REGRAS)) is None
+
+
+def test_resultados_expulsos_pelo_acesso_mais_antigo(tmp_path, relogio):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"), max_entradas=2, intervalo_expulsao=1)
+    try:
+        cache.guarda("a", {"valido": True})
+        cache.guarda("b", {"valido": True})
+        assert cache.obtem("a") is not None
+        cache.guarda("c", {"valido": False})
+
+        assert cache.obtem("b") is None
+        assert cache.obtem("a") is not None and cache.obtem("c") is not None
+        assert cache.estatisticas()["entradas"] == 2
+    finally:
+        cache.fecha()
+
+
+def test_resultados_expulsos_por_tamanho_e_idade(tmp_path, relogio):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"), max_bytes=100, max_idade=50, intervalo_expulsao=1)
+    try:
+        cache.guarda("grande", {"texto": "x" * 80})
+        cache.guarda("pequeno", {"texto": "y"})
+        cache.guarda("outro", {"texto": "z" * 40})
+        assert cache.obtem("grande") is None
+        assert cache.estatisticas()["bytes"] <= 100
+
+        relogio.agora += 50
+        assert cache.obtem("pequeno") is None
+    finally:
+        cache.fecha()
+
+
+def test_expulsao_a_cada_intervalo_de_insercoes(tmp_path):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"), max_entradas=2, intervalo_expulsao=4)
+    try:
+        for chave in "abcd":
+            cache.guarda(chave, {"valido": True})
+        # A primeira inserção verifica os limites; as três seguintes, não
+        assert cache.estatisticas()["entradas"] == 4
+
+        cache.guarda("e", {"valido": True})
+        assert cache.estatisticas()["entradas"] == 2
+    finally:
+        cache.fecha()
+
+
+def test_memo_de_layouts_acerta_a_mesma_disposicao(cache):
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    memo = elan.MemoLayouts(persistencia=cache)
+    trilhas = _TrilhasFalsas(["DISF", "DOC", "INF"])
+
+    esperado = elan.valida_id_trilhas(trilhas, regras, memo=None)
+    assert elan.valida_id_trilhas(trilhas, regras, memo=memo) == esperado
+    assert elan.valida_id_trilhas(trilhas, regras, memo=memo) == esperado
+    assert (memo.acertos, memo.falhas) == (1, 1)
+
+    # Outra disposição das mesmas trilhas é outra entrada
+    elan.valida_id_trilhas(_TrilhasFalsas(["DOC", "DISF", "INF"]), regras, memo=memo)
+    assert memo.falhas == 2
+
+    # Um processo novo encontra a disposição no cache persistente
+    outro = elan.MemoLayouts(persistencia=cache)
+    assert elan.valida_id_trilhas(trilhas, regras, memo=outro) == esperado
+    assert (outro.acertos, outro.falhas) == (1, 0)
+
+
+def test_memo_de_layouts_invalida_com_mudanca_das_regras(cache):
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    alteradas = elan.RuleSet(dict(elan.REGRAS_ENTREVISTA, num_trilhas=4))
+    memo = elan.MemoLayouts(persistencia=cache)
+    trilhas = _TrilhasFalsas(["DISF", "DOC", "INF"])
+
+    assert elan.valida_id_trilhas(trilhas, regras, memo=memo)[0]
+    sucesso, erros, _ = elan.valida_id_trilhas(trilhas, alteradas, memo=memo)
+
+    assert not sucesso and erros
+    assert (memo.acertos, memo.falhas) == (0, 2)
+    assert elan.valida_id_trilhas(trilhas, alteradas, memo=elan.MemoLayouts(persistencia=cache)) == (sucesso, erros, None)
+
+
+def test_valida_id_trilhas_sem_memo_por_padrao():
+    antes = (len(elan.MEMO_LAYOUTS), elan.MEMO_LAYOUTS.acertos, elan.MEMO_LAYOUTS.falhas)
+
+    elan.valida_id_trilhas(_TrilhasFalsas(["DISF", "DOC", "XYZ"]), elan.RuleSet(elan.REGRAS_ENTREVISTA))
+
+    assert (len(elan.MEMO_LAYOUTS), elan.MEMO_LAYOUTS.acertos, elan.MEMO_LAYOUTS.falhas) == antes
+
+
+@pytest.mark.parametrize("orcamento", [None, elan.OrcamentoErros(max_erros=1)])
+def test_valida_arquivo_usa_o_memo_indicado(orcamento):
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    memo = elan.MemoLayouts()
+    conteudo = gera_eaf(3, 20)
+
+    for _ in range(2):
+        lote.valida_arquivo(conteudo, regras, "arquivo.eaf", orcamento=orcamento, memo_layouts=memo)
+
+    assert memo.acertos >= 1 and memo.falhas == 1
+
+
+def test_layouts_expulsos_pelo_acesso_mais_antigo(tmp_path, relogio):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"), max_layouts=2, intervalo_expulsao=1)
+    try:
+        cache.guarda_layout("a", {"sucesso": True})
+        cache.guarda_layout("b", {"sucesso": True})
+        assert cache.obtem_layout("a") is not None
+        cache.guarda_layout("c", {"sucesso": False})
+
+        assert cache.obtem_layout("b") is None
+        assert cache.obtem_layout("a") == {"sucesso": True} and cache.obtem_layout("c") == {"sucesso": False}
+        assert cache.estatisticas()["layouts"] == 2
+    finally:
+        cache.fecha()
+
+
+def test_layouts_expiram_com_a_idade_maxima(tmp_path, relogio):
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"), max_idade=10)
+    try:
+        cache.guarda_layout("a", {"sucesso": True})
+        assert cache.obtem_layout("a") is not None
+        relogio.agora += 10
+
+        assert cache.obtem_layout("a") is None
+    finally:
+        cache.fecha()
+
+
+def test_tabela_de_layouts_antiga_e_recriada(tmp_path):
+    caminho = str(tmp_path / "cache.sqlite")
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("CREATE TABLE layouts (chave TEXT PRIMARY KEY, resultado TEXT NOT NULL)")
+    conexao.execute("INSERT INTO layouts VALUES ('a', '{}')")
+    conexao.commit()
+    conexao.close()
+
+    cache = CacheValidacao(caminho)
+    try:
+        assert cache.obtem_layout("a") is None
+        cache.guarda_layout("a", {"sucesso": True})
+        assert cache.obtem_layout("a") == {"sucesso": True}
+    finally:
+        cache.fecha()
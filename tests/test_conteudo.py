@@ -0,0 +1,102 @@
+"""
+Testes diferenciais dos validadores de conteúdo por anotação contra a implementação anterior
+(expressões regulares aplicadas a cada anotação, como na versão original do validador).
+"""
+import random
+import re
+from typing import List, Tuple
+
+import pytest
+
+from cerberus.elan.validador import _valida_conteudo_disf, _valida_conteudo_inf_doc
+
+_PALAVRAS = [
+    "eu", "ele", "ela", "foi", "lá", "na", "casa", "da", "minha", "mãe", "ação", "você", "né",
+    "então", "aí", "tá", "porque", "é", "não", "sim", "criança", "avó", "pé", "café", "à",
+]
+_MARCAS = [
+    "(EST)", "(HES)", "((risos))", "((TOSSE))", "(est)", "(incompreensível)", "(?)", "( )",
+    "2", "1998", "x@", "-", "/", '"', "?", "!", ",", ".", ";", "...", "…", "ñ", "ü", "×", "÷", "٣",
+]
+
+CASOS_LIMITE = [
+    "", " ", "\t\n", " 　", "a", "A", "ç", "Ç", "à", "À", "á", "ú", "Á", "Ú", "ñ", "ü", "ß",
+    "(EST)", "(HES)", "(est)", "(hes)", "(eſt)", " (EST) ", "(EST)(HES)", "((", "))", "((RISOS))",
+    "((A B))", "((a))", "(( x\n))", "(())", "((1))", "()", "( )", "(?)", "( ? )", "(incompreensível)",
+    "0", "9", "٣", "²", "½", "Ⅻ", "1998", "x@", "@@@", "a-b", "a/b", '"a"', "a?", "a!", "a,b", "a.b",
+    "…", "—", "–", " ", "​", "😀", "\x00", "﻿",
+]
+
+
+def _valida_conteudo_disf_referencia(valor: str) -> List[Tuple[str, str]]:
+    erros = []
+    if valor == '(EST)' or valor == '(HES)':
+        return []
+    if re.fullmatch(r'\(\([A-Z\s]+\)\)', valor):
+        return []
+    if valor.upper() == '(EST)' or valor.upper() == '(HES)':
+        erros.append(("ERRO_DISF", ""))
+    elif re.fullmatch(r'\(\(.*\)\)', valor):
+        erros.append(("ERRO_DISF", ""))
+    else:
+        erros.append(("DISF_INVALIDA", ""))
+    return erros
+
+
+def _valida_conteudo_inf_doc_referencia(valor: str) -> List[Tuple[str, str]]:
+    erros = []
+    if re.search(r'\d', valor):
+        erros.append(("DIGITO_PRESENTE", ""))
+    if '(EST)' in valor or '(HES)' in valor or '((' in valor:
+        erros.append(("DISF_PRESENTE", ""))
+    caracteres_invalidos = re.findall(r'[^a-zA-Zá-úÁ-Ú\s\(\)\?\/\-"çÇàÀ-]', valor)
+    if caracteres_invalidos:
+        erros.append(("CARACTERE_INVALIDO", "".join(sorted(set(caracteres_invalidos)))))
+    return erros
+
+
+def _gera_anotacoes(quantidade: int, semente: int) -> List[str]:
+    gerador = random.Random(semente)
+    anotacoes = []
+    for _ in range(quantidade):
+        if gerador.random() < 0.05:
+            # Ruído: qualquer caractere do plano multilíngue básico (sem surrogates isolados)
+            anotacoes.append("".join(
+                chr(c) for c in (gerador.randint(0, 0xFFFF) for _ in range(gerador.randint(1, 12)))
+                if not 0xD800 <= c <= 0xDFFF
+            ))
+        else:
+            anotacoes.append(" ".join(
+                gerador.choice(_MARCAS) if gerador.random() < 0.05 else gerador.choice(_PALAVRAS)
+                for _ in range(gerador.randint(1, 30))
+            ))
+    return anotacoes
+
+
+@pytest.mark.parametrize("valor", CASOS_LIMITE)
+def test_inf_doc_casos_limite(valor):
+    assert _valida_conteudo_inf_doc(valor) == _valida_conteudo_inf_doc_referencia(valor)
+
+
+@pytest.mark.parametrize("valor", CASOS_LIMITE)
+def test_disf_casos_limite(valor):
+    assert _valida_conteudo_disf(valor) == _valida_conteudo_disf_referencia(valor)
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_inf_doc_anotacoes_geradas(semente):
+    divergencias = [
+        valor for valor in _gera_anotacoes(20_000, semente)
+        if _valida_conteudo_inf_doc(valor) != _valida_conteudo_inf_doc_referencia(valor)
+    ]
+    assert not divergencias
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_disf_anotacoes_geradas(semente):
+    anotacoes = _gera_anotacoes(5_000, semente) + [f"(({valor}))" for valor in _gera_anotacoes(5_000, semente + 100)]
+    divergencias = [
+        valor for valor in anotacoes
+        if _valida_conteudo_disf(valor) != _valida_conteudo_disf_referencia(valor)
+    ]
+    assert not divergencias
@@ -0,0 +1,136 @@
+"""
+Testes da revalidação incremental de conteúdo (cerberus.elan.valida_conteudo_incremental) contra
+a validação completa do mesmo arquivo.
+"""
+import json
+import random
+
+import pytest
+
+from cerberus import elan, lote
+from benchmarks.gerador import gera_eaf
+
+_INVALIDOS = {"digito": 0.1, "disf_mal_posicionada": 0.05, "caractere_invalido": 0.1, "disf_malformada": 0.1}
+
+
+def _transcricao():
+    _, transcricao = elan.le_eaf(gera_eaf(3, 200, _INVALIDOS, semente=3), "arquivo.eaf")
+    _, _, mapeamento = elan.valida_id_trilhas(transcricao, elan.RuleSet(elan.REGRAS_ENTREVISTA), memo=None)
+    return transcricao, mapeamento
+
+
+def _altera_trilha(transcricao, nome_trilha, altera):
+    """
+    Cópia da transcrição com a trilha substituída por 'altera(lista de (id, (inicio, fim, valor)))'.
+    """
+    anotacoes = list(zip(transcricao.get_annotation_ids_for_tier(nome_trilha),
+                         transcricao.get_annotation_data_for_tier(nome_trilha)))
+    anotacoes = altera(anotacoes)
+    nova = elan.Transcricao(transcricao.nome)
+    nova.trilhas = dict(transcricao.trilhas)
+    nova.trilhas[nome_trilha] = elan.AnotacoesTrilha.de_anotacoes(
+        [anotacao for _, anotacao in anotacoes], [id_anotacao for id_anotacao, _ in anotacoes]
+    )
+    return nova
+
+
+def _edita(anotacoes):
+    gerador = random.Random(1)
+    for posicao in gerador.sample(range(len(anotacoes)), 10):
+        id_anotacao, (inicio, fim, valor) = anotacoes[posicao]
+        anotacoes[posicao] = (id_anotacao, (inicio, fim, gerador.choice(["casa", "casa 2", "ca$a", "(EST)", valor + "!"])))
+    return anotacoes
+
+
+def _insere(anotacoes):
+    return anotacoes[:5] + [("novo1", (0, 10, "x1")), ("novo2", (10, 20, "ok"))] + anotacoes[5:] + [("novo3", (1, 2, "@"))]
+
+
+def _remove(anotacoes):
+    return anotacoes[::2]
+
+
+def _move(anotacoes):
+    # Mesmo ID e valor, outro tempo: os exemplos do relatório precisam trazer o tempo novo
+    return [(id_anotacao, (inicio + 7, fim + 7, valor)) for id_anotacao, (inicio, fim, valor) in anotacoes]
+
+
+def _compara_com_validacao_completa(transcricao, mapeamento, snapshot):
+    erros, novo_snapshot = elan.valida_conteudo_incremental_estruturado(transcricao, mapeamento, snapshot)
+    esperado = elan.valida_conteudo_estruturado(transcricao, mapeamento)
+    assert erros.para_dict() == esperado.para_dict()
+    assert elan.valida_conteudo_incremental(transcricao, mapeamento, snapshot)[:2] == elan.valida_conteudo_trilhas(transcricao, mapeamento)
+    return novo_snapshot
+
+
+@pytest.mark.parametrize("altera", [_edita, _insere, _remove, _move])
+def test_concorda_com_validacao_completa_depois_de_alteracoes(altera):
+    transcricao, mapeamento = _transcricao()
+    snapshot = _compara_com_validacao_completa(transcricao, mapeamento, None)
+
+    for nome_trilha in mapeamento:
+        alterada = _altera_trilha(transcricao, nome_trilha, altera)
+        novo_snapshot = _compara_com_validacao_completa(alterada, mapeamento, snapshot)
+        # As outras trilhas não são percorridas
+        assert novo_snapshot["estatisticas"]["trilhas_reaproveitadas"] == len(mapeamento) - 1
+        # E a versão seguinte parte do snapshot novo
+        _compara_com_validacao_completa(transcricao, mapeamento, novo_snapshot)
+
+
+def test_revalida_apenas_anotacoes_novas_ou_alteradas():
+    transcricao, mapeamento = _transcricao()
+    _, snapshot = elan.valida_conteudo_incremental_estruturado(transcricao, mapeamento)
+    nome_trilha = next(iter(mapeamento))
+
+    alterada = _altera_trilha(transcricao, nome_trilha, _insere)
+    _, novo_snapshot = elan.valida_conteudo_incremental_estruturado(alterada, mapeamento, snapshot)
+
+    total = sum(len(transcricao.get_annotation_data_for_tier(nome)) for nome in mapeamento)
+    assert novo_snapshot["estatisticas"] == {"revalidadas": 3, "reaproveitadas": total, "trilhas_reaproveitadas": 2}
+
+    _, repetido = elan.valida_conteudo_incremental_estruturado(alterada, mapeamento, novo_snapshot)
+    assert repetido["estatisticas"]["revalidadas"] == 0
+
+
+def test_snapshot_sem_colunas_revalida_trilhas_alteradas_por_inteiro():
+    transcricao, mapeamento = _transcricao()
+    _, snapshot = elan.valida_conteudo_incremental_estruturado(transcricao, mapeamento)
+    # Só a parte serializável em JSON, como se o snapshot tivesse sido gravado
+    gravado = json.loads(json.dumps({chave: valor for chave, valor in snapshot.items() if chave != "colunas"}))
+    nome_trilha = next(iter(mapeamento))
+
+    alterada = _altera_trilha(transcricao, nome_trilha, _edita)
+    novo_snapshot = _compara_com_validacao_completa(alterada, mapeamento, gravado)
+
+    assert novo_snapshot["estatisticas"]["revalidadas"] == len(alterada.get_annotation_data_for_tier(nome_trilha))
+    assert novo_snapshot["estatisticas"]["trilhas_reaproveitadas"] == len(mapeamento) - 1
+
+
+def test_mudanca_de_tipo_ou_de_versao_invalida_o_snapshot():
+    transcricao, mapeamento = _transcricao()
+    _, snapshot = elan.valida_conteudo_incremental_estruturado(transcricao, mapeamento)
+
+    outro_mapeamento = {nome: "DISF" for nome in mapeamento}
+    novo_snapshot = _compara_com_validacao_completa(transcricao, outro_mapeamento, snapshot)
+    assert novo_snapshot["estatisticas"]["trilhas_reaproveitadas"] == sum(
+        1 for nome, tipo in mapeamento.items() if tipo == "DISF"
+    )
+
+    antigo = dict(snapshot, versao=elan.VERSAO_SNAPSHOT - 1)
+    assert _compara_com_validacao_completa(transcricao, mapeamento, antigo)["estatisticas"]["trilhas_reaproveitadas"] == 0
+
+
+def test_valida_arquivo_incremental_concorda_com_validacao_completa():
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    conteudo = gera_eaf(3, 200, _INVALIDOS, semente=5)
+    alterado = conteudo.replace(b"<ANNOTATION_VALUE>", b"<ANNOTATION_VALUE>1", 3)
+
+    primeiro = lote.valida_arquivo(conteudo, regras, "arquivo.eaf", incremental=True)
+    segundo = lote.valida_arquivo(alterado, regras, "arquivo.eaf", incremental=True, snapshot=primeiro["snapshot"])
+    esperado = lote.valida_arquivo(alterado, regras, "arquivo.eaf")
+
+    snapshot = segundo.pop("snapshot")
+    assert snapshot["estatisticas"]["revalidadas"] == 3
+    segundo.pop("duracao")
+    esperado.pop("duracao")
+    assert segundo == esperado
@@ -0,0 +1,105 @@
+"""
+Testes da instrumentação (cerberus.instrumentacao): formatos de saída e destinos.
+"""
+import json
+import logging
+
+import pytest
+
+from cerberus.instrumentacao import DestinoArquivo, DestinoLogging, Instrumentacao
+
+
+def _instrumentacao() -> Instrumentacao:
+    instrumentacao = Instrumentacao()
+    instrumentacao.adiciona_tempo("le_eaf", 0.25)
+    instrumentacao.adiciona_tempo('conteudo.A"B', 0.001)
+    instrumentacao.conta("emparelhamento.testes", 9)
+    instrumentacao.conta("erros.DIGITO", 2)
+    instrumentacao.conta("erros.DIGITO")
+    instrumentacao.conta("anotacoes.INF-1", 40)
+    instrumentacao.conta("validacoes")
+    return instrumentacao
+
+
+def test_para_json_e_mescla_de_dicionario():
+    instrumentacao = _instrumentacao()
+
+    dados = json.loads(instrumentacao.para_json())
+    assert dados == instrumentacao.para_dict()
+    assert dados["contadores"]["erros.DIGITO"] == 3
+
+    # Um processo recebe o 'para_dict' de outro e soma
+    soma = _instrumentacao()
+    soma.mescla(dados)
+    soma.mescla(Instrumentacao())
+    assert soma.tempos["le_eaf"] == pytest.approx(0.5)
+    assert soma.contadores["anotacoes.INF-1"] == 80
+
+
+def test_para_prometheus():
+    linhas = _instrumentacao().para_prometheus().splitlines()
+
+    assert linhas == [
+        "# TYPE cerberus_etapa_segundos_total counter",
+        'cerberus_etapa_segundos_total{etapa="conteudo.A\\"B"} 0.001000000',
+        'cerberus_etapa_segundos_total{etapa="le_eaf"} 0.250000000',
+        "# TYPE cerberus_anotacoes_total counter",
+        'cerberus_anotacoes_total{nome="INF-1"} 40',
+        "# TYPE cerberus_emparelhamento_total counter",
+        'cerberus_emparelhamento_total{nome="testes"} 9',
+        "# TYPE cerberus_erros_total counter",
+        'cerberus_erros_total{nome="DIGITO"} 3',
+        "# TYPE cerberus_validacoes_total counter",
+        "cerberus_validacoes_total 1",
+    ]
+    assert Instrumentacao().para_prometheus(prefixo="x") == "# TYPE x_etapa_segundos_total counter\n"
+
+
+def test_para_texto():
+    assert _instrumentacao().para_texto() == (
+        'conteudo.A"B: 1.00 ms\n'
+        "le_eaf: 250.00 ms\n"
+        "anotacoes.INF-1: 40\n"
+        "emparelhamento.testes: 9\n"
+        "erros.DIGITO: 3\n"
+        "validacoes: 1\n"
+    )
+
+
+def test_etapa_acumula_mesmo_com_excecao():
+    instrumentacao = Instrumentacao()
+
+    with pytest.raises(ValueError):
+        with instrumentacao.etapa("valida"):
+            raise ValueError
+    with instrumentacao.etapa("valida"):
+        pass
+
+    assert list(instrumentacao.tempos) == ["valida"] and instrumentacao.tempos["valida"] >= 0
+
+
+@pytest.mark.parametrize("formato, le", [("json", json.loads), ("prometheus", str)])
+def test_destino_arquivo(tmp_path, formato, le):
+    caminho = tmp_path / "metricas"
+    instrumentacao = _instrumentacao()
+    instrumentacao.destinos.append(DestinoArquivo(str(caminho), formato))
+
+    instrumentacao.publica()
+
+    esperado = instrumentacao.para_dict() if formato == "json" else instrumentacao.para_prometheus()
+    assert le(caminho.read_text(encoding="utf-8")) == esperado
+
+
+def test_destino_arquivo_recusa_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="csv"):
+        DestinoArquivo(str(tmp_path / "metricas"), "csv")
+
+
+def test_destino_logging(caplog):
+    instrumentacao = Instrumentacao(DestinoLogging(nivel=logging.WARNING))
+
+    instrumentacao.conta("erros.DIGITO")
+    with caplog.at_level(logging.WARNING, logger="cerberus.instrumentacao"):
+        instrumentacao.publica()
+
+    assert [json.loads(registro.getMessage()) for registro in caplog.records] == [instrumentacao.para_dict()]
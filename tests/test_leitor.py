@@ -0,0 +1,165 @@
+"""
+Testes do leitor nativo (cerberus.elan.le_eaf) contra a leitura do pympi.
+"""
+import io
+
+import pytest
+
+from cerberus import elan
+from benchmarks.gerador import gera_eaf
+
+pympi = pytest.importorskip("pympi")
+
+# Trilha de referência antes da trilha pai, cadeia de referências (NOTAS -> TRADUCAO -> INF),
+# TIME_SLOT sem TIME_VALUE, entidades e texto vazio nos valores e uma trilha sem anotações
+_EAF_MANUAL = """<?xml version="1.0" encoding="UTF-8"?>
+<ANNOTATION_DOCUMENT AUTHOR="" DATE="2024-01-01T00:00:00-03:00" FORMAT="3.0" VERSION="3.0"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="http://www.mpi.nl/tools/elan/EAFv3.0.xsd">
+    <HEADER MEDIA_FILE="" TIME_UNITS="milliseconds"/>
+    <TIME_ORDER>
+        <TIME_SLOT TIME_SLOT_ID="ts1" TIME_VALUE="0"/>
+        <TIME_SLOT TIME_SLOT_ID="ts2"/>
+        <TIME_SLOT TIME_SLOT_ID="ts3" TIME_VALUE="1500"/>
+        <TIME_SLOT TIME_SLOT_ID="ts4" TIME_VALUE="2500"/>
+    </TIME_ORDER>
+    <TIER LINGUISTIC_TYPE_REF="referencia" PARENT_REF="INF" TIER_ID="TRADUCAO">
+        <ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a3" ANNOTATION_REF="a1"><ANNOTATION_VALUE>i &amp; she</ANNOTATION_VALUE></REF_ANNOTATION></ANNOTATION>
+        <ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a4" ANNOTATION_REF="a2"><ANNOTATION_VALUE>home</ANNOTATION_VALUE></REF_ANNOTATION></ANNOTATION>
+    </TIER>
+    <TIER LINGUISTIC_TYPE_REF="padrao" TIER_ID="INF">
+        <ANNOTATION><ALIGNABLE_ANNOTATION ANNOTATION_ID="a1" TIME_SLOT_REF1="ts1" TIME_SLOT_REF2="ts2"><ANNOTATION_VALUE>eu &amp; ela &lt;fui&gt; lá</ANNOTATION_VALUE></ALIGNABLE_ANNOTATION></ANNOTATION>
+        <ANNOTATION><ALIGNABLE_ANNOTATION ANNOTATION_ID="a2" TIME_SLOT_REF1="ts3" TIME_SLOT_REF2="ts4"><ANNOTATION_VALUE></ANNOTATION_VALUE></ALIGNABLE_ANNOTATION></ANNOTATION>
+    </TIER>
+    <TIER LINGUISTIC_TYPE_REF="padrao" TIER_ID="VAZIA"/>
+    <TIER LINGUISTIC_TYPE_REF="referencia" PARENT_REF="TRADUCAO" TIER_ID="NOTAS">
+        <ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a5" ANNOTATION_REF="a4"><ANNOTATION_VALUE>nota</ANNOTATION_VALUE></REF_ANNOTATION></ANNOTATION>
+    </TIER>
+    <LINGUISTIC_TYPE GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="padrao" TIME_ALIGNABLE="true"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="referencia" TIME_ALIGNABLE="false"/>
+    <CONSTRAINT DESCRIPTION="1-1 association with a parent annotation" STEREOTYPE="Symbolic_Association"/>
+</ANNOTATION_DOCUMENT>
+""".encode("utf-8")
+
+
+def _compara_com_pympi(conteudo: bytes) -> None:
+    _, eaf = elan.abre_eaf(conteudo, "arquivo.eaf")
+    _, transcricao = elan.le_eaf(conteudo, "arquivo.eaf")
+
+    assert list(transcricao.get_tier_names()) == list(eaf.get_tier_names())
+    for nome_trilha in eaf.get_tier_names():
+        esperado = [tuple(anotacao[:3]) for anotacao in eaf.get_annotation_data_for_tier(nome_trilha)]
+        assert list(transcricao.get_annotation_data_for_tier(nome_trilha)) == esperado, nome_trilha
+        assert transcricao.get_annotation_ids_for_tier(nome_trilha) == elan.ids_anotacoes(eaf, nome_trilha, len(esperado))
+
+
+@pytest.mark.parametrize("padrao_nomes", ["entrevista", "minusculas", "aleatorio"])
+def test_concorda_com_pympi_em_arquivos_sinteticos(padrao_nomes):
+    invalidos = {"digito": 0.05, "disf_mal_posicionada": 0.05, "caractere_invalido": 0.1, "disf_malformada": 0.05}
+    _compara_com_pympi(gera_eaf(5, 300, invalidos, padrao_nomes=padrao_nomes, semente=7))
+
+
+def test_concorda_com_pympi_em_referencias_tempos_ausentes_e_entidades():
+    _compara_com_pympi(_EAF_MANUAL)
+
+    _, transcricao = elan.le_eaf(_EAF_MANUAL, "manual.eaf")
+    assert list(transcricao.get_annotation_data_for_tier("INF")) == [(0, None, "eu & ela <fui> lá"), (1500, 2500, "")]
+    assert list(transcricao.get_annotation_data_for_tier("NOTAS")) == [(1500, 2500, "nota")]
+    assert list(transcricao.get_annotation_data_for_tier("VAZIA")) == []
+
+
+def test_aceita_caminho_objeto_de_arquivo_e_bytes(tmp_path):
+    caminho = tmp_path / "manual.eaf"
+    caminho.write_bytes(_EAF_MANUAL)
+
+    leituras = [
+        elan.le_eaf(str(caminho)),
+        elan.le_eaf(caminho),
+        elan.le_eaf(io.BytesIO(_EAF_MANUAL), "manual.eaf"),
+        elan.le_eaf(_EAF_MANUAL, "manual.eaf"),
+    ]
+
+    for nome, transcricao in leituras:
+        assert nome == "manual.eaf" and transcricao.nome == "manual.eaf"
+        assert list(transcricao.get_annotation_data_for_tier("TRADUCAO")) == [(0, None, "i & she"), (1500, 2500, "home")]
+
+
+def test_trilhas_nao_pedidas_nao_sao_carregadas():
+    _, transcricao = elan.le_eaf(_EAF_MANUAL, "manual.eaf", trilhas=["INF"])
+
+    assert list(transcricao.get_tier_names()) == ["TRADUCAO", "INF", "VAZIA", "NOTAS"]
+    assert len(transcricao.get_annotation_data_for_tier("INF")) == 2
+    # As referências de trilhas pedidas continuam resolvidas mesmo com a trilha pai fora da seleção
+    _, so_notas = elan.le_eaf(_EAF_MANUAL, "manual.eaf", trilhas=["NOTAS"])
+    assert list(so_notas.get_annotation_data_for_tier("NOTAS")) == [(1500, 2500, "nota")]
+    for nome_trilha in ("TRADUCAO", "VAZIA", "NOTAS"):
+        with pytest.raises(elan.TrilhaNaoCarregada):
+            transcricao.get_annotation_data_for_tier(nome_trilha)
+        with pytest.raises(KeyError):
+            transcricao.get_annotation_ids_for_tier(nome_trilha)
+
+
+def test_validacao_de_trilha_nao_carregada_relata_erro_de_leitura():
+    _, transcricao = elan.le_eaf(_EAF_MANUAL, "manual.eaf", trilhas=["INF"])
+
+    erros = elan.valida_conteudo_estruturado(transcricao, {"INF": "INF", "TRADUCAO": "INF"})
+
+    assert [erro.para_dict() for erro in erros.globais] == [{"codigo": "LEITURA_TRILHA", "trilha": "TRADUCAO", "tipo": None}]
+
+
+def test_erro_de_xml_vira_runtime_error():
+    with pytest.raises(RuntimeError, match="quebrado.eaf"):
+        elan.le_eaf(_EAF_MANUAL[:-40], "quebrado.eaf")
+
+
+@pytest.mark.parametrize("conteudo", [
+    _EAF_MANUAL,
+    gera_eaf(4, 50, padrao_nomes="aleatorio"),
+    _EAF_MANUAL.replace(b'TIER_ID="VAZIA"', b"TIER_ID = 'V&amp;&#65;\n'"),
+])
+def test_nomes_trilhas_concorda_com_le_eaf(conteudo):
+    _, transcricao = elan.le_eaf(conteudo, "arquivo.eaf")
+
+    assert elan.nomes_trilhas(conteudo) == list(transcricao.get_tier_names())
+
+
+@pytest.mark.parametrize("conteudo", [
+    _EAF_MANUAL.replace(b"<TIME_ORDER>", b"<!-- <TIER TIER_ID='X'/> --><TIME_ORDER>"),
+    _EAF_MANUAL.replace(b"<TIME_ORDER>", b"<?marca <TIER TIER_ID='X'/> ?><TIME_ORDER>"),
+    _EAF_MANUAL.replace(b'TIER_ID="VAZIA"', b'TIER_ID="&nbsp;"'),
+    _EAF_MANUAL.decode("utf-8").replace('encoding="UTF-8"', 'encoding="UTF-16"').encode("utf-16"),
+])
+def test_nomes_trilhas_recusa_o_que_a_busca_direta_nao_cobre(conteudo):
+    assert elan.nomes_trilhas(conteudo) is None
+
+
+@pytest.mark.parametrize("conteudo", [
+    _EAF_MANUAL,
+    # TIME_SLOT fora da forma gravada pelo ELAN: os tempos vêm do parser
+    _EAF_MANUAL.replace(b'<TIME_SLOT TIME_SLOT_ID="ts1" TIME_VALUE="0"/>', b"<TIME_SLOT TIME_VALUE='0' TIME_SLOT_ID='ts1' />"),
+])
+def test_leitura_em_fluxo_ate_o_fim_concorda_com_le_eaf(conteudo):
+    leitura = elan.LeituraEmFluxo(conteudo, ["INF", "NOTAS"], "manual.eaf")
+
+    lidas = list(leitura.anotacoes())
+
+    assert lidas == [("INF", "a1", "eu & ela <fui> lá"), ("INF", "a2", ""), ("NOTAS", "a5", "nota")]
+    assert leitura.tempos("a5") == (1500, 2500) and leitura.tempos("a1") == (0, None)
+    _, esperada = elan.le_eaf(conteudo, "manual.eaf", trilhas=["INF", "NOTAS"])
+    transcricao = leitura.transcricao()
+    assert list(transcricao.get_tier_names()) == list(esperada.get_tier_names())
+    for nome_trilha in ("INF", "NOTAS"):
+        assert list(transcricao.get_annotation_data_for_tier(nome_trilha)) == list(esperada.get_annotation_data_for_tier(nome_trilha))
+        assert transcricao.get_annotation_ids_for_tier(nome_trilha) == esperada.get_annotation_ids_for_tier(nome_trilha)
+    with pytest.raises(elan.TrilhaNaoCarregada):
+        transcricao.get_annotation_data_for_tier("TRADUCAO")
+
+
+def test_leitura_em_fluxo_interrompida():
+    leitura = elan.LeituraEmFluxo(_EAF_MANUAL, ["TRADUCAO"], "manual.eaf")
+
+    # A trilha pai ainda não foi lida quando a primeira referência aparece
+    assert next(leitura.anotacoes()) == ("TRADUCAO", "a3", "i & she")
+    with pytest.raises(KeyError):
+        leitura.tempos("a3")
+    with pytest.raises(RuntimeError):
+        leitura.transcricao()
@@ -0,0 +1,107 @@
+"""
+Testes da validação completa de um arquivo (cerberus.lote.valida_arquivo).
+"""
+import pytest
+
+from cerberus import elan, lote
+from benchmarks.gerador import gera_eaf
+
+REGRAS = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_arquivo_sintetico_sem_defeitos_e_valido(semente):
+    resultado = lote.valida_arquivo(gera_eaf(3, 300, semente=semente), REGRAS, "limpo.eaf")
+
+    assert resultado["erro"] is None
+    assert resultado["tempo_erros"] == []
+    assert resultado["valido"] is True
+
+
+def test_triagem_sem_etapa_temporal_nao_a_marca_como_falha():
+    conteudo = gera_eaf(3, 300, {"digito": 0.5}, semente=1)
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "defeituoso.eaf", orcamento=elan.OrcamentoErros(max_erros=1))
+
+    assert resultado["truncado"] is True
+    assert resultado["conteudo_valido"] is False
+    assert resultado["tempo_valido"] is None
+    assert resultado["tempo_erros"] == []
+    assert resultado["valido"] is False
+
+
+def test_triagem_nao_usa_resultado_completo_do_cache(tmp_path):
+    from cerberus.cache import CacheValidacao
+
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"))
+    conteudo = gera_eaf(3, 300, {"digito": 0.5}, semente=1)
+    completo = lote.valida_arquivo(conteudo, REGRAS, "defeituoso.eaf", cache=cache)
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "defeituoso.eaf", cache=cache,
+                                    orcamento=elan.OrcamentoErros(max_por_grupo=1))
+
+    assert resultado["cache"] is False
+    assert resultado["truncado"] is True
+    assert all(grupo["total"] <= 1 for grupo in resultado["conteudo_detalhes"]["grupos"])
+    assert completo["conteudo_detalhes"] != resultado["conteudo_detalhes"]
+    cache.fecha()
+
+
+def _sem_duracao(resultado):
+    return {chave: valor for chave, valor in resultado.items() if chave != "duracao"}
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_triagem_para_a_leitura_no_primeiro_erro(semente):
+    conteudo = gera_eaf(3, 2000, {"digito": 0.05, "caractere_invalido": 0.05}, semente=semente)
+    completo = lote.valida_arquivo(conteudo, REGRAS, "defeituoso.eaf")
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "defeituoso.eaf", orcamento=elan.OrcamentoErros(max_erros=1),
+                                    instrumenta=True)
+
+    assert resultado["truncado"] is True and resultado["valido"] is False
+    assert resultado["instrumentacao"]["contadores"]["triagem.leituras_interrompidas"] == 1
+    assert 0 < resultado["anotacoes"] < completo["anotacoes"]
+    # O primeiro erro do arquivo é o primeiro exemplo do seu grupo na validação completa, com os mesmos tempos
+    [grupo] = resultado["conteudo_detalhes"]["grupos"]
+    assert grupo["exemplos"][0] in [g["exemplos"][0] for g in completo["conteudo_detalhes"]["grupos"]]
+
+
+@pytest.mark.parametrize("invalidos", [None, {"digito": 0.002}])
+def test_triagem_lida_ate_o_fim_da_o_mesmo_resultado_da_validacao_normal(invalidos):
+    conteudo = gera_eaf(3, 500, invalidos, semente=3)
+    orcamento = elan.OrcamentoErros(max_erros=50)
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "arquivo.eaf", orcamento=orcamento)
+
+    assert resultado["truncado"] is False
+    assert _sem_duracao(resultado) == _sem_duracao(lote.valida_arquivo(conteudo, REGRAS, "arquivo.eaf"))
+
+
+def test_triagem_com_ids_invalidos_nao_le_as_anotacoes(tmp_path):
+    from cerberus.cache import CacheValidacao
+
+    cache = CacheValidacao(str(tmp_path / "cache.sqlite"))
+    # Anotações quebradas depois das marcações TIER: só uma leitura completa as encontraria
+    conteudo = gera_eaf(3, 50, padrao_nomes="minusculas").replace(b"</ANNOTATION_VALUE>", b"</VALOR>", 1)
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "minusculas.eaf", cache=cache, orcamento=elan.OrcamentoErros(max_erros=5))
+
+    assert resultado["erro"] is None
+    assert resultado["id_valido"] is False and resultado["id_erros"]
+    assert resultado["valido"] is False
+    # Sem a leitura completa o resultado não vai para o cache
+    assert lote.valida_arquivo(conteudo, REGRAS, "minusculas.eaf", cache=cache)["erro"] is not None
+    cache.fecha()
+
+
+def test_triagem_de_arquivo_fora_do_alcance_da_leitura_em_fluxo():
+    # Comentários impedem a busca direta das marcações TIER: o arquivo é lido normalmente
+    conteudo = gera_eaf(3, 300, {"digito": 0.5}, semente=1).replace(b"<TIME_ORDER>", b"<!-- tempos --><TIME_ORDER>", 1)
+
+    resultado = lote.valida_arquivo(conteudo, REGRAS, "comentado.eaf", orcamento=elan.OrcamentoErros(max_erros=1),
+                                    instrumenta=True)
+
+    assert resultado["truncado"] is True and resultado["valido"] is False
+    assert "triagem.leituras_interrompidas" not in resultado["instrumentacao"]["contadores"]
+    assert resultado["anotacoes"] == lote.valida_arquivo(conteudo, REGRAS, "comentado.eaf")["anotacoes"]
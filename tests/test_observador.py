@@ -0,0 +1,132 @@
+"""
+Testes do modo observação (cerberus.observador.Observador).
+"""
+import concurrent.futures
+import logging
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cerberus import elan, lote
+from cerberus.observador import Observador
+from benchmarks.gerador import gera_eaf
+
+
+class _EventoContado(threading.Event):
+    """
+    Evento que registra as esperas e se sinaliza sozinho depois de algumas voltas do laço.
+    """
+
+    def __init__(self, voltas: int):
+        super().__init__()
+        self.voltas = voltas
+        self.esperas = []
+
+    def wait(self, timeout=None):
+        self.esperas.append(timeout)
+        if len(self.esperas) >= self.voltas:
+            self.set()
+        return super().wait(timeout)
+
+
+@pytest.mark.parametrize("atraso, intervalo", [(0, 2.0), (1.0, 0), (0, 0)])
+def test_executa_nao_gira_sem_espera_com_atraso_ou_intervalo_zero(tmp_path, atraso, intervalo):
+    observador = Observador([str(tmp_path)], elan.RuleSet(elan.REGRAS_ENTREVISTA),
+                            caminho_indice=str(tmp_path / "indice.sqlite"), atraso=atraso, intervalo=intervalo,
+                            usa_eventos=False)
+    parar = _EventoContado(voltas=3)
+    try:
+        observador.executa(parar)
+    finally:
+        observador.fecha()
+
+    assert parar.esperas and all(espera > 0 for espera in parar.esperas)
+
+
+def test_revalidacao_usa_o_snapshot_do_arquivo(tmp_path):
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    caminho = tmp_path / "arquivo.eaf"
+    conteudo = gera_eaf(3, 100, {"digito": 0.1}, semente=2)
+    caminho.write_bytes(conteudo)
+    observador = Observador([str(tmp_path)], regras, caminho_indice=str(tmp_path / "indice.sqlite"),
+                            num_processos=1, atraso=0, usa_eventos=False)
+    try:
+        observador.notifica(str(caminho))
+        assert observador.processa_pendentes(espera=None) == 1
+        assert observador._snapshots[str(caminho)]["estatisticas"]["trilhas_reaproveitadas"] == 0
+
+        alterado = conteudo.replace(b"<ANNOTATION_VALUE>", b"<ANNOTATION_VALUE>1", 1)
+        caminho.write_bytes(alterado)
+        observador.notifica(str(caminho))
+        assert observador.processa_pendentes(espera=None) == 1
+
+        assert observador._snapshots[str(caminho)]["estatisticas"]["revalidadas"] == 1
+        guardado = next(observador.indice.resultados([str(tmp_path)]))
+        esperado = lote.valida_arquivo(alterado, regras, str(caminho))
+        assert "snapshot" not in guardado
+        assert {k: v for k, v in guardado.items() if k != "duracao"} == {k: v for k, v in esperado.items() if k != "duracao"}
+    finally:
+        observador.fecha()
+
+
+def _observador(tmp_path, **opcoes):
+    return Observador([str(tmp_path)], elan.RuleSet(elan.REGRAS_ENTREVISTA), caminho_indice=str(tmp_path / "indice.sqlite"),
+                      num_processos=1, atraso=0, usa_eventos=False, **opcoes)
+
+
+def test_processa_pendentes_nao_espera_as_validacoes(tmp_path):
+    caminho = tmp_path / "arquivo.eaf"
+    caminho.write_bytes(gera_eaf(3, 100))
+    validados = []
+    observador = _observador(tmp_path, ao_validar=validados.append)
+    try:
+        observador.notifica(str(caminho))
+        observador.processa_pendentes()
+        # Uma mudança durante a validação fica na fila até o resultado ser recolhido
+        observador.notifica(str(caminho))
+        assert observador.pendentes == 2 and not validados
+
+        assert observador.processa_pendentes(espera=None) == 1
+        assert len(validados) == 1 and observador.pendentes == 1
+        # O conteúdo não mudou: a segunda notificação não gera outra validação
+        assert observador.processa_pendentes(espera=None) == 0
+        assert observador.pendentes == 0 and observador.validacoes == 1
+    finally:
+        observador.fecha()
+
+
+class _PoolFalso:
+    def __init__(self):
+        self.encerramentos = []
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.encerramentos.append((wait, cancel_futures))
+
+
+def test_pool_quebrado_e_encerrado_sem_espera(tmp_path):
+    observador = _observador(tmp_path)
+    pool = observador._pool = _PoolFalso()
+    tarefas = [concurrent.futures.Future() for _ in range(2)]
+    for numero, tarefa in enumerate(tarefas):
+        tarefa.set_exception(BrokenProcessPool())
+        observador._em_andamento[tarefa] = (str(tmp_path / f"{numero}.eaf"), (1, 1, "x", "y"), pool)
+    try:
+        assert observador.processa_pendentes() == 2
+        assert observador._pool is None and pool.encerramentos == [(False, True)]
+        assert observador.resumo()["com_erro"] == 2
+    finally:
+        observador.fecha()
+
+
+def test_falha_de_leitura_vai_para_o_log(tmp_path, caplog):
+    (tmp_path / "pasta.eaf").mkdir()
+    observador = _observador(tmp_path)
+    try:
+        observador.notifica(str(tmp_path / "pasta.eaf"))
+        with caplog.at_level(logging.WARNING, logger="cerberus.observador"):
+            assert observador.processa_pendentes() == 0
+    finally:
+        observador.fecha()
+
+    assert "Não foi possível ler" in caplog.text
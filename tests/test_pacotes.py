@@ -0,0 +1,45 @@
+"""
+Testes da leitura de pacotes sem extração (cerberus.pacotes).
+"""
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from cerberus import pacotes
+from benchmarks.gerador import gera_eaf
+
+MEMBROS = {"a.eaf": gera_eaf(3, 5, semente=1), "sub/b.eaf": gera_eaf(3, 5, semente=2), "leia-me.txt": b"x"}
+
+
+def _tar(modo: str) -> bytes:
+    destino = io.BytesIO()
+    with tarfile.open(fileobj=destino, mode=modo) as pacote:
+        for nome, conteudo in MEMBROS.items():
+            info = tarfile.TarInfo(nome)
+            info.size = len(conteudo)
+            pacote.addfile(info, io.BytesIO(conteudo))
+    return destino.getvalue()
+
+
+def _zip() -> bytes:
+    destino = io.BytesIO()
+    with zipfile.ZipFile(destino, "w") as pacote:
+        for nome, conteudo in MEMBROS.items():
+            pacote.writestr(nome, conteudo)
+    return destino.getvalue()
+
+
+@pytest.mark.parametrize("conteudo", [_zip(), _tar("w"), _tar("w:gz")], ids=["zip", "tar", "tar.gz"])
+def test_objeto_sem_nome_e_deduzido_pelo_conteudo(conteudo):
+    membros = dict(pacotes.le_membros(io.BytesIO(conteudo), "envio"))
+
+    assert membros == {"envio/a.eaf": MEMBROS["a.eaf"], "envio/sub/b.eaf": MEMBROS["sub/b.eaf"]}
+
+
+def test_objeto_sem_nome_lido_a_partir_da_posicao_atual():
+    fonte = io.BytesIO(b"cabecalho" + _tar("w"))
+    fonte.seek(len(b"cabecalho"))
+
+    assert [nome for nome, _ in pacotes.le_membros(fonte, "envio")] == ["envio/a.eaf", "envio/sub/b.eaf"]
@@ -0,0 +1,95 @@
+"""
+Testes do conjunto de regras compilado (cerberus.elan.RuleSet).
+"""
+import copy
+import pickle
+
+import pytest
+
+from cerberus import elan
+
+
+def test_assinatura_igual_para_regras_equivalentes():
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    # Mesmo conteúdo em outra ordem de chaves e com os valores padrão explícitos
+    equivalente = elan.RuleSet({
+        "regras_trilhas": [dict(regra, mandatory=True) for regra in elan.REGRAS_ENTREVISTA["regras_trilhas"]],
+        "maiusculas": True,
+        "num_trilhas": 3,
+    })
+
+    assert regras.assinatura == equivalente.assinatura
+    assert regras == equivalente and hash(regras) == hash(equivalente)
+
+
+@pytest.mark.parametrize("alteracao", [
+    {"num_trilhas": 4},
+    {"maiusculas": False},
+    {"regras_trilhas": elan.REGRAS_ENTREVISTA["regras_trilhas"][:2]},
+    {"regras_trilhas": [dict(elan.REGRAS_ENTREVISTA["regras_trilhas"][0], mandatory=False)]
+                       + elan.REGRAS_ENTREVISTA["regras_trilhas"][1:]},
+    {"regras_trilhas": list(reversed(elan.REGRAS_ENTREVISTA["regras_trilhas"]))},
+])
+def test_assinatura_muda_com_as_regras(alteracao):
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+    alterada = elan.RuleSet(dict(elan.REGRAS_ENTREVISTA, **alteracao))
+
+    assert regras.assinatura != alterada.assinatura
+    assert regras != alterada
+
+
+def test_pickle_preserva_regras_e_assinatura():
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+    copia = pickle.loads(pickle.dumps(regras))
+
+    assert copia == regras and copia.assinatura == regras.assinatura
+    assert copia.para_dict() == regras.para_dict()
+    # As regras continuam compiladas (inclusive as expressões regulares)
+    assert [regra("JOSE") for regra in copia.regras_trilhas] == [regra("JOSE") for regra in regras.regras_trilhas]
+    assert copy.deepcopy(regras) == regras
+
+
+def test_ruleset_imutavel():
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+    with pytest.raises(AttributeError):
+        regras.maiusculas = False
+
+
+def test_de_reaproveita_a_compilacao_de_dicionarios_equivalentes():
+    regras = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+    assert elan.RuleSet.de(regras) is regras
+    assert elan.RuleSet.de(dict(elan.REGRAS_ENTREVISTA)) is elan.RuleSet.de(dict(elan.REGRAS_ENTREVISTA))
+    assert elan.RuleSet.de(dict(elan.REGRAS_ENTREVISTA)) == regras
+
+
+@pytest.mark.parametrize("num_trilhas, aceitas, recusadas", [
+    (3, [3], [2, 4]),
+    ("3", [3], [2, 4]),
+    (">1", [2, 5], [0, 1]),
+    (">=2", [2, 3], [1]),
+    ("<5", [0, 4], [5, 6]),
+    ("<=2", [2], [3]),
+    ("==2", [2], [1, 3]),
+])
+def test_contagem_de_trilhas(num_trilhas, aceitas, recusadas):
+    contagem = elan.RuleSet({"num_trilhas": num_trilhas}).contagem_trilhas
+
+    assert all(contagem(n) for n in aceitas)
+    assert not any(contagem(n) for n in recusadas)
+
+
+@pytest.mark.parametrize("regras", [
+    {"num_trilhas": "muitas"},
+    {"num_trilhas": True},
+    {"regras_trilhas": "DISF"},
+    {"regras_trilhas": [{"type": "parecido", "value": "DISF"}]},
+    {"regras_trilhas": [{"type": "exato", "value": 3}]},
+    {"regras_trilhas": [{"type": "exato", "value": "DISF", "content_type": "XYZ"}]},
+    {"regras_trilhas": [{"type": "regex", "value": "(["}]},
+])
+def test_regras_invalidas_sao_recusadas_na_compilacao(regras):
+    with pytest.raises(ValueError):
+        elan.RuleSet(regras)
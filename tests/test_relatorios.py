@@ -0,0 +1,127 @@
+"""
+Testes dos escritores de relatório (cerberus.relatorios) sobre resultados de lote.valida_arquivo.
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from cerberus import elan, lote, relatorios
+from benchmarks.gerador import gera_eaf
+
+REGRAS = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+_INVALIDOS = {"digito": 0.2, "caractere_invalido": 0.1}
+
+
+def _resultados():
+    return [
+        lote.valida_arquivo(gera_eaf(3, 30, semente=1), REGRAS, "valido.eaf"),
+        lote.valida_arquivo(gera_eaf(3, 30, _INVALIDOS, semente=1), REGRAS, "invalido.eaf"),
+        lote.valida_arquivo(gera_eaf(3, 30, _INVALIDOS, semente=1), REGRAS, "triagem.eaf",
+                            orcamento=elan.OrcamentoErros(max_erros=1)),
+        lote.valida_arquivo(b"<ANNOTATION_DOCUMENT>", REGRAS, "quebrado.eaf"),
+    ]
+
+
+def _escreve(formato, resultados):
+    destino = io.StringIO()
+    with relatorios.cria_escritor(formato, destino) as escritor:
+        escritor.escreve_todos(resultados)
+    return destino.getvalue()
+
+
+def test_resultados_de_exemplo():
+    valido, invalido, triagem, quebrado = _resultados()
+
+    assert valido["valido"] and not invalido["valido"] and invalido["conteudo_erros"]
+    assert triagem["truncado"] and not invalido.get("truncado")
+    assert quebrado["erro"]
+
+
+def test_jsonl_uma_linha_por_resultado():
+    resultados = _resultados()
+
+    assert [json.loads(linha) for linha in _escreve("jsonl", resultados).splitlines()] == resultados
+
+
+def test_csv_uma_linha_por_exemplo_de_erro():
+    valido, invalido, triagem, quebrado = _resultados()
+
+    linhas = list(csv.DictReader(io.StringIO(_escreve("csv", [valido, invalido, triagem, quebrado]))))
+
+    assert {linha["arquivo"] for linha in linhas} == {"invalido.eaf", "triagem.eaf", "quebrado.eaf"}
+    detalhes = elan.AgregadorErros.de_dict(invalido["conteudo_detalhes"])
+    do_invalido = [linha for linha in linhas if linha["arquivo"] == "invalido.eaf" and linha["etapa"] == "conteudo"]
+    assert len(do_invalido) == sum(len(grupo.exemplos) for grupo in detalhes) + len(detalhes.globais)
+    assert {(linha["codigo"], linha["trilha"], int(linha["ocorrencias"])) for linha in do_invalido} == {
+        (grupo.exemplos[0].codigo, grupo.exemplos[0].trilha, grupo.total) for grupo in detalhes
+    }
+    truncadas = [linha for linha in linhas if linha["codigo"] == "TRUNCADO"]
+    assert [(linha["arquivo"], linha["mensagem"]) for linha in truncadas] == [("triagem.eaf", relatorios.AVISO_TRUNCADO)]
+    assert [linha["codigo"] for linha in linhas if linha["arquivo"] == "quebrado.eaf"] == ["ERRO_LEITURA"]
+
+
+def test_csv_de_resultado_sem_detalhes_usa_as_mensagens():
+    resultado = dict(_resultados()[1], conteudo_detalhes=None)
+
+    linhas = list(csv.DictReader(io.StringIO(_escreve("csv", [resultado]))))
+
+    assert [linha["mensagem"] for linha in linhas if linha["etapa"] == "conteudo"] == resultado["conteudo_erros"]
+    assert all(linha["codigo"] == "" for linha in linhas if linha["etapa"] == "conteudo")
+
+
+@pytest.mark.parametrize("formato", ["texto", "html"])
+def test_aviso_de_truncamento_so_nos_resultados_truncados(formato):
+    valido, invalido, triagem, quebrado = _resultados()
+
+    assert relatorios.AVISO_TRUNCADO not in _escreve(formato, [valido, invalido, quebrado])
+    relatorio = _escreve(formato, [triagem])
+    assert relatorio.count(relatorios.AVISO_TRUNCADO) == 1
+    # O limite foi atingido no conteúdo: a etapa temporal não chegou a rodar
+    assert triagem["tempo_valido"] is None and "NÃO EXECUTADO (limite de erros atingido)" in relatorio
+
+
+def test_texto():
+    valido, invalido, _, quebrado = _resultados()
+
+    relatorio = _escreve("texto", [valido, invalido, quebrado])
+
+    assert relatorio.count("Relatório de Validação Cerberus") == 3
+    assert "Arquivo: valido.eaf" in relatorio
+    assert all(f"- {mensagem}\n" in relatorio for mensagem in invalido["conteudo_erros"])
+    assert f"Erro crítico ao processar o arquivo: {quebrado['erro']}" in relatorio
+
+
+def test_html_escapa_e_fecha_a_pagina():
+    invalido = dict(_resultados()[1], arquivo="<a&b>.eaf")
+
+    relatorio = _escreve("html", [invalido])
+
+    assert relatorio.startswith("<!DOCTYPE html>") and relatorio.endswith("</body>\n</html>\n")
+    assert "<h2>&lt;a&amp;b&gt;.eaf</h2>" in relatorio
+    assert relatorio.count("<section>") == relatorio.count("</section>") == 1
+
+
+@pytest.mark.parametrize("formato", ["csv", "html", "jsonl", "texto"])
+def test_relatorio_vazio(formato):
+    relatorio = _escreve(formato, [])
+
+    esperado = {"csv": ",".join(relatorios.EscritorCSV.COLUNAS) + "\n", "jsonl": "", "texto": ""}
+    if formato == "html":
+        assert relatorio.startswith("<!DOCTYPE html>") and relatorio.endswith("</html>\n")
+    else:
+        assert relatorio == esperado[formato]
+
+
+@pytest.mark.parametrize("caminho, formato", [
+    ("saida.JSONL", "jsonl"), ("saida.json", "jsonl"), ("saida.txt", "texto"), ("saida.csv", "csv"),
+    ("saida.htm", "html"), ("saida.xyz", "jsonl"), (None, "jsonl"),
+])
+def test_formato_por_extensao(caminho, formato):
+    assert relatorios.formato_por_extensao(caminho) == formato
+
+
+def test_formato_desconhecido():
+    with pytest.raises(ValueError, match="xml"):
+        relatorios.cria_escritor("xml", io.StringIO())
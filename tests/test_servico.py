@@ -0,0 +1,121 @@
+"""
+Testes do controle de fila e do pool do serviço HTTP (cerberus.servico.ServicoValidacao).
+"""
+import asyncio
+import threading
+
+import pytest
+
+from cerberus import elan, servico
+from benchmarks.gerador import gera_eaf
+
+REGRAS = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+
+@pytest.fixture
+def servico_validacao():
+    servico_validacao = servico.ServicoValidacao(REGRAS, num_processos=1, tempo_limite=30)
+    yield servico_validacao
+    servico_validacao.encerra()
+
+
+def test_tempo_esgotado_recicla_pool_e_libera_vaga(servico_validacao):
+    async def cenario():
+        servico_validacao.tempo_limite = 0.2
+        servico_validacao._reserva(1)
+        with pytest.raises(servico.ErroHTTP) as erro:
+            await servico_validacao._valida_arquivo("grande.eaf", gera_eaf(3, 100_000))
+        assert erro.value.status == 504
+
+        servico_validacao.tempo_limite = 30
+        servico_validacao._reserva(1)
+        return await servico_validacao._valida_arquivo("pequeno.eaf", gera_eaf(3, 10))
+
+    pool_anterior = servico_validacao._obtem_pool()
+    resultado = asyncio.run(cenario())
+
+    assert resultado["valido"] is True
+    assert servico_validacao.na_fila == 0
+    assert servico_validacao._pool is not pool_anterior
+
+
+def test_falha_no_envio_libera_vaga(servico_validacao, monkeypatch):
+    def falha():
+        raise RuntimeError("sem recursos")
+
+    monkeypatch.setattr(servico_validacao, "_obtem_pool", falha)
+    servico_validacao._reserva(1)
+    with pytest.raises(RuntimeError):
+        asyncio.run(servico_validacao._valida_arquivo("a.eaf", b"<x/>"))
+
+    assert servico_validacao.na_fila == 0
+
+
+def test_requisicao_maior_que_a_fila_e_recusada_com_413(servico_validacao):
+    servico_validacao.max_fila = 3
+
+    with pytest.raises(servico.ErroHTTP) as erro:
+        servico_validacao._reserva(4)
+    assert erro.value.status == 413 and "capacidade da fila" in erro.value.mensagem
+    assert "Retry-After" not in erro.value.cabecalhos
+
+    servico_validacao._reserva(2)
+    with pytest.raises(servico.ErroHTTP) as erro:
+        servico_validacao._reserva(2)
+    assert erro.value.status == 503 and erro.value.cabecalhos["Retry-After"] == "1"
+    assert servico_validacao.na_fila == 2
+
+
+async def _envia_com_expect(porta: int, corpo: bytes, tamanho_declarado: int) -> bytes:
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    escritor.write(
+        f"POST /validate?nome=a.eaf HTTP/1.1\r\nHost: x\r\nContent-Length: {tamanho_declarado}\r\n"
+        "Expect: 100-continue\r\nConnection: close\r\n\r\n".encode("latin-1")
+    )
+    await escritor.drain()
+    primeira = await leitor.readline()
+    if primeira.startswith(b"HTTP/1.1 100"):
+        assert await leitor.readline() == b"\r\n"
+        escritor.write(corpo)
+        await escritor.drain()
+        primeira = await leitor.readline()
+    resto = await leitor.read()
+    escritor.close()
+    return primeira + resto
+
+
+def test_expect_100_continue(servico_validacao):
+    async def cenario():
+        servidor = await servico_validacao.inicia("127.0.0.1", 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            conteudo = gera_eaf(3, 10)
+            aceita = await _envia_com_expect(porta, conteudo, len(conteudo))
+            recusa = await _envia_com_expect(porta, b"", servico_validacao.max_corpo + 1)
+        return aceita, recusa
+
+    aceita, recusa = asyncio.run(cenario())
+
+    assert aceita.startswith(b"HTTP/1.1 200") and b'"valido": true' in aceita
+    assert recusa.startswith(b"HTTP/1.1 413")
+
+
+def test_executa_servidor_fora_da_thread_principal(servico_validacao):
+    erros = []
+
+    def executa():
+        async def cenario():
+            tarefa = asyncio.ensure_future(servico.executa_servidor(servico_validacao, "127.0.0.1", 0))
+            await asyncio.sleep(0.5)
+            tarefa.cancel()
+            await asyncio.gather(tarefa, return_exceptions=True)
+            if not tarefa.cancelled() and tarefa.exception() is not None:
+                erros.append(tarefa.exception())
+
+        asyncio.run(cenario())
+
+    thread = threading.Thread(target=executa)
+    thread.start()
+    thread.join(timeout=60)
+
+    assert not thread.is_alive() and erros == []
@@ -0,0 +1,118 @@
+"""
+Testes da validação temporal (cerberus.elan.valida_tempos_estruturado) contra uma verificação par a par.
+"""
+import random
+
+import pytest
+
+from cerberus import elan
+
+_MAPEAMENTO = {"INF": "INF", "DOC": "DOC", "DISF": "DISF"}
+
+
+def _transcricao(trilhas):
+    transcricao = elan.Transcricao("arquivo.eaf")
+    transcricao.trilhas = {nome: elan.AnotacoesTrilha.de_anotacoes(anotacoes) for nome, anotacoes in trilhas.items()}
+    return transcricao
+
+
+def _erros(trilhas, mapeamento=_MAPEAMENTO, **opcoes):
+    erros = elan.valida_tempos_estruturado(_transcricao(trilhas), mapeamento, max_exemplos=10_000, **opcoes)
+    return sorted((erro.codigo, erro.trilha, erro.inicio, erro.fim) for grupo in erros for erro in grupo.exemplos)
+
+
+def _esperado(trilhas, mapeamento=_MAPEAMENTO):
+    """
+    Mesmas regras da varredura, verificadas par a par e ponto a ponto (O(n²)).
+    """
+    esperado = []
+    fala = [(inicio, fim) for nome, tipo in mapeamento.items() if tipo in elan.TIPOS_FALA
+            for inicio, fim, valor in trilhas.get(nome, ()) if fim > inicio and valor.strip()]
+    for nome, anotacoes in trilhas.items():
+        if nome not in mapeamento:
+            continue
+        for posicao, (inicio, fim, valor) in enumerate(anotacoes):
+            if fim <= inicio:
+                esperado.append(("DURACAO_INVALIDA", nome, inicio, fim))
+                continue
+            # Sobreposta a alguma anotação válida que vem antes na ordem (início, fim); empates na ordem original
+            if any(f > i and inicio < f and ((i, f) < (inicio, fim) or ((i, f) == (inicio, fim) and outra < posicao))
+                   for outra, (i, f, _) in enumerate(anotacoes)):
+                esperado.append(("SOBREPOSICAO", nome, inicio, fim))
+            if mapeamento[nome] == "DISF" and valor.strip():
+                # Cada milissegundo da disfluência está em algum trecho de fala
+                if not all(any(i <= ms < f for i, f in fala) for ms in range(inicio, fim)):
+                    esperado.append(("DISF_FORA_DA_FALA", nome, inicio, fim))
+    return sorted(esperado)
+
+
+def test_sobreposicao_na_mesma_trilha():
+    trilhas = {
+        "INF": [(50, 150, "b"), (0, 100, "a"), (100, 200, "encosta"), (10, 20, "dentro"), (300, 300, "zero"), (400, 350, "invertida")],
+        "DOC": [(0, 1000, "outra trilha não conta")],
+        "DISF": [],
+    }
+
+    assert _erros(trilhas) == [
+        ("DURACAO_INVALIDA", "INF", 300, 300),
+        ("DURACAO_INVALIDA", "INF", 400, 350),
+        ("SOBREPOSICAO", "INF", 10, 20),
+        ("SOBREPOSICAO", "INF", 50, 150),
+        ("SOBREPOSICAO", "INF", 100, 200),
+    ]
+
+
+def test_anotacoes_iguais_se_sobrepoem():
+    assert _erros({"INF": [(0, 10, "a"), (0, 10, "b")]}, {"INF": "INF"}) == [("SOBREPOSICAO", "INF", 0, 10)]
+
+
+def test_disfluencia_fora_da_fala():
+    trilhas = {
+        "INF": [(0, 100, "a"), (500, 600, "  ")],
+        "DOC": [(100, 200, "b"), (300, 400, "c")],
+        "DISF": [
+            (-10, 5, "(EST)"),      # começa antes de toda a fala
+            (50, 150, "(EST)"),     # atravessa INF e DOC encostados: dentro da união
+            (150, 250, "(HES)"),    # termina fora
+            (250, 290, "(HES)"),    # no intervalo entre trechos
+            (300, 400, "(EST)"),    # exatamente um trecho
+            (500, 550, "(EST)"),    # trecho de fala vazio não conta
+            (700, 800, ""),         # disfluência vazia é ignorada
+            (900, 900, "(EST)"),    # duração inválida: não é verificada contra a fala
+        ],
+    }
+
+    erros = _erros(trilhas)
+
+    assert [erro[2:] for erro in erros if erro[0] == "DISF_FORA_DA_FALA"] == [(-10, 5), (150, 250), (250, 290), (500, 550)]
+    assert erros == _esperado(trilhas)
+
+
+def test_trilha_ausente_e_ignorada():
+    assert _erros({"INF": [(0, 10, "a")]}, {"INF": "INF", "DISF": "DISF"}) == []
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_concorda_com_verificacao_par_a_par(semente):
+    gerador = random.Random(semente)
+
+    def anotacoes(quantidade, duracao):
+        resultado = []
+        for _ in range(quantidade):
+            inicio = gerador.randrange(0, 400)
+            resultado.append((inicio, inicio + gerador.randrange(-5, duracao), gerador.choice(["x", "x", "", " "])))
+        return resultado
+
+    trilhas = {"INF": anotacoes(15, 40), "DOC": anotacoes(15, 40), "DISF": anotacoes(15, 20), "OUTRA": anotacoes(5, 10)}
+
+    assert _erros(trilhas) == _esperado(trilhas)
+
+
+def test_orcamento_limita_a_trilha():
+    trilhas = {"INF": [(0, 100, "a")] * 5, "DISF": [(200, 210, "(EST)")] * 5}
+    orcamento = elan.OrcamentoErros(max_por_grupo=2)
+
+    erros = _erros(trilhas, {"INF": "INF", "DISF": "DISF"}, orcamento=orcamento)
+
+    grupos = [(codigo, trilha) for codigo, trilha, *_ in erros]
+    assert grupos == [("DISF_FORA_DA_FALA", "DISF")] * 2 + [("SOBREPOSICAO", "DISF")] * 2 + [("SOBREPOSICAO", "INF")] * 2
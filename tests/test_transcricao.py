@@ -0,0 +1,52 @@
+"""
+Testes da conversão de arquivos .eaf para a representação compacta (cerberus.elan.Transcricao).
+"""
+import pytest
+
+from cerberus import elan
+
+pympi = pytest.importorskip("pympi")
+
+
+@pytest.fixture
+def caminho_com_trilha_referencia(tmp_path):
+    """
+    Arquivo com uma trilha alinhável (INF) e uma trilha de referência (TRADUCAO) que depende dela.
+    """
+    eaf = pympi.Elan.Eaf()
+    eaf.add_linguistic_type("referencia", constraints="Symbolic_Association", timealignable=False)
+    eaf.add_tier("INF")
+    eaf.add_tier("TRADUCAO", ling="referencia", parent="INF")
+    eaf.add_annotation("INF", 0, 1000, "eu fui lá")
+    eaf.add_annotation("INF", 1500, 2500, "na casa")
+    eaf.add_ref_annotation("TRADUCAO", "INF", 500, "i went there")
+    eaf.add_ref_annotation("TRADUCAO", "INF", 2000, "home")
+    caminho = tmp_path / "referencia.eaf"
+    pympi.Elan.to_eaf(str(caminho), eaf)
+    return caminho
+
+
+def test_de_eaf_converte_trilha_de_referencia_do_pympi(caminho_com_trilha_referencia):
+    _, eaf = elan.abre_eaf(caminho_com_trilha_referencia.read_bytes(), "referencia.eaf")
+    assert len(eaf.get_annotation_data_for_tier("TRADUCAO")[0]) == 4
+
+    transcricao = elan.Transcricao.de_eaf(eaf, "referencia.eaf")
+
+    assert list(transcricao.get_annotation_data_for_tier("TRADUCAO")) == [
+        (0, 1000, "i went there"), (1500, 2500, "home"),
+    ]
+    assert list(transcricao.get_annotation_data_for_tier("INF")) == [(0, 1000, "eu fui lá"), (1500, 2500, "na casa")]
+
+
+def test_de_eaf_concorda_com_leitor_nativo(caminho_com_trilha_referencia):
+    conteudo = caminho_com_trilha_referencia.read_bytes()
+    _, eaf = elan.abre_eaf(conteudo, "referencia.eaf")
+    _, lida = elan.le_eaf(conteudo, "referencia.eaf")
+
+    transcricao = elan.Transcricao.de_eaf(eaf, "referencia.eaf")
+
+    assert isinstance(lida, elan.Transcricao)
+    assert list(lida.get_tier_names()) == list(transcricao.get_tier_names())
+    for nome_trilha in lida.get_tier_names():
+        assert list(transcricao.get_annotation_data_for_tier(nome_trilha)) == list(lida.get_annotation_data_for_tier(nome_trilha))
+        assert transcricao.get_annotation_ids_for_tier(nome_trilha) == lida.get_annotation_ids_for_tier(nome_trilha)
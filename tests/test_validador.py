@@ -0,0 +1,128 @@
+"""
+Testes da validação de IDs de trilhas (emparelhamento trilhas x regras) contra a busca
+exaustiva original (combinações de regras x permutações de trilhas).
+"""
+import random
+import re
+from itertools import combinations, permutations
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from cerberus import elan
+from cerberus.elan.validador import _hopcroft_karp
+
+
+class _TrilhasFalsas:
+    """Fonte mínima de trilhas para o validador, sem leitura de arquivo."""
+
+    def __init__(self, nomes):
+        self._nomes = nomes
+
+    def get_tier_names(self):
+        return self._nomes
+
+
+def _valida_regra_referencia(nome_trilha: str, regra: Dict[str, Any]) -> bool:
+    tipo_regra = regra.get("type")
+    regra_valor = regra.get("value")
+    if tipo_regra == "exato":
+        return nome_trilha == regra_valor
+    if tipo_regra == "comeca":
+        return nome_trilha.startswith(regra_valor)
+    if tipo_regra == "termina":
+        return nome_trilha.endswith(regra_valor)
+    if tipo_regra == "contem":
+        return regra_valor in nome_trilha
+    if tipo_regra == "regex":
+        return re.fullmatch(regra_valor, nome_trilha) is not None
+    return False
+
+
+def _emparelha_referencia(trilhas: List[str], regras_trilhas: List[Dict[str, Any]]) -> Tuple[bool, Optional[Dict[str, str]]]:
+    """Busca exaustiva da versão original de 'valida_id_trilhas' (sem as verificações de quantidade e maiúsculas)."""
+    if len(trilhas) < sum(1 for r in regras_trilhas if r.get("mandatory", True)):
+        return False, None
+    indices_regras = range(len(regras_trilhas))
+    for subset_indices in combinations(indices_regras, len(trilhas)):
+        indices_ignorados = set(indices_regras) - set(subset_indices)
+        if not all(not regras_trilhas[idx].get("mandatory", True) for idx in indices_ignorados):
+            continue
+        subset_regras = [regras_trilhas[i] for i in subset_indices]
+        for perm in permutations(trilhas):
+            mapeamento = {}
+            for i, nome_trilha in enumerate(perm):
+                if not _valida_regra_referencia(nome_trilha, subset_regras[i]):
+                    break
+                if subset_regras[i].get("content_type"):
+                    mapeamento[nome_trilha] = subset_regras[i]["content_type"]
+            else:
+                return True, mapeamento
+    return False, None
+
+
+_PARTES = ["DOC", "DISF", "INF", "A", "B", "C", "1"]
+_TIPOS_CONTEUDO = ["INF", "DOC", "DISF", None]
+
+
+def _disposicao_aleatoria(gerador: random.Random) -> Tuple[List[str], List[Dict[str, Any]]]:
+    nomes = set()
+    while len(nomes) < gerador.randint(1, 4):
+        nomes.add("".join(gerador.choice(_PARTES) for _ in range(gerador.randint(1, 2))))
+    trilhas = gerador.sample(sorted(nomes), len(nomes))
+
+    regras = []
+    for _ in range(gerador.randint(1, 5)):
+        tipo = gerador.choice(["exato", "comeca", "termina", "contem", "regex"])
+        if tipo == "regex":
+            valor = gerador.choice([r"[A-Z]+", r"[A-Z]+\d?[A-Z]*", r"D.*", r".*C", r"INF\d?"])
+        elif tipo == "exato":
+            valor = gerador.choice(trilhas + ["DISF", "DOC"])
+        else:
+            valor = gerador.choice(_PARTES)
+        regra = {"type": tipo, "value": valor, "mandatory": gerador.random() < 0.5}
+        content_type = gerador.choice(_TIPOS_CONTEUDO)
+        if content_type:
+            regra["content_type"] = content_type
+        regras.append(regra)
+    return trilhas, regras
+
+
+def test_trilha_ambigua_recebe_o_tipo_da_busca_exaustiva():
+    regras = elan.RuleSet({"regras_trilhas": [
+        {"type": "exato", "value": "DISF", "content_type": "DISF", "mandatory": False},
+        {"type": "termina", "value": "C", "content_type": "INF", "mandatory": False},
+        {"type": "regex", "value": r"[A-Z]+", "content_type": "INF"},
+    ]})
+
+    sucesso, _, mapeamento = elan.valida_id_trilhas(_TrilhasFalsas(["DOC", "DISF"]), regras, memo=None)
+
+    assert sucesso
+    assert mapeamento == {"DISF": "DISF", "DOC": "INF"}
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_emparelhamento_concorda_com_busca_exaustiva(semente):
+    gerador = random.Random(semente)
+    for _ in range(2500):
+        trilhas, regras_trilhas = _disposicao_aleatoria(gerador)
+        esperado_sucesso, esperado_mapeamento = _emparelha_referencia(trilhas, regras_trilhas)
+
+        sucesso, _, mapeamento = elan.valida_id_trilhas(
+            _TrilhasFalsas(trilhas), elan.RuleSet({"regras_trilhas": regras_trilhas}), memo=None
+        )
+
+        assert sucesso == esperado_sucesso, (trilhas, regras_trilhas)
+        # Mesma atribuição e mesma ordem (a do conteúdo validado e relatado)
+        assert list((mapeamento or {}).items()) == list((esperado_mapeamento or {}).items()), (trilhas, regras_trilhas)
+
+
+def test_hopcroft_karp_com_caminho_aumentante_longo():
+    # Cada vértice i aceita i + 1 e i: a primeira fase ocupa i + 1, e o último vértice só é
+    # emparelhado por um caminho aumentante que atravessa todos os outros (além do limite de recursão)
+    n = 5000
+    adjacencia = [[i + 1, i] for i in range(n - 1)] + [[n - 1]]
+
+    pares = _hopcroft_karp(adjacencia, n)
+
+    assert pares == list(range(n))
@@ -0,0 +1,86 @@
+"""
+Testes da validação de conteúdo vetorizada (cerberus.vetorizado) contra os validadores por anotação.
+"""
+import pytest
+
+from cerberus import elan
+from cerberus.elan import validador
+from benchmarks.gerador import gera_eaf
+
+pa = pytest.importorskip("pyarrow")
+vetorizado = pytest.importorskip("cerberus.vetorizado")
+
+REGRAS = elan.RuleSet(elan.REGRAS_ENTREVISTA)
+
+# Dígitos e espaços fora do ASCII (o RE2 do Arrow só os reconhece pelas classes geradas em vetorizado._classes),
+# letras fora das faixas permitidas, disfluências em caixa errada e valores vazios ou só com espaços
+_VALORES = [
+    "", "   ", "　", "casa", " casa ", "casa 2", "casa ٣", "x²", "ca$a", "ü", "çÇàÀ é", "ok?/-\"",
+    "a\tb", "a b", " (EST) ", "(EST)", "(HES)", "(est)", "(Hes)", "((ABC))", "((A B))", "((abc))",
+    "(( ))", "(())", "(( ))", "(EST) depois", "fala ((ABC))", "x (y)", "((", "$$ 12 ##", "日本",
+]
+
+
+def _esperado_por_anotacao(tipo_conteudo, valores):
+    erros = []
+    for valor in valores:
+        if not valor or not valor.strip():
+            continue
+        erros += validador._VALIDADORES_CONTEUDO[tipo_conteudo](valor.strip())
+    return erros
+
+
+@pytest.mark.parametrize("tipo_conteudo", ["INF", "DOC", "DISF"])
+def test_concorda_com_validadores_por_anotacao(tipo_conteudo):
+    quantidade = len(_VALORES)
+    tabela = pa.table({
+        "arquivo": ["a.eaf"] * quantidade,
+        "trilha": ["T"] * quantidade,
+        "content_type": [tipo_conteudo] * quantidade,
+        "inicio": list(range(quantidade)),
+        "fim": list(range(1, quantidade + 1)),
+        "valor": _VALORES,
+    })
+
+    erros = vetorizado.valida_tabela(tabela)
+
+    assert tuple(erros.column_names) == vetorizado.COLUNAS_ERROS
+    obtido = list(zip(erros.column("codigo").to_pylist(), erros.column("caracteres").to_pylist()))
+    assert obtido == _esperado_por_anotacao(tipo_conteudo, _VALORES)
+    # Cada erro aponta para a anotação que o gerou
+    for inicio, codigo, caracteres in zip(erros.column("inicio").to_pylist(), erros.column("codigo").to_pylist(),
+                                          erros.column("caracteres").to_pylist()):
+        assert (codigo, caracteres) in _esperado_por_anotacao(tipo_conteudo, [_VALORES[inicio]])
+
+
+def test_corpus_concorda_com_validacao_por_arquivo():
+    invalidos = {"digito": 0.1, "disf_mal_posicionada": 0.05, "caractere_invalido": 0.1, "disf_malformada": 0.1}
+    arquivos = [(f"{numero}.eaf", gera_eaf(3, 80, invalidos, semente=numero)) for numero in range(4)]
+    # Arquivo com trilhas fora das regras: fica de fora, como na validação por arquivo
+    arquivos.append(("ids.eaf", gera_eaf(2, 10, semente=9)))
+
+    erros = vetorizado.valida_corpus_vetorizado(arquivos, REGRAS)
+
+    esperado = []
+    for nome, conteudo in arquivos:
+        _, transcricao = elan.le_eaf(conteudo, nome)
+        id_valido, _, mapeamento = elan.valida_id_trilhas(transcricao, REGRAS)
+        if not id_valido:
+            continue
+        for nome_trilha, tipo_conteudo in mapeamento.items():
+            for inicio, fim, valor in transcricao.get_annotation_data_for_tier(nome_trilha):
+                esperado += [(nome, nome_trilha, inicio, fim, codigo, caracteres)
+                             for codigo, caracteres in _esperado_por_anotacao(tipo_conteudo, [valor])]
+
+    colunas = [erros.column(coluna).to_pylist() for coluna in ("arquivo", "trilha", "inicio", "fim", "codigo", "caracteres")]
+    assert esperado and list(zip(*colunas)) == esperado
+    assert "ids.eaf" not in colunas[0]
+
+
+def test_tabela_sem_erros():
+    tabela = vetorizado.tabela_anotacoes([("a.eaf", gera_eaf(3, 20, semente=1))], REGRAS)
+
+    erros = vetorizado.valida_tabela(tabela)
+
+    assert tabela.num_rows == 60 and erros.num_rows == 0
+    assert tuple(erros.column_names) == vetorizado.COLUNAS_ERROS